@@ -0,0 +1,35 @@
+# backend/apps/accounts/authentication.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from . import principals
+from .tokens import AUTH_VERSION_CLAIM
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication que resuelve el usuario con `principals.resolve` en vez
+    de un User.objects.get() por request. Los tokens sin el claim (emitidos
+    antes de auth_version) cuentan como versión 0.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_("Token contained no recognizable user identification")) from e
+
+        try:
+            user = principals.resolve(user_id, validated_token.get(AUTH_VERSION_CLAIM, 0))
+        except self.user_model.DoesNotExist as e:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found") from e
+        except principals.StaleToken as e:
+            raise AuthenticationFailed(
+                "La sesión ya no es válida, inicia sesión de nuevo.", code="token_stale"
+            ) from e
+
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        return user
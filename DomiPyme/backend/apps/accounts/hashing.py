@@ -0,0 +1,101 @@
+# backend/apps/accounts/hashing.py
+"""
+Hash de contraseñas (registro y login) en un pool de hilos acotado.
+
+Un PBKDF2 son cientos de milisegundos de CPU. Bajo ASGI cada request síncrono
+corre en su propio hilo, así que una ola de registros (campañas) pone todos
+los núcleos a hashear y el resto de la API se queda sin CPU. Acá los hashes
+pasan por `pool`: como mucho PASSWORD_HASH_WORKERS a la vez, hasta
+PASSWORD_HASH_QUEUE esperando turno (sin gastar CPU) y el que no consigue
+lugar en PASSWORD_HASH_WAIT segundos recibe un 503 (`Busy`).
+
+- `make_password(raw)`: el único hash del registro.
+- `authenticate(email, password)`: el login con un solo hash. Un email que no
+  existe también paga un hash (igual que ModelBackend: el tiempo no delata
+  qué cuentas existen). Si el hasher configurado cambió, el hash nuevo se
+  guarda con un UPDATE directo que no toca auth_version (la contraseña es la
+  misma, los tokens siguen valiendo).
+
+`pool.count` cuenta los hashes del hilo actual (el benchmark lo reporta por
+request).
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class Busy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Hay demasiados registros e inicios de sesión en curso, intenta de nuevo en unos segundos."
+    default_code = "hashing_busy"
+
+
+class HashPool:
+    """Ejecutor de hashes con `workers` hilos y un cupo de `workers + queue` en vuelo."""
+
+    def __init__(self, workers, queue, wait):
+        self.workers, self.wait = workers, wait
+        self._slots = threading.BoundedSemaphore(workers + queue)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def start(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="password-hash")
+        return self._executor
+
+    def run(self, fn, *args):
+        """Corre `fn(*args)` en el pool y espera el resultado. Busy si no hay cupo."""
+        if not self._slots.acquire(timeout=self.wait):
+            raise Busy()
+        try:
+            self._local.count = self.count + 1
+            return self.start().submit(fn, *args).result()
+        finally:
+            self._slots.release()
+
+    @property
+    def count(self):
+        return getattr(self._local, "count", 0)
+
+    def reset_count(self):
+        self._local.count = 0
+
+
+pool = HashPool(settings.PASSWORD_HASH_WORKERS, settings.PASSWORD_HASH_QUEUE, settings.PASSWORD_HASH_WAIT)
+
+
+def make_password(raw):
+    return pool.run(hashers.make_password, raw)
+
+
+def _verify(raw, encoded):
+    """(correcta, hay que rehashear con el hasher preferido)."""
+    outdated = []
+    valid = hashers.check_password(raw, encoded, setter=outdated.append)
+    return valid, bool(outdated)
+
+
+def authenticate(email, password):
+    """El usuario activo con ese email y contraseña, o None. Un hash, a lo sumo una escritura."""
+    User = get_user_model()
+    user = User._default_manager.filter(**{User.USERNAME_FIELD: email}).first()
+    if user is None:
+        make_password(password)
+        return None
+    valid, outdated = pool.run(_verify, password, user.password)
+    if not valid or not user.is_active:
+        return None
+    if outdated:
+        # Segundo hash solo en el primer login después de cambiar de hasher
+        user.password = make_password(password)
+        User._default_manager.filter(pk=user.pk).update(password=user.password)
+        user._loaded_auth = user._auth_state()
+    return user
@@ -0,0 +1,22 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.accounts.revocation import prune_expired
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes los refresh tokens vencidos (OutstandingToken / BlacklistedToken)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+        parser.add_argument("--loop", type=int, default=0, metavar="SECONDS",
+                            help="Repetir cada N segundos en lugar de ejecutar una sola vez")
+
+    def handle(self, *args, **options):
+        while True:
+            blacklisted, outstanding = prune_expired(batch_size=options["batch_size"])
+            self.stdout.write(f"Tokens borrados: {outstanding} emitidos, {blacklisted} en blacklist")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
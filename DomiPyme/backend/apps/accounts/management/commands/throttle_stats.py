@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.throttling import rejections
+
+
+class Command(BaseCommand):
+    help = "Muestra cuántos requests rechazó cada throttle de credenciales (contadores en el cache)."
+
+    def handle(self, *args, **options):
+        for rate, count in rejections().items():
+            self.stdout.write(f"{rate:<24}{count:>10}")
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:42
+
+from django.db import migrations, models
+import django.db.models.functions.text
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0002_alter_user_managers_alter_user_first_name_and_more"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="user",
+            index=models.Index(
+                django.db.models.functions.text.Lower("email"),
+                name="user_email_lower_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,28 @@
+from django.db import migrations
+
+INDEX = "token_outstanding_expires_idx"
+TABLE = "token_blacklist_outstandingtoken"
+
+
+def create_index(apps, schema_editor):
+    # prune_tokens busca por expires_at; el modelo es de simplejwt, el índice va acá
+    concurrently = "CONCURRENTLY " if schema_editor.connection.vendor == "postgresql" else ""
+    schema_editor.execute(f"CREATE INDEX {concurrently}IF NOT EXISTS {INDEX} ON {TABLE} (expires_at)")
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute(f"DROP INDEX IF EXISTS {INDEX}")
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("accounts", "0004_user_auth_version"),
+        ("token_blacklist", "0013_alter_blacklistedtoken_options_and_more"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,5 +1,6 @@
 # accounts/models.py
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth.models import (
     AbstractBaseUser,
     PermissionsMixin,
@@ -43,10 +44,26 @@ class CustomUserManager(BaseUserManager):
 
         return self._create_user(email, password, **extra_fields)
 
+    def by_email(self, email):
+        """
+        Usuarios con ese email sin distinguir mayúsculas. Filtra por
+        LOWER("email") = ..., que usa user_email_lower_idx (email__iexact usa
+        UPPER/LIKE según el motor y no aprovecha el índice).
+        """
+        return self.alias(email_lower=Lower("email")).filter(email_lower=email.lower())
+
+
+# Cambios que dejan viejos los tokens emitidos (ver auth_version)
+AUTH_FIELDS = ("password", "is_active", "is_staff", "is_superuser")
+
 
 class User(AbstractBaseUser, PermissionsMixin):
     """
     Modelo de usuario personalizado que utiliza 'email' como USERNAME_FIELD.
+
+    `auth_version` sube cada vez que se guarda un cambio de AUTH_FIELDS; va
+    como claim en los JWT (apps.accounts.tokens) y la autenticación rechaza
+    los tokens con una versión vieja (apps.accounts.principals).
     """
     email = models.EmailField(_("email address"), unique=True)
     first_name = models.CharField(_("first name"), max_length=150, blank=True)
@@ -54,6 +71,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     is_active = models.BooleanField(_("active"), default=True)
     is_staff = models.BooleanField(_("staff status"), default=False)
     date_joined = models.DateTimeField(_("date joined"), default=timezone.now)
+    auth_version = models.PositiveIntegerField(default=0, editable=False)
 
     objects = CustomUserManager()
 
@@ -63,6 +81,29 @@ class User(AbstractBaseUser, PermissionsMixin):
     class Meta:
         verbose_name = _("user")
         verbose_name_plural = _("users")
+        indexes = [
+            # Búsquedas sin distinguir mayúsculas: User.objects.by_email()
+            models.Index(Lower("email"), name="user_email_lower_idx"),
+        ]
 
     def __str__(self):
         return self.email or f"user-{self.pk}"
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        user = super().from_db(db, field_names, values)
+        user._loaded_auth = user._auth_state()
+        return user
+
+    def _auth_state(self):
+        # __dict__ y no getattr: un campo diferido no dispara otra query
+        return tuple(self.__dict__.get(name) for name in AUTH_FIELDS)
+
+    def save(self, *args, **kwargs):
+        loaded = getattr(self, "_loaded_auth", None)
+        if loaded is not None and loaded != self._auth_state():
+            self.auth_version += 1
+            if kwargs.get("update_fields") is not None:
+                kwargs["update_fields"] = {*kwargs["update_fields"], "auth_version"}
+        super().save(*args, **kwargs)
+        self._loaded_auth = self._auth_state()
@@ -0,0 +1,128 @@
+# backend/apps/accounts/principals.py
+"""
+Usuario autenticado por JWT sin un SELECT por request.
+
+Dos niveles:
+
+- La versión vigente de cada usuario (`auth_version`) en el cache compartido
+  (AUTH_PRINCIPAL_CACHE_ALIAS), una clave chica por usuario. Al guardar un
+  cambio de contraseña / is_active / is_staff la versión sube y la señal la
+  escribe al hacer commit: todos los workers la ven en el request siguiente.
+- El usuario ya cargado, en un LRU por proceso con TTL, por
+  (user_id, auth_version). Solo se consulta si la versión del token coincide
+  con la vigente, así que una entrada vieja deja de servir al instante.
+
+Un token con otra versión se rechaza (el usuario cambió la contraseña, fue
+desactivado o cambió de permisos: tiene que volver a iniciar sesión). Si la
+versión vigente no está en el cache se lee el usuario de la BD y se vuelve a
+guardar. Otros cambios (nombre, etc.) se ven al vencer el TTL o en el worker
+que guardó.
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+
+PREFIX = "auth:v"
+
+
+class StaleToken(Exception):
+    """El token se emitió con una auth_version que ya no es la vigente."""
+
+
+class PrincipalCache:
+    """LRU con TTL, seguro entre hilos. Guarda copias: quien lee no toca la entrada."""
+
+    def __init__(self, maxsize, ttl):
+        self.maxsize, self.ttl = maxsize, ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, user = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+        return copy.copy(user)
+
+    def put(self, key, user):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, copy.copy(user))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def forget(self, user_id):
+        user_id = str(user_id)
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == user_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+local = PrincipalCache(settings.AUTH_PRINCIPAL_CACHE_SIZE, settings.AUTH_PRINCIPAL_CACHE_TTL)
+
+
+def get_cache():
+    return caches[settings.AUTH_PRINCIPAL_CACHE_ALIAS]
+
+
+def _version_key(user_id):
+    return f"{PREFIX}:{user_id}"
+
+
+def publish_version(user_id, version):
+    """Versión vigente, escrita por la señal post_save al commit: pisa lo que haya."""
+    get_cache().set(_version_key(user_id), version, timeout=settings.AUTH_PRINCIPAL_CACHE_TTL)
+
+
+def remember_version(user_id, version):
+    """
+    Versión leída de la BD en un cache miss. Con `add` y no `set`: si una
+    señal publicó una más nueva mientras tanto, gana la publicada. Retorna la
+    versión que quedó en el cache.
+    """
+    cache, key = get_cache(), _version_key(user_id)
+    if cache.add(key, version, timeout=settings.AUTH_PRINCIPAL_CACHE_TTL):
+        return version
+    current = cache.get(key)
+    return version if current is None else current
+
+
+def forget(user_id):
+    get_cache().delete(_version_key(user_id))
+    local.forget(user_id)
+
+
+def resolve(user_id, version):
+    """
+    Usuario `user_id` para un token con `version`. Lanza User.DoesNotExist o
+    StaleToken. Con la versión vigente en cache y el usuario en el LRU: cero
+    queries.
+    """
+    user_id = str(user_id)  # el claim de simplejwt es str; las señales mandan el pk
+    current = get_cache().get(_version_key(user_id))
+    if current is not None:
+        if current != version:
+            raise StaleToken
+        user = local.get((user_id, version))
+        if user is not None:
+            return user
+    user = get_user_model().objects.get(pk=user_id)
+    current = remember_version(user_id, user.auth_version)
+    if user.auth_version != version or current != version:
+        raise StaleToken
+    local.put((user_id, version), user)
+    return user
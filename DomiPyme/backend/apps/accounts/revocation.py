@@ -0,0 +1,186 @@
+# backend/apps/accounts/revocation.py
+"""
+Revocación de refresh tokens (blacklist de simplejwt) sin una query por
+chequeo, y poda por lotes de las tablas de tokens.
+
+Cada proceso tiene un filtro de Bloom con los `jti` en BlacklistedToken que
+todavía no vencieron. La respuesta común ("no está revocado") sale del filtro
+sin tocar la BD; un positivo (revocado o falso positivo, ~REVOCATION_FILTER_ERROR)
+se confirma con la query exacta.
+
+Propagación entre workers: al hacer commit de un BlacklistedToken se hace
+`incr` de una secuencia en el cache compartido (AUTH_PRINCIPAL_CACHE_ALIAS)
+y se guarda el jti bajo ese número. Antes de chequear, cada proceso lee la
+secuencia (una ida al cache) y trae los jti que le faltan con get_many. Si
+faltan entradas (desalojo, cache reiniciado) o el filtro se llenó, se vuelve
+a armar completo desde la BD (`warm()`), que también es lo que pasa en el
+primer chequeo del proceso y cada REVOCATION_FILTER_MAX_AGE segundos (tope
+de desactualización si se perdió algún aviso).
+
+La secuencia solo sirve si el cache es compartido. Con un cache por proceso
+(locmem, el default sin REDIS_URL) un worker no se entera de lo que revocó
+otro, así que `is_revoked` sigue consultando la BD en cada chequeo.
+
+`prune_expired()` (comando `prune_tokens`) borra por lotes cortos los
+tokens vencidos: primero BlacklistedToken, después OutstandingToken, cada
+lote en su propia transacción para no bloquear las tablas mientras se
+refrescan tokens.
+"""
+import hashlib
+import math
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+PREFIX = "auth:revoked"
+SEQUENCE_KEY = f"{PREFIX}:seq"
+MAX_PULL = 500  # más atrasado que esto: warm() completo
+
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(8, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Doble hashing (Kirsch-Mitzenmacher): k posiciones con un solo digest
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, item):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+
+
+class RevocationFilter:
+    """Filtro del proceso más la secuencia compartida hasta la que está al día."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.bloom = None
+            self.seq = 0
+            self.warmed_at = 0.0
+
+    def warm(self):
+        cache = get_cache()
+        seq = cache.get(SEQUENCE_KEY) or 0  # antes de leer la BD: lo posterior se trae después
+        jtis = list(
+            BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+            .values_list("token__jti", flat=True)
+            .iterator(chunk_size=5000)
+        )
+        bloom = BloomFilter(max(settings.REVOCATION_FILTER_CAPACITY, 2 * len(jtis)), settings.REVOCATION_FILTER_ERROR)
+        for jti in jtis:
+            bloom.add(jti)
+        with self._lock:
+            self.bloom, self.seq, self.warmed_at = bloom, seq, time.monotonic()
+        return len(jtis)
+
+    def sync(self):
+        if self.bloom is None or time.monotonic() - self.warmed_at > settings.REVOCATION_FILTER_MAX_AGE:
+            self.warm()
+            return
+        cache = get_cache()
+        current = cache.get(SEQUENCE_KEY) or 0
+        with self._lock:
+            local = self.seq
+        if current == local:
+            return
+        missing = current - local
+        if missing < 0 or missing > MAX_PULL or self.bloom.count >= self.bloom.capacity:
+            self.warm()
+            return
+        keys = [_jti_key(n) for n in range(local + 1, current + 1)]
+        found = cache.get_many(keys)
+        if len(found) < len(keys):
+            self.warm()
+            return
+        with self._lock:
+            for jti in found.values():
+                self.bloom.add(jti)
+            self.seq = max(self.seq, current)
+
+    def might_contain(self, jti):
+        self.sync()
+        return jti in self.bloom
+
+    def add(self, jti):
+        with self._lock:
+            if self.bloom is not None:
+                self.bloom.add(jti)
+
+
+local = RevocationFilter()
+
+
+def get_cache():
+    return caches[settings.AUTH_PRINCIPAL_CACHE_ALIAS]
+
+
+def shared_cache():
+    """False si el cache de la secuencia es de este proceso (los avisos no llegan a otros workers)."""
+    return not isinstance(get_cache(), (LocMemCache, DummyCache))
+
+
+def _jti_key(n):
+    return f"{PREFIX}:{n}"
+
+
+def publish(jti):
+    """Avisa a los demás procesos (llamar después del commit del BlacklistedToken)."""
+    local.add(jti)
+    cache = get_cache()
+    cache.add(SEQUENCE_KEY, 0, timeout=None)
+    n = cache.incr(SEQUENCE_KEY)
+    # Vive lo mismo que un refresh token: después el jti ya no sirve
+    lifetime = settings.SIMPLE_JWT["REFRESH_TOKEN_LIFETIME"].total_seconds()
+    cache.set(_jti_key(n), jti, timeout=int(lifetime))
+
+
+def is_revoked(jti):
+    """
+    True si el jti está en la blacklist. Sin queries cuando el filtro dice que
+    no y el cache es compartido.
+    """
+    if shared_cache() and not local.might_contain(jti):
+        return False
+    return BlacklistedToken.objects.filter(token__jti=jti).exists()
+
+
+def _delete_in_batches(model, filters, batch_size):
+    deleted = 0
+    while True:
+        ids = list(model.objects.filter(**filters).values_list("pk", flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += model.objects.filter(pk__in=ids).delete()[0]
+
+
+def prune_expired(batch_size=1000, now=None):
+    """
+    Borra por lotes los tokens vencidos. Retorna (blacklisted, outstanding)
+    borrados. Un token vencido no pasa la verificación de `exp` aunque no esté
+    en la blacklist, así que no hace falta conservarlo.
+    """
+    now = now or timezone.now()
+    blacklisted = _delete_in_batches(BlacklistedToken, {"token__expires_at__lt": now}, batch_size)
+    outstanding = _delete_in_batches(OutstandingToken, {"expires_at__lt": now}, batch_size)
+    return blacklisted, outstanding
@@ -1,7 +1,10 @@
-from django.contrib.auth import get_user_model, authenticate
+from django.contrib.auth import get_user_model
 from rest_framework import serializers
 from django.utils.translation import gettext_lazy as _
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer as BaseTokenRefreshSerializer
+
+from . import hashing, tokens
 
 User = get_user_model()
 
@@ -22,10 +25,10 @@ class RegisterSerializer(serializers.ModelSerializer):
         return value
 
     def create(self, validated_data):
-        email = validated_data.get("email")
+        # Un hash (en el pool de apps.accounts.hashing) y un INSERT
         password = validated_data.pop("password")
-        user = User.objects.create_user(email=email, password=password, **{k:v for k,v in validated_data.items() if k!='email'})
-        user.set_password(password)
+        email = User.objects.normalize_email(validated_data.pop("email"))
+        user = User(email=email, password=hashing.make_password(password), **validated_data)
         user.save()
         return user
 
@@ -37,7 +40,7 @@ class CustomTokenObtainSerializer(serializers.Serializer):
         email = attrs.get("email")
         password = attrs.get("password")
         if email and password:
-            user = authenticate(username=email, password=password)
+            user = hashing.authenticate(email, password)
             if not user:
                 msg = _("No se pudo autenticar con las credenciales proporcionadas.")
                 raise serializers.ValidationError(msg, code="authorization")
@@ -59,3 +62,7 @@ class PasswordResetConfirmSerializer(serializers.Serializer):
     def validate_new_password(self, value):
         validate_password(value)
         return value
+
+class TokenRefreshSerializer(BaseTokenRefreshSerializer):
+    # SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"]: blacklist por apps.accounts.revocation
+    token_class = tokens.RefreshToken
@@ -0,0 +1,32 @@
+# backend/apps/accounts/signals.py
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+from . import principals, revocation
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def publish_auth_version(sender, instance, created=False, **kwargs):
+    # Al commit: antes otro request podría leer la fila vieja y volver a
+    # publicar la versión anterior
+    user_id, version = instance.pk, instance.auth_version
+    principals.local.forget(user_id)
+    transaction.on_commit(lambda: principals.publish_version(user_id, version))
+
+
+@receiver(post_delete, sender=User)
+def forget_principal(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(lambda: principals.forget(user_id))
+
+
+@receiver(post_save, sender=BlacklistedToken)
+def publish_revocation(sender, instance, created=False, **kwargs):
+    if created:
+        jti = instance.token.jti
+        transaction.on_commit(lambda: revocation.publish(jti))
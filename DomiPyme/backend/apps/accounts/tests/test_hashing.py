@@ -0,0 +1,101 @@
+import threading
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import PBKDF2PasswordHasher
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts import hashing
+
+User = get_user_model()
+PASSWORD = "Clave-segura-123"
+
+
+@pytest.fixture
+def hashes():
+    # Cuenta los PBKDF2 de verdad, no solo los que pasan por el pool
+    with mock.patch.object(PBKDF2PasswordHasher, "encode", autospec=True,
+                           side_effect=PBKDF2PasswordHasher.encode) as encode:
+        yield encode
+
+
+def _writes(ctx):
+    return [q["sql"] for q in ctx.captured_queries if q["sql"].startswith(("INSERT", "UPDATE"))]
+
+
+def _login(email, password=PASSWORD):
+    return APIClient().post(reverse("accounts:token_obtain_pair"), {"email": email, "password": password})
+
+
+def test_register_hashes_once_and_inserts_once(db, hashes):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = APIClient().post(reverse("accounts:register"),
+                                {"email": "nuevo@EJEMPLO.com", "password": PASSWORD, "first_name": "Ana"})
+    assert resp.status_code == 201, resp.data
+    assert hashes.call_count == 1
+    assert len(_writes(ctx)) == 1
+
+    user = User.objects.get()
+    assert (user.email, user.first_name, user.auth_version) == ("nuevo@ejemplo.com", "Ana", 0)
+    assert user.check_password(PASSWORD)
+
+
+def test_login_pays_one_hash_whatever_the_outcome(db, hashes):
+    User.objects.create_user(email="login@test.com", password=PASSWORD)
+    User.objects.create_user(email="inactivo@test.com", password=PASSWORD, is_active=False)
+    hashes.reset_mock()
+
+    assert _login("login@test.com").status_code == 200
+    assert _login("login@test.com", "otra-clave").status_code == 400
+    assert _login("nadie@test.com").status_code == 400
+    assert _login("inactivo@test.com").status_code == 400
+    assert hashes.call_count == 4
+
+
+def test_login_upgrades_outdated_hash_without_invalidating_tokens(db):
+    user = User.objects.create_user(email="viejo@test.com")
+    old = PBKDF2PasswordHasher().encode(PASSWORD, "salvieja", iterations=1000)
+    User.objects.filter(pk=user.pk).update(password=old)
+
+    with CaptureQueriesContext(connection) as ctx:
+        assert _login("viejo@test.com").status_code == 200
+    user.refresh_from_db()
+    assert user.password != old and user.check_password(PASSWORD)
+    assert user.auth_version == 0
+    assert len([sql for sql in _writes(ctx) if "accounts_user" in sql]) == 1
+
+
+def test_pool_bounds_concurrent_hashes():
+    pool = hashing.HashPool(workers=1, queue=0, wait=0.05)
+    started, release = threading.Event(), threading.Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "listo"
+
+    result = []
+    worker = threading.Thread(target=lambda: result.append(pool.run(slow)))
+    worker.start()
+    started.wait(5)
+    with pytest.raises(hashing.Busy):
+        pool.run(str, "sin cupo")
+    release.set()
+    worker.join(5)
+    assert result == ["listo"]
+    assert pool.run(str, "con cupo") == "con cupo"
+    assert pool.count == 1  # el rechazado no cuenta; el otro hilo lleva su propia cuenta
+
+
+def test_busy_pool_answers_503(db, monkeypatch):
+    pool = hashing.HashPool(workers=1, queue=0, wait=0)
+    pool._slots.acquire()
+    monkeypatch.setattr(hashing, "pool", pool)
+    resp = APIClient().post(reverse("accounts:register"), {"email": "ola@test.com", "password": PASSWORD})
+    assert resp.status_code == 503
+    assert resp.data["detail"].code == "hashing_busy"
+    assert not User.objects.exists()
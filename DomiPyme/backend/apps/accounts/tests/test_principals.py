@@ -0,0 +1,119 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.contrib.auth.tokens import PasswordResetTokenGenerator
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.accounts import principals
+
+User = get_user_model()
+PASSWORD = "Clave-segura-123"
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="principal@test.com", password=PASSWORD)
+
+
+def _login(email="principal@test.com", password=PASSWORD):
+    resp = APIClient().post(reverse("accounts:token_obtain_pair"), {"email": email, "password": password})
+    assert resp.status_code == 200, resp.data
+    return resp.data["access"]
+
+
+def _me(access):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("accounts:me"))
+    return resp, len(ctx.captured_queries)
+
+
+def test_me_is_served_from_the_principal_cache(user, django_capture_on_commit_callbacks):
+    access = _login()
+    resp, queries = _me(access)
+    assert resp.status_code == 200 and resp.data["email"] == user.email
+    resp, queries = _me(access)
+    assert resp.status_code == 200 and queries == 0
+
+    # Cambios que no son de AUTH_FIELDS no invalidan el token
+    with django_capture_on_commit_callbacks(execute=True):
+        user.first_name = "Ana"
+        user.save()
+    resp, _ = _me(access)
+    assert resp.status_code == 200 and resp.data["first_name"] == "Ana"
+
+
+def test_password_reset_revokes_old_tokens(user, django_capture_on_commit_callbacks):
+    access = _login()
+    assert _me(access)[0].status_code == 200
+    payload = {
+        "uidb64": urlsafe_base64_encode(force_bytes(user.pk)),
+        "token": PasswordResetTokenGenerator().make_token(user),
+        "new_password": "Otra-clave-456",
+    }
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = APIClient().post(reverse("accounts:password-reset-confirm"), payload)
+    assert resp.status_code == 200
+
+    resp, queries = _me(access)
+    assert resp.status_code == 401 and resp.data["code"] == "token_stale"
+    assert queries == 0
+    assert _me(_login(password="Otra-clave-456"))[0].status_code == 200
+
+
+def test_deactivation_and_staff_changes_bump_the_version(user, django_capture_on_commit_callbacks):
+    access = _login()
+    assert _me(access)[0].status_code == 200
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_staff = True
+        user.save(update_fields=["is_staff"])
+    user.refresh_from_db()
+    assert user.auth_version == 1
+    assert _me(access)[0].status_code == 401
+
+    staff_access = _login()
+    assert _me(staff_access)[0].data["is_staff"] is True
+    with django_capture_on_commit_callbacks(execute=True):
+        user.is_active = False
+        user.save()
+    assert _me(staff_access)[0].status_code == 401
+
+
+def test_tokens_without_the_claim_count_as_version_zero(user):
+    legacy = str(RefreshToken.for_user(user).access_token)
+    resp, _ = _me(legacy)
+    assert resp.status_code == 200
+
+    # La versión vigente ya no está en el cache (otro worker, desalojo): se
+    # relee de la BD y el token viejo se rechaza igual
+    User.objects.filter(pk=user.pk).update(auth_version=3)
+    from django.core.cache import caches
+    caches["default"].clear()
+    resp, queries = _me(legacy)
+    assert resp.status_code == 401 and queries == 1
+
+
+def test_cache_miss_does_not_overwrite_a_newer_published_version(user):
+    access = _login()
+    principals.get_cache().clear()
+    principals.local.clear()
+    # Mientras este request leía la fila vieja, otro worker guardó y publicó v1
+    real_get = User.objects.get
+
+    def get_then_publish(*args, **kwargs):
+        stale = real_get(*args, **kwargs)
+        principals.publish_version(str(user.pk), 1)
+        return stale
+
+    with mock.patch.object(User.objects, "get", side_effect=get_then_publish):
+        resp, _ = _me(access)
+    assert resp.status_code == 401
+    assert principals.get_cache().get(principals._version_key(str(user.pk))) == 1
@@ -0,0 +1,108 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from apps.accounts import revocation, tokens
+
+User = get_user_model()
+
+
+@pytest.fixture
+def user(db):
+    return User.objects.create_user(email="revocado@test.com", password="Clave-segura-123")
+
+
+def _refresh(refresh):
+    return APIClient().post(reverse("accounts:token_refresh"), {"refresh": refresh})
+
+
+def test_rotation_blacklists_and_rejects_reuse(user, django_capture_on_commit_callbacks):
+    first = str(tokens.for_user(user))
+    with django_capture_on_commit_callbacks(execute=True):
+        resp = _refresh(first)
+    assert resp.status_code == 200
+    assert OutstandingToken.objects.count() == 2 and BlacklistedToken.objects.count() == 1
+
+    assert _refresh(first).status_code == 401
+    with django_capture_on_commit_callbacks(execute=True):
+        assert _refresh(resp.data["refresh"]).status_code == 200
+
+
+def test_not_revoked_needs_no_query_with_a_shared_cache(user, monkeypatch):
+    monkeypatch.setattr(revocation, "shared_cache", lambda: True)
+    revocation.local.warm()
+    with CaptureQueriesContext(connection) as ctx:
+        assert revocation.is_revoked("no-existe") is False
+    assert len(ctx.captured_queries) == 0
+
+
+def test_process_local_cache_keeps_the_database_check(user):
+    # locmem: lo que revoca otro worker no llega por la secuencia
+    assert not revocation.shared_cache()
+    revocation.local.warm()
+    other = tokens.for_user(user)
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=other["jti"]))  # sin publish
+    assert revocation.is_revoked(other["jti"]) is True
+
+
+def test_filter_is_rewarmed_after_max_age(user, settings):
+    settings.REVOCATION_FILTER_MAX_AGE = -1  # siempre vencido
+    flt = revocation.RevocationFilter()
+    flt.warm()
+    refresh = tokens.for_user(user)
+    BlacklistedToken.objects.create(token=OutstandingToken.objects.get(jti=refresh["jti"]))  # sin publish
+    assert flt.might_contain(refresh["jti"])
+
+
+def test_other_workers_pick_up_revocations_from_the_cache(user, django_capture_on_commit_callbacks):
+    other = revocation.RevocationFilter()  # el filtro de otro proceso
+    other.warm()
+    refresh = tokens.for_user(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        refresh.blacklist()
+    with CaptureQueriesContext(connection) as ctx:
+        assert other.might_contain(refresh["jti"])
+    assert len(ctx.captured_queries) == 0
+
+    # Entradas desalojadas: vuelve a armarse desde la BD
+    another = tokens.for_user(user)
+    with django_capture_on_commit_callbacks(execute=True):
+        another.blacklist()
+    revocation.get_cache().delete(revocation._jti_key(2))
+    assert other.might_contain(another["jti"])
+
+
+def test_bloom_filter_false_positive_rate():
+    bloom = revocation.BloomFilter(1000, 0.01)
+    for i in range(1000):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(1000))
+    false_positives = sum(f"otro-{i}" in bloom for i in range(10000))
+    assert false_positives < 200
+
+
+def test_prune_deletes_expired_tokens_in_batches(user):
+    now = timezone.now()
+    for i in range(5):
+        expired = OutstandingToken.objects.create(
+            user=user, jti=f"viejo-{i}", token="x", expires_at=now - timedelta(minutes=i + 1)
+        )
+        if i % 2:
+            BlacklistedToken.objects.create(token=expired)
+    alive = OutstandingToken.objects.create(user=user, jti="vigente", token="x", expires_at=now + timedelta(days=1))
+    BlacklistedToken.objects.create(token=alive)
+
+    out = StringIO()
+    call_command("prune_tokens", "--batch-size", "2", stdout=out)
+    assert "5 emitidos, 2 en blacklist" in out.getvalue()
+    assert list(OutstandingToken.objects.values_list("jti", flat=True)) == ["vigente"]
+    assert BlacklistedToken.objects.count() == 1
@@ -0,0 +1,82 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts import hashing, throttling
+
+User = get_user_model()
+PASSWORD = "Clave-segura-123"
+
+
+def rates(**overrides):
+    return override_settings(REST_FRAMEWORK={**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": overrides})
+
+
+def _login(email, password=PASSWORD, ip="10.0.0.1", **extra):
+    return APIClient().post(reverse("accounts:token_obtain_pair"), {"email": email, "password": password},
+                            REMOTE_ADDR=ip, **extra)
+
+
+def test_sliding_window_weighs_the_previous_window():
+    start = 600.0  # inicio de una ventana de 60s
+    assert [throttling.hit("k", 3, 60, start + i) for i in range(3)] == [None] * 3
+    # Cuarto intento: recién entra en la ventana siguiente, cuando esta pese < 2/3
+    assert throttling.hit("k", 3, 60, start + 30) == pytest.approx(30 + 20)
+    # A mitad de la siguiente la anterior (3) todavía pesa 1.5: entran 1, no 2
+    assert throttling.hit("k", 3, 60, start + 90) is None
+    assert throttling.hit("k", 3, 60, start + 90) == pytest.approx(10)
+    assert throttling.hit("k", 3, 60, start + 101) is None
+
+
+@pytest.mark.django_db
+def test_rejected_login_skips_hash_and_database():
+    User.objects.create_user(email="ataque@test.com", password=PASSWORD)
+    with rates(login_ip="2/min"):
+        assert _login("ataque@test.com", "mala-1").status_code == 400
+        assert _login("ataque@test.com", "mala-2").status_code == 400
+        with mock.patch.object(hashing, "authenticate") as authenticate, \
+                CaptureQueriesContext(connection) as ctx:
+            resp = _login("ataque@test.com")
+        assert resp.status_code == 429
+        # Hasta fin de esta ventana y media de la siguiente (2 atendidos pesan hasta ahí)
+        assert 1 <= int(resp["Retry-After"]) <= 90
+        assert not authenticate.called and ctx.captured_queries == []
+        # Otra IP sigue entrando
+        assert _login("ataque@test.com", ip="10.0.0.2").status_code == 200
+    assert throttling.rejections()["login_ip"] == 1
+
+
+@pytest.mark.django_db
+def test_email_limit_holds_across_ips():
+    User.objects.create_user(email="victima@test.com", password=PASSWORD)
+    with rates(login_email="2/min"):
+        for i in range(2):
+            assert _login("victima@test.com", "mala", ip=f"10.1.0.{i}").status_code == 400
+        assert _login("VICTIMA@test.com ", ip="10.1.0.9").status_code == 429
+        User.objects.create_user(email="otra@test.com", password=PASSWORD)
+        assert _login("otra@test.com", ip="10.1.0.9").status_code == 200
+
+    out = StringIO()
+    call_command("throttle_stats", stdout=out)
+    assert out.getvalue().split("\n")[1].split() == ["login_email", "1"]
+
+
+@pytest.mark.django_db
+def test_credential_views_ignore_bearer_and_reset_is_throttled():
+    User.objects.create_user(email="reset@test.com", password=PASSWORD)
+    # Un token roto no hace fallar el login (no hay autenticación en la vista)
+    assert _login("reset@test.com", HTTP_AUTHORIZATION="Bearer basura").status_code == 200
+
+    url = reverse("accounts:password-reset-request")
+    with rates(password_reset_email="1/hour"):
+        assert APIClient().post(url, {"email": "reset@test.com"}).status_code == 200
+        resp = APIClient().post(url, {"email": "reset@test.com"}, REMOTE_ADDR="10.2.0.1")
+        assert resp.status_code == 429 and int(resp["Retry-After"]) > 60
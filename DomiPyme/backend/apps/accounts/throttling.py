@@ -0,0 +1,134 @@
+# backend/apps/accounts/throttling.py
+"""
+Límites de los endpoints de credenciales (login, registro, reset de
+contraseña) por IP y por email, con ventana deslizante.
+
+La ventana deslizante es la aproximación de dos ventanas fijas: por clave hay
+un contador por ventana (`cache.incr`, atómico en locmem y Redis) y el total
+estimado es el de la ventana actual más el de la anterior ponderado por lo
+que falta de ella. Dos claves chicas por identidad, sin la lista de
+timestamps de SimpleRateThrottle (que además se lee y reescribe sin lock).
+Un intento rechazado se descuenta: el límite cuenta intentos atendidos.
+
+Las vistas declaran `throttle_scope` ("login", "register", "password_reset")
+y las tasas salen de DEFAULT_THROTTLE_RATES como `<scope>_ip` /
+`<scope>_email` (None = sin límite). DRF revisa los throttles en `initial()`,
+antes del handler: un rechazo no llega al hash ni a la BD (las vistas de
+credenciales además van sin `authentication_classes`) y responde 429 con
+Retry-After. Cada rechazo suma a `throttle:rejected:<tasa>` en el cache
+(ver `rejections()` y el comando `throttle_stats`).
+"""
+import hashlib
+import logging
+import math
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.settings import api_settings
+from rest_framework.throttling import SimpleRateThrottle
+
+PREFIX = "throttle"
+SCOPES = ("login", "register", "password_reset")
+KINDS = ("ip", "email")
+
+logger = logging.getLogger(__name__)
+
+
+def _cache():
+    return caches[settings.THROTTLE_CACHE_ALIAS]
+
+
+def _incr(cache, key, delta, timeout):
+    cache.add(key, 0, timeout=timeout)
+    try:
+        return cache.incr(key, delta)
+    except ValueError:
+        # Venció entre el add y el incr
+        cache.add(key, max(delta, 0), timeout=timeout)
+        return max(delta, 0)
+
+
+def hit(key, limit, window, now):
+    """
+    Cuenta un intento de `key` en la ventana deslizante. Retorna None si entra
+    o los segundos hasta que entraría uno más.
+    """
+    cache = _cache()
+    current = int(now // window)
+    elapsed = now / window - current
+    slot = f"{PREFIX}:{key}:{current}"
+    count = _incr(cache, slot, 1, 2 * window)
+    previous = cache.get(f"{PREFIX}:{key}:{current - 1}", 0)
+    if count + previous * (1 - elapsed) <= limit:
+        return None
+    _incr(cache, slot, -1, 2 * window)
+    accepted = count - 1
+    if accepted < limit:
+        # Entra en esta ventana cuando la anterior pese lo suficiente menos
+        return (1 - (limit - accepted - 1) / previous - elapsed) * window
+    # Recién en la siguiente, cuando esta pase a ser la anterior
+    return (1 - elapsed + max(0.0, 1 - (limit - 1) / max(accepted, 1))) * window
+
+
+def rejections():
+    """{tasa: rechazos} de todas las tasas de credenciales."""
+    rates = [f"{scope}_{kind}" for scope in SCOPES for kind in KINDS]
+    stored = _cache().get_many([f"{PREFIX}:rejected:{rate}" for rate in rates])
+    return {rate: stored.get(f"{PREFIX}:rejected:{rate}", 0) for rate in rates}
+
+
+class SlidingWindowThrottle(SimpleRateThrottle):
+    """Base: la tasa es `<view.throttle_scope>_<kind>`; las subclases dan la identidad."""
+
+    kind = None
+
+    def __init__(self):
+        # La tasa depende de la vista (como ScopedRateThrottle)
+        self.delay = None
+
+    def get_rate(self):
+        # En vivo y no la copia de SimpleRateThrottle.THROTTLE_RATES (override_settings)
+        return api_settings.DEFAULT_THROTTLE_RATES.get(self.scope)
+
+    def get_ident_value(self, request):
+        raise NotImplementedError
+
+    def allow_request(self, request, view):
+        scope = getattr(view, "throttle_scope", None)
+        if not scope:
+            return True
+        self.scope = f"{scope}_{self.kind}"
+        self.rate = self.get_rate()
+        if self.rate is None:
+            return True
+        limit, window = self.parse_rate(self.rate)
+        ident = self.get_ident_value(request)
+        if not ident:
+            return True
+        digest = hashlib.sha1(ident.encode()).hexdigest()
+        self.delay = hit(f"{self.scope}:{digest}", limit, window, self.timer())
+        if self.delay is None:
+            return True
+        _incr(_cache(), f"{PREFIX}:rejected:{self.scope}", 1, None)
+        logger.info("Throttle %s: rechazado, reintentar en %.0fs", self.scope, self.delay)
+        return False
+
+    def wait(self):
+        return None if self.delay is None else max(math.ceil(self.delay), 1)
+
+
+class IPThrottle(SlidingWindowThrottle):
+    kind = "ip"
+
+    def get_ident_value(self, request):
+        return self.get_ident(request)
+
+
+class EmailThrottle(SlidingWindowThrottle):
+    """Por el email del cuerpo: frena el credential stuffing contra una cuenta desde muchas IPs."""
+
+    kind = "email"
+
+    def get_ident_value(self, request):
+        email = request.data.get("email") if hasattr(request.data, "get") else None
+        return email.strip().lower() if isinstance(email, str) else None
@@ -0,0 +1,51 @@
+# backend/apps/accounts/tokens.py
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import RefreshToken as BaseRefreshToken
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from . import revocation
+
+AUTH_VERSION_CLAIM = "auth_version"
+
+
+class RefreshToken(BaseRefreshToken):
+    """
+    RefreshToken de simplejwt con el chequeo de blacklist por el filtro de
+    `revocation` y sin los User.objects.get() de blacklist()/outstand(): el
+    id sale del claim (TokenRefreshSerializer ya validó el usuario).
+    """
+
+    def check_blacklist(self):
+        if revocation.is_revoked(self.payload[api_settings.JTI_CLAIM]):
+            raise TokenError(_("Token is blacklisted"))
+
+    def _outstanding_fields(self):
+        return {
+            "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+            "created_at": self.current_time,
+            "token": str(self),
+            "expires_at": datetime_from_epoch(self.payload["exp"]),
+        }
+
+    def blacklist(self):
+        token, _ = OutstandingToken.objects.get_or_create(
+            jti=self.payload[api_settings.JTI_CLAIM], defaults=self._outstanding_fields()
+        )
+        return BlacklistedToken.objects.get_or_create(token=token)
+
+    def outstand(self):
+        # Se llama después de set_jti(): el jti es nuevo, no hace falta get_or_create
+        return OutstandingToken.objects.create(jti=self.payload[api_settings.JTI_CLAIM], **self._outstanding_fields())
+
+
+def for_user(user):
+    """
+    Refresh token con la `auth_version` actual del usuario. El access token
+    (y los que salgan de /token/refresh/) copian el claim.
+    """
+    refresh = RefreshToken.for_user(user)
+    refresh[AUTH_VERSION_CLAIM] = user.auth_version
+    return refresh
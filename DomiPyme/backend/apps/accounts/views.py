@@ -8,51 +8,70 @@ from .serializers import (
     PasswordResetRequestSerializer,
     PasswordResetConfirmSerializer,
 )
-from rest_framework_simplejwt.tokens import RefreshToken
+from apps.outbox import delivery as outbox
+from . import tokens
+from .throttling import EmailThrottle, IPThrottle
 from rest_framework.views import APIView
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
 from django.contrib.auth.tokens import PasswordResetTokenGenerator
-from django.core.mail import send_mail
 from django.urls import reverse
 from django.conf import settings
 
 User = get_user_model()
 token_generator = PasswordResetTokenGenerator()
 
-class RegisterView(generics.CreateAPIView):
+
+class CredentialThrottleMixin:
+    """
+    Límites por IP y por email (apps.accounts.throttling), revisados antes de
+    tocar la BD o el hash. Sin autenticación: un Bearer en estos endpoints no
+    cuesta una búsqueda de usuario.
+    """
+    authentication_classes = []
+    throttle_classes = [IPThrottle, EmailThrottle]
+
+
+class RegisterView(CredentialThrottleMixin, generics.CreateAPIView):
     serializer_class = RegisterSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_scope = "register"
 
-class ObtainTokenPairView(APIView):
+class ObtainTokenPairView(CredentialThrottleMixin, APIView):
     """
     Endpoint simple que devuelve access + refresh usando email + password.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_scope = "login"
 
     def post(self, request, *args, **kwargs):
         serializer = CustomTokenObtainSerializer(data=request.data, context={'request': request})
         serializer.is_valid(raise_exception=True)
         user = serializer.validated_data["user"]
-        refresh = RefreshToken.for_user(user)
+        refresh = tokens.for_user(user)
         return Response({"access": str(refresh.access_token), "refresh": str(refresh)})
 
 class MeView(generics.RetrieveAPIView):
+    """
+    Usuario del token. Sale del cache de principals (CachedJWTAuthentication):
+    sin queries mientras la versión del token sea la vigente.
+    """
     serializer_class = UserSerializer
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
         return self.request.user
 
-class PasswordResetRequestView(APIView):
+class PasswordResetRequestView(CredentialThrottleMixin, APIView):
     permission_classes = [permissions.AllowAny]
+    throttle_scope = "password_reset"
 
     def post(self, request, *args, **kwargs):
         serializer = PasswordResetRequestSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         email = serializer.validated_data["email"]
         try:
-            user = User.objects.get(email__iexact=email)
+            user = User.objects.by_email(email).get()
         except User.DoesNotExist:
             # No revelamos si existe o no por seguridad; retornamos 200
             return Response({"detail": "Si el correo existe, se enviaron instrucciones."}, status=status.HTTP_200_OK)
@@ -64,10 +83,10 @@ class PasswordResetRequestView(APIView):
         frontend_base = getattr(settings, "FRONTEND_BASE_URL", "http://localhost:5173")
         reset_url = f"{frontend_base}/reset-password/?uid={uid}&token={token}"
 
-        # En dev usaremos console backend, en prod enviar real
+        # Solo se encola: lo envía `manage.py send_outbox` (el request no espera al SMTP)
         subject = "Restablecer contraseña - DomiPyme"
         message = f"Hola,\n\nPara restablecer tu contraseña, ingresa al siguiente enlace:\n\n{reset_url}\n\nSi no solicitaste esto, ignora este correo."
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [user.email], fail_silently=False)
+        outbox.enqueue(subject, message, [user.email], kind="password_reset")
 
         return Response({"detail": "Si el correo existe, se enviaron instrucciones."}, status=status.HTTP_200_OK)
 
@@ -90,6 +109,7 @@ class PasswordResetConfirmView(APIView):
         if not token_generator.check_token(user, token):
             return Response({"detail": "Token inválido o expirado."}, status=status.HTTP_400_BAD_REQUEST)
 
+        # Sube auth_version (User.save): los tokens emitidos antes dejan de valer
         user.set_password(new_password)
         user.save()
         return Response({"detail": "Contraseña cambiada correctamente."}, status=status.HTTP_200_OK)
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.benchmarks import runner, serialization
+from apps.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Compara ModelSerializer contra ValuesSerializer en los listados del catálogo "
+        "sobre una base de prueba sembrada. Falla si las salidas no son idénticas."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--cases", default=",".join(serialization.CASES),
+                            help="Lista separada por comas (default: todos)")
+        parser.add_argument("--rows", type=int, default=500, help="Filas por caso")
+        parser.add_argument("--repeat", type=int, default=5, help="Repeticiones (se toma la mejor)")
+        parser.add_argument("--shops", type=int, default=20)
+        parser.add_argument("--products-per-shop", type=int, default=100)
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["cases"].split(",") if n.strip()]
+        unknown = set(names) - set(serialization.CASES)
+        if unknown:
+            raise CommandError(f"Casos desconocidos: {', '.join(sorted(unknown))}")
+
+        with runner.test_database():
+            seed(options["shops"], options["products_per_shop"], customers=1)
+            results = {
+                name: serialization.run_case(name, options["rows"], options["repeat"]) for name in names
+            }
+        self.stdout.write(serialization.format_results(results))
+        different = [name for name, r in results.items() if not r["identical"]]
+        if different:
+            raise CommandError(f"Salidas distintas en: {', '.join(different)}")
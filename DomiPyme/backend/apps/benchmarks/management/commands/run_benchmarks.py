@@ -0,0 +1,96 @@
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from apps.benchmarks import runner
+from apps.benchmarks.seed import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Benchmark de carga de la API sobre una base de prueba sembrada (no toca la base real). "
+        "Falla si hay regresiones frente al baseline JSON del motor."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--scenarios", default=",".join(runner.SCENARIOS),
+                            help="Lista separada por comas (default: todos)")
+        parser.add_argument("--requests", type=int, default=200, help="Requests por escenario")
+        parser.add_argument("--concurrency", type=int, default=8)
+        parser.add_argument("--shops", type=int, default=20)
+        parser.add_argument("--products-per-shop", type=int, default=100)
+        parser.add_argument("--customers", type=int, default=50)
+        parser.add_argument("--baseline", default=None,
+                            help="Archivo baseline (default: apps/benchmarks/baselines/<motor>.json)")
+        parser.add_argument("--save-baseline", action="store_true", help="Guarda el resultado como baseline")
+        parser.add_argument("--tolerance", type=float, default=0.25,
+                            help="Margen para latencia y throughput (0.25 = 25%%)")
+        parser.add_argument("--no-timing", action="store_true",
+                            help="Solo comparar errores y queries/request (para máquinas distintas al baseline)")
+        parser.add_argument("--output", default=None, help="Escribe el reporte JSON en este archivo")
+
+    def handle(self, *args, **options):
+        names = [n.strip() for n in options["scenarios"].split(",") if n.strip()]
+        unknown = set(names) - set(runner.SCENARIOS)
+        if unknown:
+            raise CommandError(f"Escenarios desconocidos: {', '.join(sorted(unknown))}")
+        if options["concurrency"] < 1 or options["requests"] < options["concurrency"]:
+            raise CommandError("--requests debe ser >= --concurrency >= 1")
+
+        # Todos los clientes salen de 127.0.0.1: sin los throttles de credenciales
+        # (apps.accounts.throttling) `token` y `register` medirían 429
+        unthrottled = {**settings.REST_FRAMEWORK, "DEFAULT_THROTTLE_RATES": {}}
+        with runner.test_database(), override_settings(DEBUG=False, ALLOWED_HOSTS=["127.0.0.1", "localhost"],
+                                                       REST_FRAMEWORK=unthrottled):
+            report = self.run(names, options)
+
+        path = options["baseline"] or runner.baseline_path(report["vendor"])
+        baseline = runner.load_baseline(path)
+        self.stdout.write(runner.format_report(report, baseline))
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+        if options["save_baseline"]:
+            runner.save_baseline(path, report)
+            self.stdout.write(self.style.SUCCESS(f"Baseline guardado en {path}"))
+            return
+        check_timing = not options["no_timing"]
+        if baseline is None:
+            self.stdout.write(self.style.WARNING(f"Sin baseline en {path}; usa --save-baseline para crearlo."))
+        elif baseline.get("config") != report["config"]:
+            # Con otro volumen de datos o concurrencia los tiempos no son comparables
+            self.stdout.write(self.style.WARNING("Configuración distinta a la del baseline: solo se comparan queries."))
+            check_timing = False
+        problems = runner.compare(report, baseline, options["tolerance"], check_timing=check_timing)
+        if problems:
+            raise CommandError("Regresiones:\n  " + "\n  ".join(problems))
+        self.stdout.write(self.style.SUCCESS("Sin regresiones."))
+
+    def run(self, names, options):
+        data = seed(options["shops"], options["products_per_shop"], options["customers"])
+        data["tokens"] = runner.issue_tokens(data["customers"])
+        server, base_url = runner.serve()
+        try:
+            scenarios = {}
+            for name in names:
+                self.stdout.write(f"-> {name}")
+                scenarios[name] = runner.run_scenario(base_url, name, data, options["requests"],
+                                                      options["concurrency"])
+        finally:
+            server.shutdown()
+            server.server_close()
+        return {
+            "vendor": connection.vendor,
+            "config": {
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "shops": options["shops"],
+                "products_per_shop": options["products_per_shop"],
+                "customers": options["customers"],
+            },
+            "scenarios": scenarios,
+        }
@@ -0,0 +1,270 @@
+# backend/apps/benchmarks/runner.py
+"""
+Benchmark de punta a punta de la API.
+
+Levanta la aplicación WSGI real en un servidor HTTP con hilos sobre una base de
+datos de prueba (SQLite en archivo o el Postgres configurado), la siembra con
+`seed` y la golpea con N clientes concurrentes (`requests.Session`, keep-alive).
+Por escenario mide p50/p95/p99, requests/s, errores, queries por request (el
+servidor las cuenta con `execute_wrapper` y las devuelve en una cabecera) y
+hashes de contraseña por request (`apps.accounts.hashing.pool.count`, en otra
+cabecera). El requests/s de `register` son los registros por segundo.
+
+Los resultados se comparan contra un baseline JSON por motor de base de datos
+(`baselines/<vendor>.json`): más queries o hashes por request, errores, o latencia /
+throughput peor que la tolerancia cuentan como regresión.
+"""
+import json
+import math
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from pathlib import Path
+from socketserver import ThreadingMixIn
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+import requests
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import setup_databases, teardown_databases
+
+from apps.accounts import hashing, tokens
+from .seed import PASSWORD
+
+BASELINE_DIR = Path(__file__).resolve().parent / "baselines"
+QUERY_HEADER = "X-Bench-Queries"
+HASH_HEADER = "X-Bench-Hashes"
+
+
+# --- servidor -----------------------------------------------------------------
+
+@contextmanager
+def test_database():
+    """Base de prueba creada y destruida alrededor del benchmark (no toca la real)."""
+    db = settings.DATABASES["default"]
+    if connection.vendor == "sqlite":
+        # Base en archivo: los hilos del servidor comparten la misma base
+        db.setdefault("TEST", {})
+        if not db["TEST"].get("NAME"):
+            db["TEST"]["NAME"] = str(Path(tempfile.gettempdir()) / "domipyme_bench.sqlite3")
+        db.setdefault("OPTIONS", {})["timeout"] = 30
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        yield
+    finally:
+        teardown_databases(old_config, verbosity=0)
+
+
+class ThreadingServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    request_queue_size = 128
+
+
+class QuietHandler(WSGIRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+
+def counting_app(app):
+    """Envuelve la app WSGI para contar las queries y los hashes de cada request."""
+    def wrapped(environ, start_response):
+        count = [0]
+        hashing.pool.reset_count()
+
+        def wrapper(execute, sql, params, many, context):
+            count[0] += 1
+            return execute(sql, params, many, context)
+
+        def start(status, headers, exc_info=None):
+            extra = [(QUERY_HEADER, str(count[0])), (HASH_HEADER, str(hashing.pool.count))]
+            return start_response(status, headers + extra, exc_info)
+
+        with connection.execute_wrapper(wrapper):
+            return app(environ, start)
+    return wrapped
+
+
+def serve(host="127.0.0.1", port=0):
+    """Servidor en un hilo. Retorna (servidor, url base)."""
+    server = make_server(host, port, counting_app(get_wsgi_application()),
+                         server_class=ThreadingServer, handler_class=QuietHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_port}"
+
+
+# --- escenarios ---------------------------------------------------------------
+
+def _bearer(token):
+    return {"Authorization": f"Bearer {token}"}
+
+
+def products_list(data, rng):
+    offset = rng.randrange(0, max(len(data["products"]) - 12, 1))
+    return "GET", f"/api/products/?limit=12&offset={offset}", None, {}
+
+
+def shop_detail(data, rng):
+    return "GET", f"/api/{rng.choice(data['shops'])}/", None, {}
+
+
+def checkout(data, rng):
+    lines = rng.sample(data["products"], 2)
+    body = {"items": [{"product": pid, "price": price, "qty": 1} for pid, price in lines]}
+    return "POST", "/api/checkout/", body, _bearer(rng.choice(data["tokens"]))
+
+
+def token(data, rng):
+    body = {"email": rng.choice(data["customers"]), "password": PASSWORD}
+    return "POST", "/api/auth/token/", body, {}
+
+
+def register(data, rng):
+    body = {"email": f"bench-{rng.getrandbits(64):016x}@bench.test", "password": PASSWORD}
+    return "POST", "/api/auth/register/", body, {}
+
+
+SCENARIOS = {
+    "products_list": products_list,
+    "shop_detail": shop_detail,
+    "checkout": checkout,
+    "token": token,
+    "register": register,
+}
+EXPECTED_STATUS = {"products_list": 200, "shop_detail": 200, "checkout": 201, "token": 200, "register": 201}
+
+
+def issue_tokens(emails):
+    """Access tokens para el escenario de checkout (sin pasar por el login)."""
+    from django.contrib.auth import get_user_model
+    users = get_user_model().objects.filter(email__in=emails)
+    return [str(tokens.for_user(user).access_token) for user in users]
+
+
+# --- medición -----------------------------------------------------------------
+
+def percentile(values, pct):
+    """Percentil por rango más cercano sobre una lista ordenada."""
+    if not values:
+        return 0.0
+    rank = max(math.ceil(pct / 100 * len(values)), 1)
+    return values[rank - 1]
+
+
+def summarize(samples, elapsed):
+    """samples: [(latencia_s, status, queries, hashes, ok)] -> métricas del escenario."""
+    latencies = sorted(s[0] * 1000 for s in samples)
+    queries = [s[2] for s in samples if s[2] is not None]
+    hashes = [s[3] for s in samples if s[3] is not None]
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for s in samples if not s[4]),
+        "rps": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50), 2),
+        "p95_ms": round(percentile(latencies, 95), 2),
+        "p99_ms": round(percentile(latencies, 99), 2),
+        "queries_per_request": round(statistics.mean(queries), 2) if queries else 0.0,
+        "hashes_per_request": round(statistics.mean(hashes), 2) if hashes else 0.0,
+    }
+
+
+def run_scenario(base_url, name, data, requests_count, concurrency, warmup=5, seed=1):
+    build = SCENARIOS[name]
+    expected = EXPECTED_STATUS[name]
+    per_worker = [requests_count // concurrency + (i < requests_count % concurrency) for i in range(concurrency)]
+
+    def worker(index, count):
+        rng = random.Random(seed * 1000 + index)
+        session = requests.Session()
+        samples = []
+        for n in range(count + (warmup if index == 0 else 0)):
+            method, path, body, headers = build(data, rng)
+            start = time.perf_counter()
+            resp = session.request(method, base_url + path, json=body, headers=headers, timeout=60)
+            elapsed = time.perf_counter() - start
+            if index == 0 and n < warmup:
+                continue
+            queries, hashes = resp.headers.get(QUERY_HEADER), resp.headers.get(HASH_HEADER)
+            samples.append((elapsed, resp.status_code, int(queries) if queries else None,
+                            int(hashes) if hashes else None, resp.status_code == expected))
+        session.close()
+        return samples
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(worker, range(concurrency), per_worker))
+    elapsed = time.perf_counter() - start
+    return summarize([s for samples in results for s in samples], elapsed)
+
+
+# --- baselines ----------------------------------------------------------------
+
+def baseline_path(vendor, directory=None):
+    return Path(directory or BASELINE_DIR) / f"{vendor}.json"
+
+
+def load_baseline(path):
+    path = Path(path)
+    if not path.exists():
+        return None
+    return json.loads(path.read_text())
+
+
+def save_baseline(path, report):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+
+
+def compare(report, baseline, tolerance=0.25, check_timing=True):
+    """
+    Lista de regresiones (strings) del reporte frente al baseline. Las queries
+    y los hashes por request se comparan exactos; latencia y throughput con
+    `tolerance`.
+    """
+    problems = []
+    for name, current in report["scenarios"].items():
+        if current["errors"]:
+            problems.append(f"{name}: {current['errors']} requests fallidos")
+        base = (baseline or {}).get("scenarios", {}).get(name)
+        if base is None:
+            continue
+        if current["queries_per_request"] > base["queries_per_request"] + 0.05:
+            problems.append(
+                f"{name}: queries/request {current['queries_per_request']} > {base['queries_per_request']}"
+            )
+        if current.get("hashes_per_request", 0) > base.get("hashes_per_request", math.inf) + 0.05:
+            problems.append(
+                f"{name}: hashes/request {current['hashes_per_request']} > {base['hashes_per_request']}"
+            )
+        if not check_timing:
+            continue
+        for metric in ("p95_ms", "p99_ms"):
+            limit = base[metric] * (1 + tolerance)
+            if current[metric] > limit:
+                problems.append(f"{name}: {metric} {current[metric]} > {round(limit, 2)}")
+        floor = base["rps"] * (1 - tolerance)
+        if current["rps"] < floor:
+            problems.append(f"{name}: rps {current['rps']} < {round(floor, 1)}")
+    return problems
+
+
+def format_report(report, baseline=None):
+    cols = ("requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "queries_per_request", "hashes_per_request")
+    lines = [f"{'escenario':<15}" + "".join(f"{c:>21}" for c in cols)]
+    for name, current in report["scenarios"].items():
+        base = (baseline or {}).get("scenarios", {}).get(name, {})
+        cells = []
+        for col in cols:
+            value = f"{current[col]}"
+            if col in base:
+                value += f" ({base[col]})"
+            cells.append(f"{value:>21}")
+        lines.append(f"{name:<15}" + "".join(cells))
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+# backend/apps/benchmarks/seed.py
+"""
+Datos de carga para los benchmarks: comercios, productos (de los comercios y
+del catálogo de `apps.products`, que es el que sirve /api/products/) y clientes
+creados con bulk_create (un solo hash de contraseña para todos los usuarios).
+"""
+import random
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+
+from apps.products.models import Product as CatalogProduct
+from apps.shops.models import Product, Shop
+from apps.shops.signals import products_changed
+
+User = get_user_model()
+
+PASSWORD = "bench-pass-1234"
+WORDS = (
+    "arroz", "café", "leche", "pan", "queso", "arepa", "panela", "huevos", "jugo", "chocolate",
+    "aceite", "frijol", "lenteja", "azúcar", "sal", "harina", "galletas", "yogur", "mantequilla", "atún",
+)
+
+
+def seed(shops=20, products_per_shop=100, customers=50, seed=1):
+    """
+    Crea el dataset y retorna
+    {"shops": [slug, ...], "products": [(id, precio), ...], "customers": [email, ...]}.
+    """
+    rng = random.Random(seed)
+    hashed = make_password(PASSWORD)
+    owners = User.objects.bulk_create([
+        User(email=f"owner{i}@bench.local", password=hashed) for i in range(shops)
+    ])
+    buyers = User.objects.bulk_create([
+        User(email=f"customer{i}@bench.local", password=hashed) for i in range(customers)
+    ])
+    shop_rows = Shop.objects.bulk_create([
+        Shop(owner=owner, name=f"Tienda {i}", slug=f"tienda-bench-{i}", address=f"Calle {i} # {i}-{i}")
+        for i, owner in enumerate(owners)
+    ])
+    products = Product.objects.bulk_create([
+        Product(
+            shop=shop,
+            name=f"{rng.choice(WORDS)} {rng.choice(WORDS)} {j}",
+            sku=f"B{shop.pk}-{j}",
+            price=Decimal(rng.randrange(500, 50000, 100)),
+            stock=10**6,
+        )
+        for shop in shop_rows
+        for j in range(products_per_shop)
+    ], batch_size=1000)
+    products_changed.send(sender=Product, product_ids=[p.pk for p in products])
+    CatalogProduct.objects.bulk_create([
+        CatalogProduct(name=p.name, slug=f"bench-{p.pk}", price=p.price, stock=p.stock)
+        for p in products
+    ], batch_size=1000)
+    return {
+        "shops": [s.slug for s in shop_rows],
+        "products": [(p.pk, str(p.price)) for p in products],
+        "customers": [u.email for u in buyers],
+    }
@@ -0,0 +1,68 @@
+# backend/apps/benchmarks/serialization.py
+"""
+Micro-benchmark de serialización: ModelSerializer (instancias) contra
+ValuesSerializer (`.values()` + conversores), sobre los mismos querysets que
+sirven los listados del catálogo. Cada caso mide la lectura de la BD más la
+serialización y el render a JSON, y verifica que los bytes sean idénticos.
+"""
+import time
+
+from rest_framework.renderers import JSONRenderer
+
+from apps.common.values_serializers import values_serializer_for
+from apps.products.models import Product as CatalogProduct
+from apps.products.serializers import ProductSerializer as CatalogProductSerializer
+from apps.shops.models import Shop
+from apps.shops.serializers import ProductSerializer, ShopSerializer, active_products
+
+CASES = {
+    "catalog_products": (lambda: CatalogProduct.objects.filter(active=True), CatalogProductSerializer),
+    "shops": (lambda: Shop.objects.all(), ShopSerializer),
+    "shop_products": (active_products, ProductSerializer),
+}
+
+
+def render_model(queryset, serializer_class):
+    # .all(): un queryset nuevo por vuelta, sin el cache de resultados de la anterior
+    return JSONRenderer().render(serializer_class(list(queryset.all()), many=True).data)
+
+
+def render_values(queryset, serializer_class):
+    fast = values_serializer_for(serializer_class)
+    return JSONRenderer().render(fast.serialize(list(fast.values(queryset))))
+
+
+def _best(fn, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def run_case(name, limit=500, repeat=5):
+    make_queryset, serializer_class = CASES[name]
+    queryset = make_queryset()[:limit]
+    model_bytes = render_model(queryset, serializer_class)
+    values_bytes = render_values(queryset, serializer_class)
+    model_s = _best(lambda: render_model(queryset, serializer_class), repeat)
+    values_s = _best(lambda: render_values(queryset, serializer_class), repeat)
+    return {
+        "rows": len(values_serializer_for(serializer_class).values(queryset)),
+        "identical": model_bytes == values_bytes,
+        "model_ms": round(model_s * 1000, 2),
+        "values_ms": round(values_s * 1000, 2),
+        "speedup": round(model_s / values_s, 2) if values_s else None,
+    }
+
+
+def format_results(results):
+    lines = [f"{'caso':<18}{'filas':>7}{'model ms':>11}{'values ms':>11}{'x':>7}  idéntico"]
+    for name, r in results.items():
+        lines.append(
+            f"{name:<18}{r['rows']:>7}{r['model_ms']:>11.2f}{r['values_ms']:>11.2f}"
+            f"{r['speedup'] or 0:>7.2f}  {'sí' if r['identical'] else 'NO'}"
+        )
+    return "\n".join(lines)
@@ -0,0 +1,63 @@
+import pytest
+
+from apps.benchmarks import runner, serialization
+from apps.benchmarks.seed import seed
+
+
+def _scenario(**overrides):
+    base = {"requests": 100, "errors": 0, "rps": 100.0, "p50_ms": 10.0, "p95_ms": 20.0,
+            "p99_ms": 30.0, "queries_per_request": 3, "hashes_per_request": 0}
+    base.update(overrides)
+    return base
+
+
+def test_percentile_and_summary():
+    samples = [(ms / 1000, 200, 2, 0, True) for ms in range(1, 101)] + [(0.5, 500, 9, 101, False)]
+    stats = runner.summarize(samples, elapsed=2.0)
+    assert stats["requests"] == 101 and stats["errors"] == 1
+    assert stats["hashes_per_request"] == 1
+    assert stats["p50_ms"] == 51 and stats["p99_ms"] == 100
+    assert stats["rps"] == 50.5
+
+
+def test_compare_flags_regressions():
+    baseline = {"scenarios": {"checkout": _scenario()}}
+    ok = {"scenarios": {"checkout": _scenario(p95_ms=24.0, rps=80.0)}}
+    assert runner.compare(ok, baseline) == []
+
+    bad = {"scenarios": {"checkout": _scenario(p95_ms=40.0, rps=50.0, queries_per_request=4, errors=2)}}
+    problems = runner.compare(bad, baseline)
+    assert len(problems) == 4
+    assert runner.compare(bad, baseline, check_timing=False) == [
+        "checkout: 2 requests fallidos", "checkout: queries/request 4 > 3",
+    ]
+    # Un baseline sin hashes (anterior a la métrica) no los compara
+    rehashing = {"scenarios": {"checkout": _scenario(hashes_per_request=2)}}
+    assert runner.compare(rehashing, baseline) == ["checkout: hashes/request 2 > 0"]
+    del baseline["scenarios"]["checkout"]["hashes_per_request"]
+    assert runner.compare(rehashing, baseline) == []
+
+
+@pytest.mark.django_db(transaction=True)
+def test_scenarios_run_against_live_server():
+    data = seed(shops=2, products_per_shop=3, customers=2)
+    data["tokens"] = runner.issue_tokens(data["customers"])
+    server, base_url = runner.serve()
+    try:
+        for name in ("products_list", "shop_detail", "checkout", "register"):
+            stats = runner.run_scenario(base_url, name, data, requests_count=4, concurrency=2, warmup=1)
+            assert stats["requests"] == 4 and stats["errors"] == 0, name
+            # Los GET pueden salir enteros del cache de respuestas (0 queries)
+            assert stats["queries_per_request"] > 0 or name != "checkout"
+            assert stats["hashes_per_request"] == (1 if name == "register" else 0), name
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.mark.django_db
+def test_serializer_benchmark_outputs_match():
+    seed(shops=2, products_per_shop=5, customers=1)
+    for name in serialization.CASES:
+        result = serialization.run_case(name, limit=10, repeat=1)
+        assert result["identical"] and result["rows"] > 0
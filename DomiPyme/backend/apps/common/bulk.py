@@ -0,0 +1,65 @@
+# backend/apps/common/bulk.py
+"""
+UPDATE masivo con valores distintos por fila.
+
+`QuerySet.bulk_update` arma un CASE WHEN por campo y por fila; para miles de
+filas el costo está en Python (compilar las expresiones), no en la BD.
+`bulk_update_values` manda cada lote como
+
+    UPDATE t SET a = v.a, ... FROM (SELECT column1 AS id, ... FROM (VALUES ...)) v
+    WHERE t.id = v.id
+
+que Postgres y SQLite >= 3.33 ejecutan directo. En otros motores cae a
+bulk_update.
+"""
+from django.db import connections, router
+
+
+def supports_update_from(connection):
+    if connection.vendor == "postgresql":
+        return True
+    if connection.vendor == "sqlite":
+        return connection.Database.sqlite_version_info >= (3, 33)
+    return False
+
+
+def bulk_update_values(objs, fields, using=None):
+    """
+    Guarda `fields` de las instancias `objs` (ya existentes, mismo modelo).
+    Retorna cuántas filas se enviaron.
+    """
+    objs = list(objs)
+    if not objs:
+        return 0
+    model = type(objs[0])
+    db = using or router.db_for_write(model)
+    connection = connections[db]
+    if not supports_update_from(connection):
+        model._default_manager.using(db).bulk_update(objs, fields)
+        return len(objs)
+
+    qn = connection.ops.quote_name
+    pk = model._meta.pk
+    columns = [pk] + [model._meta.get_field(name) for name in fields]
+    casts = ", ".join(f"CAST(%s AS {field.cast_db_type(connection)})" for field in columns)
+    aliases = ", ".join(f"column{i} AS {qn(field.column)}" for i, field in enumerate(columns, 1))
+    assignments = ", ".join(f"{qn(f.column)} = v.{qn(f.column)}" for f in columns[1:])
+    table = qn(model._meta.db_table)
+
+    max_params = connection.features.max_query_params or 10000
+    batch_size = max(1, max_params // len(columns))
+    with connection.cursor() as cursor:
+        for start in range(0, len(objs), batch_size):
+            batch = objs[start:start + batch_size]
+            params = []
+            for obj in batch:
+                for field in columns:
+                    params.append(field.get_db_prep_save(getattr(obj, field.attname), connection))
+            values = ", ".join(f"({casts})" for _ in batch)
+            cursor.execute(
+                f"UPDATE {table} SET {assignments} "
+                f"FROM (SELECT {aliases} FROM (VALUES {values}) AS t) AS v "
+                f"WHERE {table}.{qn(pk.column)} = v.{qn(pk.column)}",
+                params,
+            )
+    return len(objs)
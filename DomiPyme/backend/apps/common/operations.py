@@ -0,0 +1,35 @@
+# backend/apps/common/operations.py
+"""
+Operaciones de migración propias.
+
+`AddIndexConcurrently` de django.contrib.postgres solo corre en Postgres;
+la de acá crea el índice con CREATE INDEX CONCURRENTLY en Postgres (sin
+bloquear escrituras mientras recorre la tabla, que en `orders_order` tarda) y
+con un CREATE INDEX normal en los demás motores. La migración que la use
+debe declarar `atomic = False`.
+"""
+from django.db.migrations.operations import AddIndex
+
+
+class AddIndexOnline(AddIndex):
+    def database_forwards(self, app_label, schema_editor, from_state, to_state):
+        model = to_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.add_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.add_index(model, self.index)
+
+    def database_backwards(self, app_label, schema_editor, from_state, to_state):
+        model = from_state.apps.get_model(app_label, self.model_name)
+        if not self.allow_migrate_model(schema_editor.connection.alias, model):
+            return
+        if schema_editor.connection.vendor == "postgresql":
+            schema_editor.remove_index(model, self.index, concurrently=True)
+        else:
+            schema_editor.remove_index(model, self.index)
+
+    def describe(self):
+        return super().describe() + " (online)"
+
@@ -0,0 +1,191 @@
+# backend/apps/common/pagination.py
+"""
+Paginación por keyset (seek) para listados grandes.
+
+A diferencia de LimitOffsetPagination, la página N no obliga a la BD a
+recorrer y descartar las N-1 anteriores: el cursor guarda el último
+(created_at, id) visto y la siguiente página arranca con un rango sobre el
+índice. Tampoco hace COUNT(*).
+
+`HybridPagination` (catálogo y listado de comercios) responde como
+LimitOffsetPagination salvo que el cliente pida el keyset con `?mode=cursor`.
+"""
+import base64
+import json
+from datetime import datetime
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .query_plans import estimate_count
+
+
+class KeysetPagination(BasePagination):
+    """
+    Orden estable por `ordering`: dos columnas en la misma dirección, la
+    segunda única (normalmente el id). Respuesta: {"next": url|null, "results": [...]}.
+    """
+    ordering = ("-created_at", "-id")
+    page_size = None  # None: PAGE_SIZE de REST_FRAMEWORK
+    cursor_query_param = "cursor"
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    invalid_cursor_message = "Cursor inválido."
+
+    def requested_page_size(self, request):
+        return request.query_params.get(self.page_size_query_param)
+
+    def get_page_size(self, request):
+        page_size = self.page_size or api_settings.PAGE_SIZE or 20
+        raw = self.requested_page_size(request)
+        if raw:
+            try:
+                page_size = int(raw)
+            except ValueError:
+                pass
+        return max(1, min(page_size, self.max_page_size))
+
+    @property
+    def fields(self):
+        return [f.lstrip("-") for f in self.ordering]
+
+    @property
+    def descending(self):
+        return self.ordering[0].startswith("-")
+
+    def cursor_for(self, obj):
+        # obj: instancia del modelo o fila de .values()
+        if isinstance(obj, dict):
+            return self.encode_cursor([obj[f] for f in self.fields])
+        return self.encode_cursor([getattr(obj, f) for f in self.fields])
+
+    def encode_cursor(self, values):
+        values = [v.isoformat() if isinstance(v, datetime) else v for v in values]
+        return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, request):
+        raw = request.query_params.get(self.cursor_query_param)
+        if not raw:
+            return None
+        try:
+            values = json.loads(base64.urlsafe_b64decode(raw.encode()))
+        except (ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.fields):
+            raise NotFound(self.invalid_cursor_message)
+        return values
+
+    def seek_filter(self, values):
+        """
+        (a, b) < (va, vb) escrito como `a <= va AND NOT (a = va AND b >= vb)`:
+        la condición de rango sobre la primera columna es la que usa el índice.
+        """
+        (first, second), (v1, v2) = self.fields, values
+        op, tie_op = ("lte", "gte") if self.descending else ("gte", "lte")
+        return Q(**{f"{first}__{op}": v1}) & ~Q(**{first: v1, f"{second}__{tie_op}": v2})
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+        cursor = self.decode_cursor(request)
+        if cursor is not None:
+            queryset = queryset.filter(self.seek_filter(cursor))
+        rows = list(queryset[:page_size + 1])
+        self.has_next = len(rows) > page_size
+        page = rows[:page_size]
+        self.next_cursor = None
+        if self.has_next:
+            last = page[-1]
+            self.next_cursor = self.cursor_for(last)
+        return page
+
+    def get_next_link(self):
+        if not self.next_cursor:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+class HybridPagination(LimitOffsetPagination):
+    """
+    LimitOffset de siempre; keyset solo si el cliente lo pide (`?mode=cursor`
+    o un `?cursor=` de un `next` anterior). Para listados ordenados por
+    `KeysetPagination.ordering` (ProductViewSet, ShopListCreateView).
+
+    - Por defecto: {"count", "next", "previous", "results"} exactamente como
+      LimitOffsetPagination (orden de la vista, links con offset).
+    - Modo cursor: {"next", "previous": null, "results"} sin COUNT(*), `limit`
+      sirve de alias de `page_size`.
+    - `?count=estimate` cambia el COUNT por query_plans.estimate_count y agrega
+      `count_exact`; en modo cursor `?count=exact|estimate` agrega `count`.
+    """
+    mode_query_param = "mode"
+    count_query_param = "count"
+    estimate_cap = 1000
+
+    @property
+    def fields(self):
+        # Columnas del cursor (ValuesReadMixin las agrega a las filas de .values())
+        return KeysetPagination().fields
+
+    def cursor_mode(self, request):
+        return (request.query_params.get(self.mode_query_param) == "cursor"
+                or bool(request.query_params.get(KeysetPagination.cursor_query_param)))
+
+    def get_count(self, queryset):
+        if self.count_mode == "estimate":
+            count, self.count_exact = estimate_count(queryset, self.estimate_cap)
+            return count
+        return super().get_count(queryset)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        mode = request.query_params.get(self.count_query_param)
+        self.count_mode = mode if mode in ("exact", "estimate") else None
+        self.count_exact = True
+        self.keyset = None
+        if not self.cursor_mode(request):
+            self.count_mode = self.count_mode or "exact"
+            return super().paginate_queryset(queryset, request, view)
+
+        self.keyset = KeysetPagination()
+        self.keyset.page_size = self.get_limit(request)
+        self.count = self.get_count(queryset) if self.count_mode else None
+        return self.keyset.paginate_queryset(queryset, request, view)
+
+    def get_next_link(self):
+        return self.keyset.get_next_link() if self.keyset else super().get_next_link()
+
+    def get_previous_link(self):
+        return None if self.keyset else super().get_previous_link()
+
+    def get_paginated_response(self, data):
+        body = {}
+        if self.count_mode:
+            body["count"] = self.count
+            if self.count_mode == "estimate":
+                body["count_exact"] = self.count_exact
+        body.update({"next": self.get_next_link(), "previous": self.get_previous_link(), "results": data})
+        return Response(body)
+
+    def get_paginated_response_schema(self, schema):
+        response = super().get_paginated_response_schema(schema)
+        response["properties"]["count_exact"] = {"type": "boolean"}
+        return response
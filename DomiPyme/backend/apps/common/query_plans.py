@@ -0,0 +1,74 @@
+# backend/apps/common/query_plans.py
+"""
+Revisión de planes de ejecución para los tests de regresión de índices.
+
+`plan_problems(qs)` corre EXPLAIN sobre el queryset y devuelve las líneas que
+delatan un recorrido secuencial de una tabla ("SCAN tabla" sin índice en
+SQLite, "Seq Scan on" en Postgres) y, si se pide, un ordenamiento que no sale
+de un índice ("USE TEMP B-TREE FOR ORDER BY" / nodo "Sort").
+
+En Postgres el EXPLAIN corre con enable_seqscan/enable_sort apagados: con los
+pocos datos de un test el planner prefiere recorrer la tabla aunque exista el
+índice; así el recorrido secuencial solo aparece cuando no hay índice que sirva.
+
+`estimate_count(qs, cap)` es el COUNT barato de la paginación: en Postgres
+las filas estimadas del plan; en el resto un COUNT que deja de contar en `cap`.
+"""
+import json
+import re
+
+from django.db import connections, router, transaction
+
+SQLITE_SCAN = re.compile(r"\bSCAN (?!CONSTANT ROW)(\S+)\s*$")
+SQLITE_SORT = "USE TEMP B-TREE FOR ORDER BY"
+POSTGRES_SCAN = re.compile(r"\bSeq Scan on (\S+)")
+POSTGRES_SORT = re.compile(r"^\s*(->\s*)?(Incremental )?Sort\b")
+
+
+def _connection(queryset):
+    return connections[queryset.db or router.db_for_read(queryset.model)]
+
+
+def analyze(using="default"):
+    """Actualiza las estadísticas del planner (después de sembrar datos)."""
+    with connections[using].cursor() as cursor:
+        cursor.execute("ANALYZE")
+
+
+def explain(queryset):
+    connection = _connection(queryset)
+    if connection.vendor != "postgresql":
+        return queryset.explain()
+    with transaction.atomic(using=queryset.db):
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL enable_seqscan = off")
+            cursor.execute("SET LOCAL enable_sort = off")
+        return queryset.explain()
+
+
+def plan_problems(queryset, allow_sort=True):
+    vendor = _connection(queryset).vendor
+    problems = []
+    for line in explain(queryset).splitlines():
+        if vendor == "postgresql":
+            if POSTGRES_SCAN.search(line) or (not allow_sort and POSTGRES_SORT.search(line)):
+                problems.append(line.strip())
+        elif SQLITE_SCAN.search(line) or (not allow_sort and SQLITE_SORT in line):
+            problems.append(line.strip())
+    return problems
+
+
+def estimate_count(queryset, cap=1000):
+    """
+    (cantidad, exacta) sin recorrer todo el resultado. Por debajo de `cap`
+    filas cuenta de verdad (sale barato); por encima devuelve la estimación
+    del planner en Postgres o `cap` ("al menos cap") en los demás motores.
+    """
+    queryset = queryset.order_by()
+    if _connection(queryset).vendor == "postgresql":
+        plan = json.loads(queryset.explain(format="json"))
+        estimated = int(plan[0]["Plan"]["Plan Rows"])
+        if estimated >= cap:
+            return estimated, False
+    bounded = queryset[:cap].count()
+    return bounded, bounded < cap
@@ -0,0 +1,168 @@
+# backend/apps/common/response_cache.py
+"""
+Cache de respuestas GET versionado, con ETag fuerte.
+
+Cada vista declara los "scopes" de los que depende su respuesta (p.ej.
+`shops` para el listado de comercios, `shop:<slug>` para un detalle). Cada
+scope tiene un número de versión en el cache; las señales de los modelos lo
+suben con `bump()`. La clave de una respuesta incluye las versiones de sus
+scopes, el esquema y el host (los links `next`/`previous` son absolutos), la
+ruta y los query params ordenados, así que invalidar no borra nada: las
+entradas viejas dejan de pedirse y el cache (LRU) las desaloja solo.
+
+Un hit se responde antes del `initial()` de DRF; si el request trae
+`Authorization` se autentica igual antes de buscar en el cache (con el
+cache de principals es barato) y un token inválido o vencido sigue la vía
+normal y recibe su 401.
+
+La entrada guarda el cuerpo ya renderizado y su ETag (sha256 del cuerpo). Un
+hit no toca la BD ni serializa; si el cliente manda `If-None-Match` con ese
+ETag responde 304 sin cuerpo.
+
+Las versiones que faltan (nunca creadas o desalojadas) arrancan en un valor
+basado en el reloj, nunca en 0: así una versión desalojada no puede volver a
+un número viejo y resucitar respuestas de antes.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework.exceptions import APIException
+
+PREFIX = "rc"
+CACHE_HEADER = "X-Cache"
+
+
+def get_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"{PREFIX}:v:{scope}"
+
+
+def versions(scopes):
+    """Versión actual de cada scope (una ida al cache; crea las que falten)."""
+    cache = get_cache()
+    keys = {scope: _version_key(scope) for scope in scopes}
+    found = cache.get_many(keys.values())
+    result = {}
+    for scope, key in keys.items():
+        value = found.get(key)
+        if value is None:
+            cache.add(key, time.time_ns(), timeout=None)
+            value = cache.get(key)
+        result[scope] = value
+    return result
+
+
+def _bump(scopes):
+    cache = get_cache()
+    for scope in scopes:
+        key = _version_key(scope)
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.add(key, time.time_ns(), timeout=None)
+
+
+def bump(scopes):
+    """
+    Invalida todas las respuestas que dependen de `scopes`: ya, y otra vez al
+    confirmar la transacción (un request que leyó la BD antes del commit pudo
+    guardar la respuesta vieja con la versión nueva).
+    """
+    scopes = set(scopes)
+    if not scopes:
+        return
+    _bump(scopes)
+    transaction.on_commit(lambda: _bump(scopes))
+
+
+def make_etag(content):
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def etag_matches(request, etag):
+    header = request.META.get("HTTP_IF_NONE_MATCH")
+    if not header:
+        return False
+    tags = parse_etags(header)
+    return "*" in tags or etag in tags
+
+
+class VersionedCacheMixin:
+    """
+    Mixin para APIViews/ViewSets públicos. Subclases definen
+    `get_cache_scopes(request, **kwargs)`. Solo cachea GET/HEAD que piden JSON
+    (la API navegable de DRF pasa derecho) y respuestas 200.
+    """
+    cache_timeout = None  # None: CATALOG_CACHE_TTL
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        raise NotImplementedError
+
+    def cacheable_request(self, request):
+        if request.method not in ("GET", "HEAD"):
+            return False
+        return "text/html" not in request.META.get("HTTP_ACCEPT", "")
+
+    def cache_key(self, request, scopes):
+        current = versions(scopes)
+        stamp = ",".join(f"{s}={current[s]}" for s in sorted(current))
+        query = sorted(request.GET.lists())
+        raw = f"{request.scheme}://{request.get_host()}{request.path}?{query}|{stamp}"
+        return f"{PREFIX}:r:{hashlib.sha256(raw.encode()).hexdigest()}"
+
+    def authenticates(self, request, *args, **kwargs):
+        """False si el request trae credenciales que DRF rechazaría."""
+        if "HTTP_AUTHORIZATION" not in request.META:
+            return True
+        try:
+            self.perform_authentication(self.initialize_request(request, *args, **kwargs))
+        except APIException:
+            return False
+        return True
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.cacheable_request(request) or not self.authenticates(request, *args, **kwargs):
+            return super().dispatch(request, *args, **kwargs)
+        cache = get_cache()
+        key = self.cache_key(request, self.get_cache_scopes(request, *args, **kwargs))
+        entry = cache.get(key)
+        if entry is not None:
+            return self.cached_response(request, entry, hit=True)
+
+        response = super().dispatch(request, *args, **kwargs)
+        if response.status_code != 200 or getattr(response, "streaming", False):
+            return response
+        if hasattr(response, "render"):
+            response.render()
+        entry = {
+            "etag": make_etag(response.content),
+            "content": response.content,
+            "content_type": response["Content-Type"],
+        }
+        timeout = settings.CATALOG_CACHE_TTL if self.cache_timeout is None else self.cache_timeout
+        cache.set(key, entry, timeout)
+        if etag_matches(request, entry["etag"]):
+            return self.cached_response(request, entry, hit=False)
+        return self.tag(response, entry, hit=False)
+
+    def cached_response(self, request, entry, hit):
+        if etag_matches(request, entry["etag"]):
+            response = HttpResponseNotModified()
+        else:
+            response = HttpResponse(entry["content"], content_type=entry["content_type"])
+        return self.tag(response, entry, hit)
+
+    def tag(self, response, entry, hit):
+        response["ETag"] = entry["etag"]
+        response[CACHE_HEADER] = "HIT" if hit else "MISS"
+        patch_vary_headers(response, ["Accept"])
+        return response
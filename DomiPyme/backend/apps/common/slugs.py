@@ -0,0 +1,104 @@
+# backend/apps/common/slugs.py
+"""
+Asignación de slugs únicos con un número fijo de queries.
+
+En lugar de probar `base`, `base-1`, `base-2`... con un exists() cada uno,
+`allocate_slug` pide a la BD en una sola query si `base` está tomado y cuál es
+el sufijo numérico más alto de `base-N`, y devuelve el siguiente. Si otro
+proceso gana la carrera, el INSERT choca con el índice único y `save_with_slug`
+recalcula y reintenta.
+
+`assign_slugs` hace lo mismo para una lista de instancias antes de un
+bulk_create: una query por base distinta, no por instancia.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import BigIntegerField, Count, Max, Q
+from django.db.models.functions import Cast, Substr
+from django.utils.text import slugify
+
+SAVE_RETRIES = 3
+
+
+def _max_length(model, field):
+    return model._meta.get_field(field).max_length or 50
+
+
+def slug_base(model, value, field="slug", suffix_room=8):
+    """slug de `value` recortado para que quepa con un sufijo `-N`."""
+    base = slugify(value or "") or model._meta.model_name
+    return base[:_max_length(model, field) - suffix_room].strip("-") or model._meta.model_name
+
+
+def next_suffix(model, base, field="slug", exclude_pk=None, reserved=()):
+    """
+    None si `base` está libre; si no, el siguiente N libre para `base-N`
+    (mayor que todos los existentes). Una sola query.
+    """
+    qs = model._default_manager.all()
+    if exclude_pk is not None:
+        qs = qs.exclude(pk=exclude_pk)
+    numbered = Q(**{f"{field}__startswith": f"{base}-", f"{field}__regex": rf"^{base}-[0-9]+$"})
+    stats = qs.filter(Q(**{field: base}) | numbered).aggregate(
+        base_taken=Count("pk", filter=Q(**{field: base})),
+        top=Max(Cast(Substr(field, len(base) + 2), BigIntegerField()), filter=numbered),
+    )
+    if not stats["base_taken"] and base not in reserved:
+        return None
+    return (stats["top"] or 0) + 1
+
+
+def allocate_slug(model, value, field="slug", exclude_pk=None, reserved=()):
+    base = slug_base(model, value, field)
+    suffix = next_suffix(model, base, field, exclude_pk, reserved)
+    return base if suffix is None else f"{base}-{suffix}"
+
+
+def assign_slugs(instances, source="name", field="slug", reserved=()):
+    """
+    Completa el slug de las instancias que no lo tienen (para bulk_create).
+    Los repetidos dentro del lote reciben sufijos consecutivos.
+    """
+    pending = {}
+    for obj in instances:
+        if not getattr(obj, field):
+            pending.setdefault(slug_base(type(obj), getattr(obj, source), field), []).append(obj)
+    taken_in_batch = {getattr(obj, field) for obj in instances if getattr(obj, field)}
+    for base, objs in pending.items():
+        model = type(objs[0])
+        suffix = next_suffix(model, base, field, reserved=reserved)
+        for obj in objs:
+            while True:
+                slug = base if suffix is None else f"{base}-{suffix}"
+                suffix = 1 if suffix is None else suffix + 1
+                if slug not in taken_in_batch:
+                    break
+            taken_in_batch.add(slug)
+            setattr(obj, field, slug)
+    return instances
+
+
+def save_with_slug(instance, save, source="name", field="slug", reserved=()):
+    """
+    Guarda con `save()` (el save() del padre) asignando el slug si falta. Si el
+    slug asignado choca con otro insertado en paralelo, recalcula y reintenta.
+    """
+    if getattr(instance, field):
+        return save()
+    model = type(instance)
+    for attempt in range(SAVE_RETRIES):
+        setattr(instance, field, allocate_slug(model, getattr(instance, source), field, instance.pk, reserved))
+        try:
+            with transaction.atomic():
+                return save()
+        except IntegrityError:
+            if attempt == SAVE_RETRIES - 1 or not _slug_taken(instance, field):
+                raise
+    return None
+
+
+def _slug_taken(instance, field):
+    """¿El IntegrityError fue por el slug? (si no, no tiene sentido reintentar)"""
+    qs = type(instance)._default_manager.filter(**{field: getattr(instance, field)})
+    if instance.pk is not None:
+        qs = qs.exclude(pk=instance.pk)
+    return qs.exists()
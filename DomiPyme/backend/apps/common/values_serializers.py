@@ -0,0 +1,184 @@
+# backend/apps/common/values_serializers.py
+"""
+Camino de lectura rápido para listados y detalles.
+
+Un ModelSerializer arma una instancia del modelo por fila y, por cada campo,
+pasa por get_attribute + to_representation. `ValuesSerializer` toma las mismas
+definiciones (se construye desde el ModelSerializer existente, no se duplican
+los campos), pide a la BD solo esas columnas con `.values()` y convierte cada
+valor con una función armada una sola vez por campo. La salida es la misma,
+byte a byte una vez renderizada: mismo orden de claves, mismos formatos
+(Decimal cuantizado como texto, datetime ISO 8601 en la zona horaria actual
+con `Z` para UTC).
+
+Solo soporta campos que salen directo de una columna (incluidos los de
+`source="fk.campo"`); un SerializerMethodField o un serializer anidado
+levanta ImproperlyConfigured al construirlo. Los campos `computed` no se
+piden a la BD: la fila tiene que traerlos (p.ej. el score de la búsqueda).
+"""
+import decimal
+from functools import lru_cache
+
+from django.core.exceptions import ImproperlyConfigured
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from rest_framework import fields as drf_fields, relations
+from rest_framework.response import Response
+from rest_framework.settings import ISO_8601, api_settings
+
+
+def _decimal_converter(field):
+    coerce = getattr(field, "coerce_to_string", api_settings.COERCE_DECIMAL_TO_STRING)
+    if not coerce or field.localize or field.normalize_output or field.decimal_places is None:
+        return field.to_representation
+    exponent = decimal.Decimal(".1") ** field.decimal_places
+    context = decimal.Context(prec=field.max_digits) if field.max_digits is not None else None
+    rounding = field.rounding
+
+    def convert(value):
+        if not isinstance(value, decimal.Decimal):
+            return field.to_representation(value)
+        # Mismo contexto que DecimalField.quantize (precisión = max_digits)
+        ctx = context or decimal.getcontext()
+        return f"{value.quantize(exponent, rounding=rounding, context=ctx):f}"
+
+    return convert
+
+
+def _datetime_converter(field):
+    output_format = getattr(field, "format", api_settings.DATETIME_FORMAT)
+    if output_format is None or output_format.lower() != ISO_8601 or hasattr(field, "timezone"):
+        return field.to_representation
+
+    def convert(value, tz):
+        if not value:
+            return None
+        if isinstance(value, str) or timezone.is_naive(value):
+            return field.to_representation(value)
+        value = value.astimezone(tz).isoformat() if tz is not None else field.to_representation(value)
+        if value.endswith("+00:00"):
+            value = value[:-6] + "Z"
+        return value
+
+    return convert
+
+
+def _identity(value):
+    return value
+
+
+def _converter(field):
+    """(función, necesita_tz) para un campo de DRF."""
+    if isinstance(field, drf_fields.DecimalField):
+        return _decimal_converter(field), False
+    if isinstance(field, drf_fields.DateTimeField):
+        convert = _datetime_converter(field)
+        return convert, convert is not field.to_representation
+    if isinstance(field, drf_fields.BooleanField):
+        return bool, False
+    if isinstance(field, drf_fields.IntegerField):
+        return int, False
+    if isinstance(field, drf_fields.FloatField):
+        return float, False
+    if isinstance(field, drf_fields.CharField) and (
+        type(field).to_representation is drf_fields.CharField.to_representation
+    ):
+        return str, False
+    if isinstance(field, (drf_fields.ReadOnlyField, relations.PrimaryKeyRelatedField)) and not getattr(
+        field, "pk_field", None
+    ):
+        return _identity, False
+    # Cualquier otro campo de valor simple: su propio to_representation
+    if isinstance(field, (drf_fields.DateField, drf_fields.TimeField, drf_fields.UUIDField, drf_fields.JSONField)):
+        return field.to_representation, False
+    raise ImproperlyConfigured(
+        f"ValuesSerializer no soporta {type(field).__name__} ({field.field_name})."
+    )
+
+
+class ValuesSerializer:
+    def __init__(self, serializer_class, computed=()):
+        serializer = serializer_class()
+        self.serializer_class = serializer_class
+        self.columns = []  # (nombre en la salida, lookup de .values(), función, necesita_tz)
+        self._compiled = {}
+        for name, field in serializer.fields.items():
+            if field.write_only:
+                continue
+            if name in computed:
+                lookup = name
+            else:
+                if field.source == "*" or isinstance(field, relations.ManyRelatedField):
+                    raise ImproperlyConfigured(f"ValuesSerializer no soporta el campo {name}.")
+                lookup = "__".join(field.source_attrs)
+            convert, needs_tz = _converter(field)
+            self.columns.append((name, lookup, convert, needs_tz))
+        self.lookups = [lookup for name, lookup, *_ in self.columns if name not in computed]
+
+    def values(self, queryset, extra=()):
+        """El queryset con solo las columnas necesarias (+ `extra`, p.ej. las del cursor)."""
+        lookups = list(self.lookups)
+        lookups += [f for f in extra if f not in lookups]
+        return queryset.values(*lookups)
+
+    def serialize(self, rows):
+        """Lista de dicts de `.values()` -> lista de dicts listos para renderizar."""
+        tz = timezone.get_current_timezone()
+        compiled = self._compiled.get(tz)
+        if compiled is None:
+            compiled = self._compiled[tz] = self._compile(tz)
+        return compiled(rows)
+
+    def _compile(self, tz):
+        """
+        Arma (una vez por zona horaria) una función que construye cada dict con
+        un literal: sin bucles por campo ni llamadas intermedias por valor.
+        """
+        env = {"tz": tz}
+        items = []
+        for i, (name, lookup, convert, needs_tz) in enumerate(self.columns):
+            if convert is _identity:
+                items.append(f"{name!r}: row[{lookup!r}]")
+                continue
+            env[f"c{i}"] = convert
+            call = f"c{i}(v, tz)" if needs_tz else f"c{i}(v)"
+            items.append(f"{name!r}: None if (v := row[{lookup!r}]) is None else {call}")
+        source = "def serialize(rows):\n    return [{%s} for row in rows]\n" % ", ".join(items)
+        exec(compile(source, f"<values serializer {self.serializer_class.__name__}>", "exec"), env)
+        return env["serialize"]
+
+    def serialize_one(self, row):
+        return self.serialize([row])[0]
+
+
+@lru_cache(maxsize=None)
+def values_serializer_for(serializer_class, computed=()):
+    return ValuesSerializer(serializer_class, computed)
+
+
+class ValuesReadMixin:
+    """
+    Para GenericAPIViews: `list` y `retrieve` usan el ValuesSerializer del
+    `serializer_class` de la vista; el resto de las acciones no cambia.
+    """
+
+    def get_values_serializer(self):
+        return values_serializer_for(self.get_serializer_class())
+
+    def list(self, request, *args, **kwargs):
+        fast = self.get_values_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        # KeysetPagination necesita las columnas del cursor en cada fila
+        rows = fast.values(queryset, extra=getattr(self.paginator, "fields", ()))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(fast.serialize(page))
+        return Response(fast.serialize(rows))
+
+    def retrieve(self, request, *args, **kwargs):
+        fast = self.get_values_serializer()
+        queryset = self.filter_queryset(self.get_queryset())
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        row = get_object_or_404(fast.values(queryset), **{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+        self.check_object_permissions(request, row)
+        return Response(fast.serialize_one(row))
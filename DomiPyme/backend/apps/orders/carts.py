@@ -0,0 +1,121 @@
+# backend/apps/orders/carts.py
+"""
+Operaciones sobre el carrito persistente.
+
+Cada operación de línea calcula el delta (subtotal nuevo - subtotal anterior
+de esa línea) y lo suma con F() al total de su comercio y al del carrito.
+El costo no depende de cuántas líneas tenga el carrito.
+
+Las filas nuevas (línea, total del comercio) se insertan en un savepoint: si
+otro request del mismo carrito la insertó primero, la restricción única
+rechaza la segunda y se reintenta como update.
+"""
+from decimal import Decimal
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+
+from apps.shops.snapshots import load_snapshots
+from .checkout import CheckoutError, place_orders
+from .models import Cart, CartLine, CartShopTotal
+
+
+def get_cart(user):
+    cart, _ = Cart.objects.get_or_create(user=user)
+    return cart
+
+
+def _bump(cart, shop_id, amount, count):
+    """Suma `amount`/`count` al total del comercio y del carrito."""
+    if not amount and not count:
+        return
+    totals = CartShopTotal.objects.filter(cart=cart, shop_id=shop_id)
+    changes = {"subtotal": F("subtotal") + amount, "item_count": F("item_count") + count}
+    updated = totals.update(**changes)
+    if not updated:
+        try:
+            with transaction.atomic():
+                CartShopTotal.objects.create(cart=cart, shop_id=shop_id, subtotal=amount, item_count=count)
+        except IntegrityError:
+            # Otro request lo creó entre el UPDATE y el INSERT
+            totals.update(**changes)
+    elif count < 0:
+        CartShopTotal.objects.filter(cart=cart, shop_id=shop_id, item_count__lte=0).delete()
+    Cart.objects.filter(pk=cart.pk).update(total=F("total") + amount, item_count=F("item_count") + count)
+
+
+def _product(product_id):
+    """Precio, comercio y disponibilidad desde el cache de snapshots."""
+    snap = load_snapshots([product_id]).get(product_id)
+    if snap is None or not snap["active"]:
+        raise CheckoutError(f"Producto {product_id} no encontrado")
+    return snap
+
+
+def _update_line(cart, product_id, new_quantity):
+    """
+    Bloquea la línea, calcula la cantidad nueva con `new_quantity(actual)` y
+    aplica el delta de subtotal al comercio y al carrito.
+    """
+    with transaction.atomic():
+        line = CartLine.objects.select_for_update().filter(cart=cart, product_id=product_id).first()
+        qty = new_quantity(line.quantity if line else 0)
+        if qty <= 0:
+            if line is not None:
+                line.delete()
+                _bump(cart, line.shop_id, -line.subtotal, -line.quantity)
+            return
+        product = _product(product_id)
+        if product["available"] < qty:
+            raise CheckoutError(f"Stock insuficiente para {product['name']}")
+        price = Decimal(product["price"])
+        if line is None:
+            try:
+                with transaction.atomic():
+                    CartLine.objects.create(
+                        cart=cart, product_id=product_id, shop_id=product["shop_id"], quantity=qty, unit_price=price
+                    )
+            except IntegrityError:
+                # Otro request creó la línea después del SELECT: ahora sí existe y se bloquea
+                return _update_line(cart, product_id, new_quantity)
+            _bump(cart, product["shop_id"], price * qty, qty)
+            return
+        CartLine.objects.filter(pk=line.pk).update(quantity=qty, unit_price=price)
+        _bump(cart, line.shop_id, price * qty - line.subtotal, qty - line.quantity)
+
+
+def set_quantity(cart, product_id, qty):
+    """Fija la cantidad de una línea (0 la elimina) al precio vigente del producto."""
+    _update_line(cart, product_id, lambda current: qty)
+
+
+def add_item(cart, product_id, qty=1):
+    """Suma `qty` unidades a la línea del producto (la crea si no existe)."""
+    _update_line(cart, product_id, lambda current: current + qty)
+
+
+def remove_item(cart, product_id):
+    _update_line(cart, product_id, lambda current: 0)
+
+
+def clear_cart(cart):
+    with transaction.atomic():
+        CartLine.objects.filter(cart=cart).delete()
+        CartShopTotal.objects.filter(cart=cart).delete()
+        Cart.objects.filter(pk=cart.pk).update(total=Decimal("0.00"), item_count=0)
+
+
+def checkout_items(cart):
+    """Líneas del carrito en el formato de `place_orders`."""
+    return [
+        {"product": pid, "qty": qty}
+        for pid, qty in CartLine.objects.filter(cart=cart).values_list("product_id", "quantity")
+    ]
+
+
+def place_cart_orders(cart, items, customer):
+    """Crea las órdenes del carrito y lo vacía en la misma transacción."""
+    with transaction.atomic():
+        orders = place_orders(items, customer)
+        clear_cart(cart)
+    return orders
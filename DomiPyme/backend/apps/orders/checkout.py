@@ -0,0 +1,109 @@
+# backend/apps/orders/checkout.py
+"""
+Pipeline de checkout basado en conjuntos.
+
+Todo el carrito se resuelve con un número fijo de queries, sin importar
+cuántas líneas o comercios tenga:
+
+1. Un SELECT para todos los productos (con su shop).
+2. Validación de existencia/stock y cálculo de totales en memoria.
+3. Dentro de una transacción: un UPDATE condicional que reserva el stock de
+   todo el carrito (ver `apps.orders.reservations`), un INSERT masivo de
+   órdenes y otro de ítems.
+"""
+from decimal import Decimal
+
+from django.db import transaction
+from rest_framework import status
+
+from apps.shops.models import Product
+from .models import Order, OrderItem
+from .reservations import first_unavailable, reserve
+
+
+class CheckoutError(Exception):
+    """Error de negocio del checkout; la vista lo traduce a una respuesta."""
+
+    def __init__(self, detail, status_code=status.HTTP_400_BAD_REQUEST):
+        super().__init__(detail)
+        self.detail = detail
+        self.status_code = status_code
+
+
+def merge_lines(items):
+    """
+    Agrupa las líneas repetidas del carrito por producto, sumando cantidades.
+    Conserva el orden de primera aparición.
+    """
+    quantities = {}
+    for it in items:
+        pid = it["product"]
+        quantities[pid] = quantities.get(pid, 0) + int(it.get("qty", 1))
+    return quantities
+
+
+def load_products(product_ids):
+    """Carga todos los productos del carrito (y su shop) en una sola query."""
+    return Product.objects.select_related("shop").in_bulk(list(product_ids))
+
+
+def validate_lines(quantities, products):
+    """
+    Verifica existencia y stock disponible de cada línea en el orden del carrito.
+    Es una comprobación previa barata; la garantía real la da `reserve`.
+    """
+    for pid, qty in quantities.items():
+        prod = products.get(pid)
+        if prod is None:
+            raise CheckoutError(f"Producto {pid} no encontrado")
+        if prod.available < qty:
+            raise CheckoutError(f"Stock insuficiente para {prod.name}")
+
+
+def build_orders(quantities, products, customer):
+    """
+    Construye en memoria las órdenes (una por shop) con su total ya calculado
+    y la lista de ítems de cada una. No toca la base de datos.
+    """
+    plan = {}
+    for pid, qty in quantities.items():
+        prod = products[pid]
+        entry = plan.get(prod.shop_id)
+        if entry is None:
+            order = Order(
+                customer=customer,
+                shop=prod.shop,
+                total=Decimal("0.00"),
+                status="pending",
+                payment_confirmed=False,
+            )
+            entry = plan[prod.shop_id] = {"order": order, "items": []}
+        price = Decimal(prod.price)  # price from DB
+        entry["items"].append(OrderItem(product=prod, price=price, quantity=qty))
+        entry["order"].total += price * qty
+    return list(plan.values())
+
+
+def place_orders(items, customer=None):
+    """
+    Ejecuta el checkout completo y retorna la lista de órdenes creadas
+    (con `shop` cargado), en el orden en que aparecen los comercios en el carrito.
+    """
+    quantities = merge_lines(items)
+    products = load_products(quantities.keys())
+    validate_lines(quantities, products)
+    plan = build_orders(quantities, products, customer)
+
+    with transaction.atomic():
+        if not reserve(quantities):
+            # Otro checkout se llevó las unidades entre la lectura y la reserva
+            name = first_unavailable(quantities)
+            raise CheckoutError(f"Stock insuficiente para {name}")
+        orders = Order.objects.bulk_create([entry["order"] for entry in plan])
+        order_items = []
+        for order, entry in zip(orders, plan):
+            for item in entry["items"]:
+                item.order = order
+                order_items.append(item)
+        OrderItem.objects.bulk_create(order_items)
+    return orders
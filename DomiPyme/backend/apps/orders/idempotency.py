@@ -0,0 +1,136 @@
+# backend/apps/orders/idempotency.py
+"""
+Soporte de `Idempotency-Key` para endpoints POST.
+
+El primer request con una clave (por usuario) reserva una fila `processing`
+en `IdempotencyKey`, ejecuta la vista y guarda la respuesta. Los reintentos
+con la misma clave y el mismo payload reciben la respuesta guardada sin volver
+a ejecutar la vista (solo se consulta la tabla de claves). Si el primero sigue
+en curso, el reintento espera hasta IDEMPOTENCY_WAIT_SECONDS y luego recibe 409.
+
+La fila `processing` tiene un lease (`locked_until`, IDEMPOTENCY_PROCESSING_LEASE
+segundos): si el worker muere a mitad del request, el siguiente reintento
+pasado el lease la reemplaza en vez de recibir 409 hasta que venza la clave.
+"""
+import hashlib
+import json
+import time
+from datetime import timedelta
+from functools import wraps
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+
+from .models import IdempotencyKey
+
+HEADER = "Idempotency-Key"
+POLL_INTERVAL = 0.1
+
+
+def fingerprint(request):
+    body = json.dumps(request.data, sort_keys=True, cls=DjangoJSONEncoder)
+    return hashlib.sha256(f"{request.method}:{request.path}:{body}".encode()).hexdigest()
+
+
+def _claim(user, key, request_hash):
+    """Obtiene o crea la fila de la clave; las vencidas y los leases caídos se reemplazan."""
+    now = timezone.now()
+    lease = timedelta(seconds=settings.IDEMPOTENCY_PROCESSING_LEASE)
+    IdempotencyKey.objects.filter(user=user, key=key).filter(
+        Q(created_at__lt=now - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL))
+        | Q(status="processing", locked_until__lt=now)
+        | Q(status="processing", locked_until__isnull=True, created_at__lt=now - lease)
+    ).delete()
+    return IdempotencyKey.objects.get_or_create(
+        user=user, key=key, defaults={"request_hash": request_hash, "locked_until": now + lease}
+    )
+
+
+def _wait(entry):
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while entry.status == "processing" and time.monotonic() < deadline:
+        time.sleep(POLL_INTERVAL)
+        try:
+            entry.refresh_from_db()
+        except IdempotencyKey.DoesNotExist:
+            # El request original falló y liberó la clave
+            return None
+    return entry
+
+
+def _replay(entry):
+    response = Response(entry.response_body, status=entry.response_status)
+    response["Idempotent-Replayed"] = "true"
+    return response
+
+
+def idempotent(view_method):
+    """
+    Decorador para el método `post` de una APIView. Solo actúa si el request
+    trae la cabecera y el usuario está autenticado.
+    """
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        key = request.headers.get(HEADER)
+        if not key or not request.user.is_authenticated:
+            return view_method(self, request, *args, **kwargs)
+        if len(key) > 255:
+            return Response({"detail": f"{HEADER} demasiado larga."}, status=status.HTTP_400_BAD_REQUEST)
+
+        request_hash = fingerprint(request)
+        entry, created = _claim(request.user, key, request_hash)
+        if not created:
+            if entry.request_hash != request_hash:
+                return Response(
+                    {"detail": f"{HEADER} ya usada con un payload distinto."},
+                    status=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                )
+            entry = _wait(entry)
+            if entry is None:
+                return Response(
+                    {"detail": "El request original falló; reintenta."},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={"Retry-After": "1"},
+                )
+            if entry.status == "processing":
+                return Response(
+                    {"detail": "Un request con esta Idempotency-Key sigue en proceso."},
+                    status=status.HTTP_409_CONFLICT,
+                    headers={"Retry-After": "1"},
+                )
+            return _replay(entry)
+
+        try:
+            response = view_method(self, request, *args, **kwargs)
+        except Exception:
+            entry.delete()
+            raise
+        if response.status_code >= 500:
+            # Los errores del servidor no se guardan: el cliente puede reintentar
+            entry.delete()
+            return response
+        # Si el lease venció y otro request reemplazó la fila, no se pisa la suya
+        IdempotencyKey.objects.filter(pk=entry.pk, status="processing").update(
+            status="completed", response_status=response.status_code, response_body=response.data,
+            locked_until=None,
+        )
+        return response
+
+    return wrapper
+
+
+def purge_expired(batch_size=1000, now=None):
+    """Borra por lotes las claves más viejas que IDEMPOTENCY_KEY_TTL."""
+    cutoff = (now or timezone.now()) - timedelta(seconds=settings.IDEMPOTENCY_KEY_TTL)
+    deleted = 0
+    while True:
+        ids = list(
+            IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
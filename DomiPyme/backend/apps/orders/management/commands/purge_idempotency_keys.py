@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.orders.idempotency import purge_expired
+
+
+class Command(BaseCommand):
+    help = "Borra por lotes las Idempotency-Key más viejas que IDEMPOTENCY_KEY_TTL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000)
+
+    def handle(self, *args, **options):
+        deleted = purge_expired(batch_size=options["batch_size"])
+        self.stdout.write(f"Claves borradas: {deleted}")
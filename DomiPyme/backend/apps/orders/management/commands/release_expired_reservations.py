@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.reservations import release_expired
+
+
+class Command(BaseCommand):
+    help = "Cancela órdenes pending vencidas y libera su stock reservado (por lotes)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ttl", type=int, default=None, help="Segundos (default: STOCK_RESERVATION_TTL)")
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", type=int, default=0, metavar="SECONDS",
+                            help="Repetir cada N segundos en lugar de ejecutar una sola vez")
+
+    def handle(self, *args, **options):
+        while True:
+            released = release_expired(ttl=options["ttl"], batch_size=options["batch_size"])
+            self.stdout.write(f"Reservas liberadas: {released}")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
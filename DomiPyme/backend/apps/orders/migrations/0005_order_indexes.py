@@ -0,0 +1,66 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:42
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("shops", "0006_unique_shop_sku"),
+        ("orders", "0004_carts"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="order",
+            index=models.Index(
+                fields=["customer", "-created_at", "-id"],
+                name="order_customer_recent_idx",
+            ),
+        ),
+        AddIndexOnline(
+            model_name="order",
+            index=models.Index(
+                fields=["shop", "status", "-created_at", "-id"],
+                name="order_shop_status_recent_idx",
+            ),
+        ),
+        AddIndexOnline(
+            model_name="order",
+            index=models.Index(
+                condition=models.Q(("status", "pending")),
+                fields=["created_at", "id"],
+                name="order_pending_created_idx",
+            ),
+        ),
+        # Los índices propios de las FK quedan cubiertos por los compuestos; se
+        # borran después de crear estos para no dejar un hueco sin índice
+        migrations.AlterField(
+            model_name="order",
+            name="customer",
+            field=models.ForeignKey(
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="orders",
+                to=settings.AUTH_USER_MODEL,
+            ),
+        ),
+        migrations.AlterField(
+            model_name="order",
+            name="shop",
+            field=models.ForeignKey(
+                db_index=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="orders",
+                to="shops.shop",
+            ),
+        ),
+    ]
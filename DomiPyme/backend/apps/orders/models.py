@@ -1,5 +1,7 @@
 from django.db import models
+from django.db.models import Q
 from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
 from decimal import Decimal
 
 class Order(models.Model):
@@ -11,13 +13,25 @@ class Order(models.Model):
         ("delivered", "Delivered"),
         ("cancelled", "Cancelled"),
     ]
-    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="orders")
-    shop = models.ForeignKey("shops.Shop", on_delete=models.CASCADE, related_name="orders")
+    # Sin índice propio: los compuestos de Meta empiezan por estas columnas
+    customer = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, related_name="orders", db_index=False)
+    shop = models.ForeignKey("shops.Shop", on_delete=models.CASCADE, related_name="orders", db_index=False)
     total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
     created_at = models.DateTimeField(auto_now_add=True)
     payment_confirmed = models.BooleanField(default=False)
 
+    class Meta:
+        indexes = [
+            # Historial del cliente y listado del comercio (KeysetPagination)
+            models.Index(fields=["customer", "-created_at", "-id"], name="order_customer_recent_idx"),
+            models.Index(fields=["shop", "status", "-created_at", "-id"], name="order_shop_status_recent_idx"),
+            # Barrido de reservas vencidas (reservations.release_expired)
+            models.Index(
+                fields=["created_at", "id"], name="order_pending_created_idx", condition=Q(status="pending")
+            ),
+        ]
+
     def __str__(self):
         return f"Order {self.id} - {self.shop.name}"
 
@@ -26,3 +40,77 @@ class OrderItem(models.Model):
     product = models.ForeignKey("shops.Product", on_delete=models.SET_NULL, null=True)
     price = models.DecimalField(max_digits=12, decimal_places=2)
     quantity = models.IntegerField(default=1)
+
+
+class IdempotencyKey(models.Model):
+    """
+    Respuesta guardada de un POST enviado con cabecera `Idempotency-Key`
+    (ver apps.orders.idempotency). Se purga pasado IDEMPOTENCY_KEY_TTL; una
+    fila `processing` con `locked_until` vencido (el worker murió) se
+    reemplaza en el siguiente intento.
+    """
+    STATUS_CHOICES = [
+        ("processing", "Processing"),
+        ("completed", "Completed"),
+    ]
+    user = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="idempotency_keys")
+    key = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="processing")
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True, encoder=DjangoJSONEncoder)
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["user", "key"], name="orders_idempotency_user_key"),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}:{self.key} ({self.status})"
+
+
+class Cart(models.Model):
+    """
+    Carrito persistente del usuario. `total` e `item_count` (y los de
+    CartShopTotal) se actualizan por deltas en cada operación de línea
+    (apps.orders.carts), nunca recorriendo todas las líneas.
+    """
+    user = models.OneToOneField(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="cart")
+    total = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.IntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Cart {self.id} - {self.user_id}"
+
+class CartLine(models.Model):
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="lines")
+    product = models.ForeignKey("shops.Product", on_delete=models.CASCADE)
+    shop = models.ForeignKey("shops.Shop", on_delete=models.CASCADE)
+    quantity = models.PositiveIntegerField(default=1)
+    unit_price = models.DecimalField(max_digits=12, decimal_places=2)
+    added_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ["added_at", "id"]
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "product"], name="orders_cartline_cart_product"),
+        ]
+
+    @property
+    def subtotal(self):
+        return self.unit_price * self.quantity
+
+class CartShopTotal(models.Model):
+    cart = models.ForeignKey(Cart, on_delete=models.CASCADE, related_name="shop_totals")
+    shop = models.ForeignKey("shops.Shop", on_delete=models.CASCADE)
+    subtotal = models.DecimalField(max_digits=12, decimal_places=2, default=0)
+    item_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ["id"]
+        constraints = [
+            models.UniqueConstraint(fields=["cart", "shop"], name="orders_cartshoptotal_cart_shop"),
+        ]
@@ -0,0 +1,40 @@
+# backend/apps/orders/notifications.py
+"""
+Correos de órdenes, por el outbox (apps.outbox): se encolan en la misma
+transacción que cambia la orden y salen con `send_outbox`.
+"""
+from apps.outbox.delivery import enqueue_many
+from .models import Order
+
+
+def order_paid(order_ids):
+    """
+    Confirmación al cliente y aviso al comercio de cada orden pagada. Dos
+    queries sin importar cuántas órdenes (lectura + bulk insert).
+    """
+    if not order_ids:
+        return []
+    orders = Order.objects.filter(pk__in=order_ids).select_related("customer", "shop__owner").order_by("id")
+    messages = []
+    for order in orders:
+        if order.customer and order.customer.email:
+            messages.append({
+                "kind": "order_paid",
+                "to": [order.customer.email],
+                "subject": f"Pedido #{order.pk} confirmado - {order.shop.name}",
+                "body": (
+                    f"Hola,\n\nRecibimos el pago de tu pedido #{order.pk} en {order.shop.name} "
+                    f"por ${order.total}. Te avisaremos cuando esté en camino.\n\nGracias por comprar en DomiPyme."
+                ),
+            })
+        if order.shop.owner.email:
+            messages.append({
+                "kind": "merchant_order_paid",
+                "to": [order.shop.owner.email],
+                "subject": f"Nuevo pedido pagado #{order.pk}",
+                "body": (
+                    f"Hola,\n\n{order.shop.name} tiene un pedido pagado: #{order.pk} por ${order.total}. "
+                    f"Ya puedes prepararlo."
+                ),
+            })
+    return enqueue_many(messages)
@@ -0,0 +1,60 @@
+# backend/apps/orders/quote.py
+"""
+Cotización de un carrito sin efectos: precio actual, disponibilidad y
+subtotales por comercio a partir de los snapshots cacheados de producto
+(`apps.shops.snapshots`). No escribe nada y hace como máximo una query.
+"""
+from decimal import Decimal
+
+from apps.shops.snapshots import load_snapshots
+from .checkout import merge_lines
+
+
+def build_quote(items):
+    quantities = merge_lines(items)
+    requested = {}
+    for it in items:
+        requested.setdefault(it["product"], it.get("price"))
+    snapshots = load_snapshots(quantities.keys())
+
+    lines, shops, errors = [], {}, []
+    for pid, qty in quantities.items():
+        snap = snapshots.get(pid)
+        if snap is None or not snap["active"]:
+            lines.append({"product": pid, "qty": qty, "available": 0, "in_stock": False, "error": "not_found"})
+            errors.append(f"Producto {pid} no encontrado")
+            continue
+        price = Decimal(snap["price"])
+        subtotal = price * qty
+        in_stock = snap["available"] >= qty
+        if not in_stock:
+            errors.append(f"Stock insuficiente para {snap['name']}")
+        asked = requested.get(pid)
+        lines.append({
+            "product": pid,
+            "name": snap["name"],
+            "qty": qty,
+            "price": str(price),
+            "price_changed": asked is not None and Decimal(asked) != price,
+            "available": snap["available"],
+            "in_stock": in_stock,
+            "subtotal": str(subtotal),
+            "shop_id": snap["shop_id"],
+        })
+        shop = shops.setdefault(snap["shop_id"], {
+            "shop_id": snap["shop_id"],
+            "shop_name": snap["shop_name"],
+            "subtotal": Decimal("0.00"),
+            "items": 0,
+        })
+        shop["subtotal"] += subtotal
+        shop["items"] += qty
+
+    total = sum((s["subtotal"] for s in shops.values()), Decimal("0.00"))
+    return {
+        "lines": lines,
+        "shops": [{**s, "subtotal": str(s["subtotal"])} for s in shops.values()],
+        "total": str(total),
+        "valid": not errors,
+        "errors": errors,
+    }
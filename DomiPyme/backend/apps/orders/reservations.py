@@ -0,0 +1,155 @@
+# backend/apps/orders/reservations.py
+"""
+Reservas de stock para el checkout.
+
+`Product.stock` son las unidades físicas y `Product.reserved` las apartadas por
+órdenes `pending`. Disponible = stock - reserved.
+
+- `reserve`: al hacer checkout se aparta todo el carrito con un único UPDATE
+  condicional (`stock >= reserved + qty`), sin SELECT ... FOR UPDATE previo.
+- `commit_reservations`: al confirmar el pago la orden pasa a `paid` y las
+  unidades salen de stock y de reserved.
+- `release_reservations` / `release_expired`: las órdenes que siguen en
+  `pending` pasado `STOCK_RESERVATION_TTL` se cancelan y devuelven lo apartado.
+
+La transición de estado de la orden (`state_machine.bulk_transition`, un
+UPDATE condicional con RETURNING) es la que garantiza que una reserva se
+confirme o se libere una sola vez.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, Sum, Value, When
+from django.utils import timezone
+
+from apps.shops.models import Product
+from apps.shops.signals import products_changed
+from .models import Order, OrderItem
+from .state_machine import TransitionResult, bulk_transition
+
+
+def _per_product(quantities):
+    """Expresión CASE que devuelve la cantidad correspondiente a cada producto."""
+    whens = [When(pk=pid, then=Value(qty)) for pid, qty in quantities.items()]
+    return Case(*whens, default=Value(0), output_field=IntegerField())
+
+
+def reserve(quantities):
+    """
+    Aparta `quantities` ({product_id: qty}) en un solo UPDATE condicional.
+    Retorna True si se reservaron todas las líneas. Debe llamarse dentro de
+    una transacción para poder deshacer la reserva parcial si retorna False.
+    """
+    if not quantities:
+        return True
+    delta = _per_product(quantities)
+    updated = Product.objects.filter(
+        pk__in=list(quantities), stock__gte=F("reserved") + delta
+    ).update(reserved=F("reserved") + delta)
+    if updated:
+        products_changed.send(sender=Product, product_ids=list(quantities), fields=("stock", "reserved"))
+    return updated == len(quantities)
+
+
+def first_unavailable(quantities):
+    """Primer producto (en orden del carrito) sin unidades suficientes, o None."""
+    rows = Product.objects.filter(pk__in=list(quantities)).values_list("pk", "name", "stock", "reserved")
+    current = {pk: (name, stock - reserved) for pk, name, stock, reserved in rows}
+    for pid, qty in quantities.items():
+        name, available = current.get(pid, (None, 0))
+        if available < qty:
+            return name
+    return None
+
+
+def reserved_quantities(order_ids):
+    """Suma de unidades por producto de las órdenes dadas: {product_id: qty}."""
+    rows = (
+        OrderItem.objects.filter(order_id__in=order_ids, product__isnull=False)
+        .values("product_id")
+        .annotate(qty=Sum("quantity"))
+        .order_by()
+    )
+    return {row["product_id"]: row["qty"] for row in rows}
+
+
+def _apply(order_ids, stock_sign):
+    quantities = reserved_quantities(order_ids)
+    if not quantities:
+        return
+    delta = _per_product(quantities)
+    changes = {"reserved": F("reserved") - delta}
+    if stock_sign:
+        changes["stock"] = F("stock") - delta
+    Product.objects.filter(pk__in=list(quantities)).update(**changes)
+    products_changed.send(sender=Product, product_ids=list(quantities), fields=("stock", "reserved"))
+
+
+def _transition(order_ids, target, queryset=None, **extra):
+    """Pasa a `target` solo las órdenes que siguen `pending` (UPDATE ... RETURNING)."""
+    return bulk_transition(order_ids, target, queryset=queryset, sources=("pending",), **extra).updated
+
+
+def commit_reservations(order_ids):
+    """
+    Confirma el pago de las órdenes: pending -> paid y descuenta de stock las
+    unidades reservadas, con un UPDATE para todos los productos afectados.
+    Retorna los ids realmente confirmados.
+    """
+    with transaction.atomic():
+        ids = _transition(order_ids, "paid", payment_confirmed=True)
+        if ids:
+            _apply(ids, stock_sign=True)
+    return ids
+
+
+def release_reservations(order_ids, queryset=None):
+    """Cancela órdenes pendientes y devuelve sus unidades reservadas."""
+    with transaction.atomic():
+        ids = _transition(order_ids, "cancelled", queryset=queryset)
+        if ids:
+            _apply(ids, stock_sign=False)
+    return ids
+
+
+def cancel_orders(order_ids, queryset=None):
+    """
+    Cancelación masiva: las órdenes pending liberan su reserva; las ya pagadas
+    o en preparación solo cambian de estado. Retorna TransitionResult.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    with transaction.atomic():
+        released = set(release_reservations(order_ids, queryset=queryset))
+        rest = [pk for pk in order_ids if pk not in released]
+        others = bulk_transition(rest, "cancelled", queryset=queryset, sources=("paid", "preparing"))
+    done = released | set(others.updated)
+    return TransitionResult(
+        [pk for pk in order_ids if pk in done],
+        [pk for pk in order_ids if pk not in done],
+    )
+
+
+def release_expired(ttl=None, batch_size=None, now=None):
+    """
+    Libera por lotes las reservas de órdenes `pending` más viejas que `ttl`
+    segundos. Cada lote es una transacción corta. Retorna cuántas órdenes se
+    cancelaron.
+    """
+    ttl = settings.STOCK_RESERVATION_TTL if ttl is None else ttl
+    batch_size = batch_size or settings.STOCK_RESERVATION_SWEEP_BATCH
+    cutoff = (now or timezone.now()) - timedelta(seconds=ttl)
+    released = 0
+    while True:
+        batch = list(
+            Order.objects.filter(status="pending", created_at__lt=cutoff)
+            .order_by("created_at", "pk")
+            .values_list("pk", flat=True)[:batch_size]
+        )
+        if not batch:
+            return released
+        done = release_reservations(batch)
+        released += len(done)
+        # Si todo el lote estaba bloqueado por otro proceso, se reintenta en la próxima pasada
+        if len(batch) < batch_size or not done:
+            return released
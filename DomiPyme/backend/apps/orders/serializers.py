@@ -1,5 +1,6 @@
 from rest_framework import serializers
-from .models import Order, OrderItem
+from .models import Cart, CartLine, CartShopTotal, Order, OrderItem
+from .state_machine import MERCHANT_TARGETS
 
 class OrderItemInputSerializer(serializers.Serializer):
     product = serializers.IntegerField()
@@ -8,10 +9,60 @@ class OrderItemInputSerializer(serializers.Serializer):
     qty = serializers.IntegerField(min_value=1)
 
 class CheckoutSerializer(serializers.Serializer):
-    items = OrderItemInputSerializer(many=True)
+    items = OrderItemInputSerializer(many=True, required=False)
     shop_id = serializers.IntegerField(required=False)
+    from_cart = serializers.BooleanField(default=False)
+
+    def validate(self, attrs):
+        if not attrs.get("from_cart") and "items" not in attrs:
+            raise serializers.ValidationError({"items": "Este campo es requerido."})
+        return attrs
+
+class OrderItemSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", default=None, read_only=True)
+
+    class Meta:
+        model = OrderItem
+        fields = ("id", "product", "product_name", "price", "quantity")
 
 class OrderSerializer(serializers.ModelSerializer):
+    shop_name = serializers.CharField(source="shop.name", read_only=True)
+    items = OrderItemSerializer(many=True, read_only=True)
+
     class Meta:
         model = Order
-        fields = "__all__"
+        fields = ("id", "customer", "shop", "shop_name", "total", "status", "payment_confirmed", "created_at", "items")
+
+class OrderTransitionSerializer(serializers.Serializer):
+    ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=1000)
+    status = serializers.ChoiceField(choices=MERCHANT_TARGETS)
+
+class CartLineSerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source="product.name", read_only=True)
+    subtotal = serializers.DecimalField(max_digits=12, decimal_places=2, read_only=True)
+
+    class Meta:
+        model = CartLine
+        fields = ("product", "product_name", "shop", "quantity", "unit_price", "subtotal")
+
+class CartShopTotalSerializer(serializers.ModelSerializer):
+    shop_name = serializers.CharField(source="shop.name", read_only=True)
+
+    class Meta:
+        model = CartShopTotal
+        fields = ("shop", "shop_name", "subtotal", "item_count")
+
+class CartSerializer(serializers.ModelSerializer):
+    lines = CartLineSerializer(many=True, read_only=True)
+    shops = CartShopTotalSerializer(source="shop_totals", many=True, read_only=True)
+
+    class Meta:
+        model = Cart
+        fields = ("id", "total", "item_count", "lines", "shops", "updated_at")
+
+class CartItemInputSerializer(serializers.Serializer):
+    product = serializers.IntegerField()
+    qty = serializers.IntegerField(min_value=1, default=1)
+
+class CartItemUpdateSerializer(serializers.Serializer):
+    qty = serializers.IntegerField(min_value=0)
@@ -0,0 +1,103 @@
+# backend/apps/orders/state_machine.py
+"""
+Máquina de estados de `Order`.
+
+    pending -> paid -> preparing -> dispatched -> delivered
+    pending / paid / preparing -> cancelled
+
+`bulk_transition` aplica una transición a muchas órdenes con un único
+`UPDATE ... WHERE id IN (...) AND status IN (<orígenes válidos>) RETURNING id`:
+no carga ni guarda órdenes una por una y dos procesos que compiten por la
+misma orden no pueden moverla dos veces.
+"""
+from typing import NamedTuple
+
+from django.db import connections, router, transaction
+from django.db.models import sql
+
+from .models import Order
+
+TRANSITIONS = {
+    "paid": ("pending",),
+    "preparing": ("paid",),
+    "dispatched": ("preparing",),
+    "delivered": ("dispatched",),
+    "cancelled": ("pending", "paid", "preparing"),
+}
+
+# Estados que un comercio puede fijar a mano (paid solo lo pone el webhook de pago)
+MERCHANT_TARGETS = ("preparing", "dispatched", "delivered", "cancelled")
+
+
+class InvalidTransition(ValueError):
+    pass
+
+
+class TransitionResult(NamedTuple):
+    updated: list
+    skipped: list
+
+
+def allowed_sources(target):
+    try:
+        return TRANSITIONS[target]
+    except KeyError:
+        raise InvalidTransition(f"Estado destino inválido: {target}")
+
+
+def can_transition(source, target):
+    return source in allowed_sources(target)
+
+
+def _update_returning(queryset, values, db):
+    """UPDATE condicional que devuelve los ids afectados (Postgres y SQLite >= 3.35)."""
+    connection = connections[db]
+    query = queryset.query.chain(sql.UpdateQuery)
+    query.add_update_values(values)
+    compiler = query.get_compiler(db)
+    compiler.pre_sql_setup()
+    update_sql, params = compiler.as_sql()
+    pk = connection.ops.quote_name(Order._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(f"{update_sql} RETURNING {pk}", params)
+        return [row[0] for row in cursor.fetchall()]
+
+
+def _update_locking(queryset, values, db):
+    """Alternativa para motores sin RETURNING: bloquear, leer ids y actualizar."""
+    with transaction.atomic(using=db):
+        ids = list(queryset.using(db).select_for_update().values_list("pk", flat=True))
+        if ids:
+            Order.objects.using(db).filter(pk__in=ids).update(**values)
+    return ids
+
+
+def bulk_transition(order_ids, target, queryset=None, sources=None, **extra):
+    """
+    Pasa a `target` las órdenes de `order_ids` que estén en un estado de origen
+    válido (o en `sources`, que debe ser un subconjunto). `queryset` limita el
+    alcance (p.ej. órdenes de los comercios del usuario). `extra` son columnas
+    adicionales a actualizar. Retorna TransitionResult(updated, skipped).
+    """
+    valid = allowed_sources(target)
+    if sources is not None:
+        sources = tuple(s for s in sources if s in valid)
+    else:
+        sources = valid
+    order_ids = list(dict.fromkeys(order_ids))
+    if not order_ids or not sources:
+        return TransitionResult([], order_ids)
+
+    base = Order.objects.all() if queryset is None else queryset
+    qs = base.filter(pk__in=order_ids, status__in=sources)
+    values = {"status": target, **extra}
+    db = router.db_for_write(Order)
+    if connections[db].vendor in ("postgresql", "sqlite"):
+        updated = _update_returning(qs, values, db)
+    else:
+        updated = _update_locking(qs, values, db)
+    done = set(updated)
+    return TransitionResult(
+        [pk for pk in order_ids if pk in done],
+        [pk for pk in order_ids if pk not in done],
+    )
@@ -0,0 +1,122 @@
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.db.models import QuerySet
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders import carts
+from apps.orders.models import Cart, CartLine, CartShopTotal, Order
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def setup(db):
+    user = User.objects.create_user(email="cart@test.com", password="pass1234")
+    a = Shop.objects.create(owner=user, name="A", slug="ca")
+    b = Shop.objects.create(owner=user, name="B", slug="cb")
+    products = [Product.objects.create(shop=a, name=f"P{i}", price=1000 + i, stock=10) for i in range(20)]
+    leche = Product.objects.create(shop=b, name="Leche", price=4500, stock=2)
+    client = APIClient()
+    client.force_authenticate(user)
+    return client, user, products, leche
+
+
+def _add(client, product, qty=1):
+    return client.post(reverse("cart-items"), {"product": product, "qty": qty}, format="json")
+
+
+def test_cart_totals_follow_line_changes(setup):
+    client, user, products, leche = setup
+    _add(client, products[0].id, 2)
+    _add(client, products[0].id, 1)
+    resp = _add(client, leche.id)
+    assert resp.status_code == 200
+    assert resp.data["total"] == "7500.00" and resp.data["item_count"] == 4
+    assert {s["shop_name"]: s["subtotal"] for s in resp.data["shops"]} == {"A": "3000.00", "B": "4500.00"}
+
+    url = reverse("cart-item-detail", args=[products[0].id])
+    resp = client.patch(url, {"qty": 1}, format="json")
+    assert resp.data["total"] == "5500.00"
+
+    resp = client.delete(reverse("cart-item-detail", args=[leche.id]))
+    assert resp.data["total"] == "1000.00"
+    assert [s["shop_name"] for s in resp.data["shops"]] == ["A"]
+
+    resp = _add(client, leche.id, 3)
+    assert resp.status_code == 400
+    assert Cart.objects.get(user=user).total == 1000
+
+
+def test_add_cost_does_not_grow_with_cart(setup):
+    client, user, products, leche = setup
+    cart = Cart.objects.create(user=user)
+    from apps.orders import carts
+
+    def cost(product):
+        with CaptureQueriesContext(connection) as ctx:
+            carts.add_item(cart, product.id)
+        return len(ctx.captured_queries)
+
+    carts.add_item(cart, products[0].id)
+    first = cost(products[1])
+    for p in products[2:-1]:
+        carts.add_item(cart, p.id)
+    assert cost(products[-1]) == first
+
+
+def test_checkout_from_cart_empties_it(setup):
+    client, user, products, leche = setup
+    _add(client, products[0].id, 2)
+    _add(client, leche.id)
+    resp = client.post(reverse("orders-checkout"), {"from_cart": True}, format="json")
+    assert resp.status_code == 201
+    assert Order.objects.filter(customer=user).count() == 2
+    cart = client.get(reverse("cart")).data
+    assert cart["lines"] == [] and cart["total"] == "0.00"
+
+    resp = client.post(reverse("orders-checkout"), {"from_cart": True}, format="json")
+    assert resp.status_code == 400
+
+
+def test_concurrent_first_add_becomes_an_update(setup):
+    client, user, products, leche = setup
+    cart = Cart.objects.create(user=user)
+    product = carts._product
+
+    def racing(product_id):
+        # Otro request agrega el mismo producto después de nuestro SELECT
+        if not CartLine.objects.filter(cart=cart).exists():
+            with mock.patch.object(carts, "_product", product):
+                carts.add_item(cart, product_id, 2)
+        return product(product_id)
+
+    with mock.patch.object(carts, "_product", racing):
+        carts.add_item(cart, products[0].id, 1)
+    cart.refresh_from_db()
+    assert CartLine.objects.get(cart=cart).quantity == 3
+    assert (cart.total, cart.item_count) == (3000, 3)
+    assert CartShopTotal.objects.filter(cart=cart).values_list("subtotal", "item_count").get() == (3000, 3)
+
+
+def test_concurrent_shop_total_insert_becomes_an_update(setup):
+    client, user, products, leche = setup
+    cart = Cart.objects.create(user=user)
+    shop_id = products[0].shop_id
+    update = QuerySet.update
+
+    def racing(queryset, **changes):
+        if queryset.model is CartShopTotal and not CartShopTotal.objects.exists():
+            # Otro request crea el total del comercio entre nuestro UPDATE y el INSERT
+            CartShopTotal.objects.create(cart=cart, shop_id=shop_id, subtotal=1001, item_count=1)
+            return 0
+        return update(queryset, **changes)
+
+    with mock.patch.object(QuerySet, "update", racing):
+        carts._bump(cart, shop_id, 1000, 1)
+    assert CartShopTotal.objects.filter(cart=cart).values_list("subtotal", "item_count").get() == (2001, 2)
@@ -17,3 +17,71 @@ def test_checkout_creates_order():
     resp = client.post(reverse("orders-checkout"), payload, format="json")
     assert resp.status_code == 201
     assert "payment_url" in resp.data
+
+
+def _cart(shops, lines_per_shop):
+    products = []
+    for shop in shops:
+        for i in range(lines_per_shop):
+            products.append(Product.objects.create(shop=shop, name=f"{shop.slug}-p{i}", price=1500, stock=10))
+    return {"items": [{"product": p.id, "price": "1500.00", "qty": 2} for p in products]}
+
+
+def _checkout_queries(client, payload):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.post(reverse("orders-checkout"), payload, format="json")
+    assert resp.status_code == 201, resp.data
+    return len(ctx.captured_queries)
+
+
+@pytest.mark.django_db
+def test_checkout_query_budget_is_constant():
+    from apps.orders.models import Order, OrderItem
+    client = APIClient()
+    user = User.objects.create_user(email="bulk@test.com", password="pass1234")
+    client.force_authenticate(user=user)
+    shops = [Shop.objects.create(owner=user, name=f"Tienda {i}", slug=f"tienda-{i}") for i in range(4)]
+
+    small = _checkout_queries(client, _cart(shops[:1], 1))
+    large = _checkout_queries(client, _cart(shops, 10))
+
+    assert large == small
+    # SELECT de productos, SAVEPOINT, UPDATE de reservas, SELECT de las filas
+    # que cruzan el cero (facets.stock_flips), UPDATE de la proyección
+    # (projection.refresh_stock), INSERT de órdenes, INSERT de ítems, RELEASE
+    # e INSERT de transacciones. Ningún producto se agota, así que no hay
+    # upsert de facetas (ShopFacet); agotar uno agrega justo ese.
+    assert large == 9
+    last = Product.objects.create(shop=shops[0], name="Último", price=1500, stock=2)
+    assert _checkout_queries(client, {"items": [{"product": last.id, "price": "1500.00", "qty": 2}]}) == 10
+    assert Order.objects.count() == 6
+    assert OrderItem.objects.count() == 42
+    for order in Order.objects.prefetch_related("items"):
+        assert order.total == sum(i.price * i.quantity for i in order.items.all())
+
+
+@pytest.mark.django_db
+def test_checkout_multi_shop_response_and_merged_lines():
+    client = APIClient()
+    user = User.objects.create_user(email="multi@test.com", password="pass1234")
+    client.force_authenticate(user=user)
+    a = Shop.objects.create(owner=user, name="A", slug="a")
+    b = Shop.objects.create(owner=user, name="B", slug="b")
+    pa = Product.objects.create(shop=a, name="Arepa", price=2000, stock=6)
+    pb = Product.objects.create(shop=b, name="Buñuelo", price=500, stock=1)
+    payload = {"items": [
+        {"product": pa.id, "price": "2000.00", "qty": 1},
+        {"product": pb.id, "price": "500.00", "qty": 1},
+        {"product": pa.id, "price": "2000.00", "qty": 2},
+    ]}
+    resp = client.post(reverse("orders-checkout"), payload, format="json")
+    assert resp.status_code == 201
+    assert [o["shop_id"] for o in resp.data["orders"]] == [a.id, b.id]
+    assert resp.data["orders"][0]["total"] == "6000.00"
+
+    payload["items"][1]["qty"] = 2
+    resp = client.post(reverse("orders-checkout"), payload, format="json")
+    assert resp.status_code == 400
+    assert "Buñuelo" in resp.data["detail"]
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.idempotency import purge_expired
+from apps.orders.models import IdempotencyKey, Order
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def checkout(db):
+    user = User.objects.create_user(email="idem@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=user, name="Idem", slug="idem")
+    product = Product.objects.create(shop=shop, name="Pan", price=800, stock=10)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    payload = {"items": [{"product": product.id, "price": "800.00", "qty": 1}]}
+
+    def post(key, data=None):
+        return client.post(reverse("orders-checkout"), data or payload, format="json", HTTP_IDEMPOTENCY_KEY=key)
+
+    post.user = user
+    post.product = product
+    return post
+
+
+def test_retry_replays_stored_response(checkout):
+    first = checkout("abc")
+    assert first.status_code == 201
+    with CaptureQueriesContext(connection) as ctx:
+        retry = checkout("abc")
+    assert retry.status_code == 201
+    assert retry.data == first.data
+    assert retry["Idempotent-Replayed"] == "true"
+    assert Order.objects.count() == 1
+    tables = " ".join(q["sql"] for q in ctx.captured_queries)
+    assert "orders_order" not in tables and "shops_product" not in tables
+
+
+def test_same_key_with_other_payload_is_rejected(checkout):
+    assert checkout("k1").status_code == 201
+    other = {"items": [{"product": checkout.product.id, "price": "800.00", "qty": 2}]}
+    assert checkout("k1", other).status_code == 422
+    assert Order.objects.count() == 1
+
+
+def test_in_flight_key_returns_conflict(checkout, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0
+    assert checkout("busy").status_code == 201
+    # simula que el request original sigue ejecutándose
+    IdempotencyKey.objects.filter(key="busy").update(status="processing", response_body=None)
+    resp = checkout("busy")
+    assert resp.status_code == 409
+    assert resp["Retry-After"] == "1"
+    assert Order.objects.count() == 1
+
+
+def test_expired_keys_are_purged(checkout):
+    checkout("old")
+    checkout("new", {"items": [{"product": checkout.product.id, "price": "800.00", "qty": 3}]})
+    IdempotencyKey.objects.filter(key="old").update(created_at=timezone.now() - timedelta(days=2))
+    assert purge_expired(batch_size=1) == 1
+    assert list(IdempotencyKey.objects.values_list("key", flat=True)) == ["new"]
+
+
+def test_processing_key_of_a_dead_worker_is_reclaimed_after_the_lease(checkout, settings):
+    settings.IDEMPOTENCY_WAIT_SECONDS = 0
+    assert checkout("dead").status_code == 201
+    # el worker "murió" con la fila en proceso y el lease vigente: 409
+    IdempotencyKey.objects.filter(key="dead").update(
+        status="processing", response_body=None, locked_until=timezone.now() + timedelta(minutes=1)
+    )
+    assert checkout("dead").status_code == 409
+    # vencido el lease, el reintento la toma y ejecuta la vista
+    IdempotencyKey.objects.filter(key="dead").update(locked_until=timezone.now() - timedelta(seconds=1))
+    assert checkout("dead").status_code == 201
+    entry = IdempotencyKey.objects.get(key="dead")
+    assert (entry.status, entry.response_status, entry.locked_until) == ("completed", 201, None)
@@ -0,0 +1,98 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order, OrderItem
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def data(db):
+    customer = User.objects.create_user(email="cliente@test.com", password="pass1234")
+    owner = User.objects.create_user(email="dueno@test.com", password="pass1234")
+    other = User.objects.create_user(email="otro@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=owner, name="Panadería", slug="panaderia")
+    foreign = Shop.objects.create(owner=other, name="Ajena", slug="ajena")
+    products = [Product.objects.create(shop=shop, name=f"P{i}", price=1000, stock=100) for i in range(3)]
+    now = timezone.now()
+
+    def make(count, target_shop=shop, status="pending"):
+        created = []
+        for i in range(count):
+            order = Order.objects.create(customer=customer, shop=target_shop, total=3000, status=status)
+            # varias órdenes comparten created_at para ejercitar el desempate por id
+            Order.objects.filter(pk=order.pk).update(created_at=now - timedelta(days=i // 3))
+            OrderItem.objects.bulk_create(OrderItem(order=order, product=p, price=1000, quantity=1) for p in products)
+            created.append(order)
+        return created
+
+    return {"customer": customer, "owner": owner, "shop": shop, "foreign": foreign, "make": make}
+
+
+def _client(user):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    return client
+
+
+def _queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(url)
+    assert resp.status_code == 200
+    return len(ctx.captured_queries)
+
+
+def test_listing_uses_fixed_number_of_queries(data):
+    client = _client(data["customer"])
+    data["make"](2)
+    few = _queries(client, reverse("orders-list"))
+    data["make"](20)
+    many = _queries(client, reverse("orders-list") + "?page_size=20")
+    assert few == many == 2
+
+
+def test_keyset_cursor_walks_every_order_once(data):
+    orders = data["make"](17)
+    client = _client(data["customer"])
+    url, seen = reverse("orders-list") + "?page_size=5", []
+    while url:
+        resp = client.get(url)
+        seen += [o["id"] for o in resp.data["results"]]
+        url = resp.data["next"]
+    assert sorted(seen) == sorted(o.id for o in orders)
+    assert len(seen) == len(set(seen))
+    first = client.get(reverse("orders-list") + "?page_size=1").data["results"][0]
+    assert len(first["items"]) == 3 and first["items"][0]["product_name"].startswith("P")
+
+
+def test_merchant_sees_only_own_shops_and_filters(data):
+    data["make"](4)
+    data["make"](2, status="paid")
+    data["make"](3, target_shop=data["foreign"])
+    client = _client(data["owner"])
+
+    resp = client.get(reverse("merchant-orders-list") + "?page_size=50")
+    assert len(resp.data["results"]) == 6
+    resp = client.get(reverse("merchant-orders-list") + "?status=paid")
+    assert {o["status"] for o in resp.data["results"]} == {"paid"}
+    today = timezone.localdate().isoformat()
+    resp = client.get(reverse("merchant-orders-list") + f"?created_after={today}&page_size=50")
+    assert len(resp.data["results"]) == 5
+    assert client.get(reverse("merchant-orders-list") + "?status=lost").status_code == 400
+
+
+def test_detail_visible_to_customer_and_owner_only(data):
+    order = data["make"](1)[0]
+    url = reverse("orders-detail", kwargs={"pk": order.pk})
+    assert _client(data["customer"]).get(url).status_code == 200
+    assert _client(data["owner"]).get(url).status_code == 200
+    stranger = User.objects.create_user(email="x@test.com", password="pass1234")
+    assert _client(stranger).get(url).status_code == 404
@@ -0,0 +1,132 @@
+"""
+Regresión de índices: cada query caliente debe resolverse con un índice, no
+recorriendo la tabla. Si alguien cambia un filtro/orden o borra un índice,
+EXPLAIN lo delata acá.
+"""
+from datetime import timedelta
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from apps.common.pagination import KeysetPagination
+from apps.common.query_plans import analyze, plan_problems
+from apps.orders.models import IdempotencyKey, Order
+from apps.payments.models import Transaction, WebhookEvent
+from apps.products.models import Product as CatalogProduct
+from apps.shops.models import CatalogEntry, Product, Shop
+from apps.shops.signals import products_changed
+
+User = get_user_model()
+
+STATUSES = ["delivered"] * 14 + ["paid", "preparing", "dispatched", "cancelled", "pending"]
+
+
+@pytest.fixture
+def seeded(db):
+    users = User.objects.bulk_create(
+        User(email=f"Usuario{i}@Test.com", password="!") for i in range(60)
+    )
+    shops = Shop.objects.bulk_create(
+        Shop(owner=users[i], name=f"Tienda {i}", slug=f"tienda-{i}") for i in range(12)
+    )
+    products = Product.objects.bulk_create(
+        Product(shop=shops[i % 12], name=f"Producto {i}", price=1000, stock=10, active=i % 7 != 0)
+        for i in range(600)
+    )
+    products_changed.send(sender=Product, product_ids=[p.pk for p in products])
+    CatalogProduct.objects.bulk_create(
+        CatalogProduct(name=f"Catálogo {i}", slug=f"catalogo-{i}", price=1000, active=i % 5 != 0)
+        for i in range(600)
+    )
+    orders = Order.objects.bulk_create(
+        Order(customer=users[i % 60], shop=shops[i % 12], total=Decimal("1000"), status=STATUSES[i % len(STATUSES)])
+        for i in range(3000)
+    )
+    Transaction.objects.bulk_create(
+        Transaction(order=o, provider="sandbox", provider_tx_id=f"sbx-{o.pk}", amount=o.total, status="approved")
+        for o in orders[::3]
+    )
+    WebhookEvent.objects.bulk_create(
+        WebhookEvent(provider="sandbox", provider_tx_id=f"sbx-{i}", payload={}, status="processed")
+        for i in range(500)
+    )
+    IdempotencyKey.objects.bulk_create(
+        IdempotencyKey(user=users[i % 60], key=f"k-{i}", request_hash="x", status="completed") for i in range(500)
+    )
+    analyze()
+    return {"users": users, "shops": shops}
+
+
+def assert_indexed(queryset, allow_sort=True):
+    problems = plan_problems(queryset, allow_sort=allow_sort)
+    assert not problems, f"Plan sin índice para:\n{queryset.query}\n{problems}"
+
+
+def test_catalog_active_listing(seeded):
+    qs = CatalogProduct.objects.filter(active=True).order_by("-created_at", "-id")
+    assert_indexed(qs[:12], allow_sort=False)
+    # Página siguiente por cursor (HybridPagination en modo cursor): rango sobre el mismo índice
+    last = qs[11]
+    seek = KeysetPagination().seek_filter([last.created_at, last.pk])
+    assert_indexed(qs.filter(seek)[:12], allow_sort=False)
+
+
+def test_shop_listing(seeded):
+    assert_indexed(Shop.objects.order_by("-created_at", "-id")[:12], allow_sort=False)
+
+
+def test_shop_active_products(seeded):
+    shop = seeded["shops"][0]
+    qs = Product.objects.filter(shop=shop, active=True).order_by("-created_at", "-id")[:24]
+    assert_indexed(qs, allow_sort=False)
+
+
+def test_storefront_projection_listing(seeded):
+    qs = CatalogEntry.objects.filter(shop_slug="tienda-2").order_by("-created_at", "-id")
+    assert_indexed(qs[:24], allow_sort=False)
+    assert_indexed(qs.filter(category_id=1)[:24], allow_sort=False)
+
+
+def test_customer_order_history(seeded):
+    qs = Order.objects.filter(customer=seeded["users"][5]).order_by("-created_at", "-id")[:20]
+    assert_indexed(qs, allow_sort=False)
+
+
+def test_merchant_orders_by_status(seeded):
+    shop = seeded["shops"][3]
+    qs = Order.objects.filter(shop=shop, status="paid").order_by("-created_at", "-id")[:20]
+    assert_indexed(qs, allow_sort=False)
+    # Todos los comercios del dueño: el índice filtra, el orden final se mezcla
+    owner_qs = Order.objects.filter(shop__owner=shop.owner, status__in=["paid", "preparing"])
+    assert_indexed(owner_qs.order_by("-created_at", "-id")[:20])
+    assert_indexed(Order.objects.filter(shop__owner=shop.owner).order_by("-created_at", "-id")[:20])
+
+
+def test_expired_pending_orders(seeded):
+    cutoff = timezone.now() + timedelta(minutes=1)
+    qs = Order.objects.filter(status="pending", created_at__lt=cutoff).order_by("created_at", "pk")
+    assert_indexed(qs.values_list("pk", flat=True)[:500], allow_sort=False)
+
+
+def test_transactions_by_provider_tx_id(seeded):
+    qs = Transaction.objects.filter(provider_tx_id__in=["sbx-1", "sbx-4"], status__in=["approved"])
+    assert_indexed(qs.values_list("provider", "provider_tx_id"))
+
+
+def test_user_by_email_case_insensitive(seeded):
+    qs = User.objects.by_email("usuario7@test.com")
+    assert_indexed(qs)
+    assert qs.get().email == "Usuario7@Test.com"
+
+
+def test_pending_webhooks_and_idempotency_purge(seeded):
+    assert_indexed(WebhookEvent.objects.filter(status="pending").order_by("id")[:100], allow_sort=False)
+    cutoff = timezone.now() - timedelta(days=1)
+    assert_indexed(IdempotencyKey.objects.filter(created_at__lt=cutoff).values_list("pk", flat=True)[:500])
+
+
+def test_detects_sequential_scan(seeded):
+    # Sin índice en `total`: el harness tiene que marcarlo
+    assert plan_problems(Order.objects.filter(total__gt=10))
@@ -0,0 +1,66 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.checkout import place_orders
+from apps.orders.models import Order
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def cart(db):
+    user = User.objects.create_user(email="q@test.com", password="pass1234")
+    a = Shop.objects.create(owner=user, name="A", slug="qa")
+    b = Shop.objects.create(owner=user, name="B", slug="qb")
+    pa = Product.objects.create(shop=a, name="Arroz", price=3000, stock=5)
+    pb = Product.objects.create(shop=b, name="Leche", price=4500, stock=1)
+    payload = {"items": [
+        {"product": pa.id, "price": "3000.00", "qty": 2},
+        {"product": pb.id, "price": "4500.00", "qty": 1},
+    ]}
+    return pa, pb, payload
+
+
+def _quote(payload):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = APIClient().post(reverse("orders-checkout-quote"), payload, format="json")
+    assert resp.status_code == 200
+    return resp.data, len(ctx.captured_queries)
+
+
+def test_quote_is_cached_and_side_effect_free(cart):
+    pa, pb, payload = cart
+    data, queries = _quote(payload)
+    assert queries == 1
+    assert data["valid"] and data["total"] == "10500.00"
+    assert [(s["shop_name"], s["subtotal"]) for s in data["shops"]] == [("A", "6000.00"), ("B", "4500.00")]
+
+    data, queries = _quote(payload)
+    assert queries == 0
+    assert Order.objects.count() == 0
+
+
+def test_quote_sees_price_changes_and_reservations(cart):
+    pa, pb, payload = cart
+    _quote(payload)
+    pa.price = 3500
+    pa.save()
+    place_orders([{"product": pb.id, "qty": 1}])
+
+    data, queries = _quote(payload)
+    assert queries == 1
+    arroz, leche = data["lines"]
+    assert arroz["price"] == "3500.00" and arroz["price_changed"]
+    assert leche["available"] == 0 and not leche["in_stock"]
+    assert not data["valid"]
+
+
+def test_quote_reports_missing_products(cart):
+    data, _ = _quote({"items": [{"product": 987654, "price": "1.00", "qty": 1}]})
+    assert data["lines"][0]["error"] == "not_found"
+    assert not data["valid"]
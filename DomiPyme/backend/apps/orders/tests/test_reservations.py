@@ -0,0 +1,93 @@
+import threading
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.orders.reservations import commit_reservations, release_expired, release_reservations
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+def _setup(stock):
+    user = User.objects.create_user(email="r@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=user, name="Reservas", slug="reservas")
+    product = Product.objects.create(shop=shop, name="Último", price=1000, stock=stock)
+    return user, product
+
+
+def _checkout(user, product, qty=1):
+    client = APIClient()
+    client.force_authenticate(user=user)
+    payload = {"items": [{"product": product.id, "price": "1000.00", "qty": qty}]}
+    return client.post(reverse("orders-checkout"), payload, format="json")
+
+
+@pytest.mark.django_db
+def test_checkout_reserves_and_commit_moves_stock():
+    user, product = _setup(stock=5)
+    resp = _checkout(user, product, qty=2)
+    assert resp.status_code == 201
+    product.refresh_from_db()
+    assert (product.stock, product.reserved) == (5, 2)
+
+    assert commit_reservations([resp.data["order_id"]]) == [resp.data["order_id"]]
+    # una segunda confirmación no vuelve a descontar
+    assert commit_reservations([resp.data["order_id"]]) == []
+    product.refresh_from_db()
+    assert (product.stock, product.reserved) == (3, 0)
+    order = Order.objects.get(pk=resp.data["order_id"])
+    assert order.status == "paid" and order.payment_confirmed
+
+
+@pytest.mark.django_db
+def test_release_and_sweeper_return_reserved_units():
+    user, product = _setup(stock=10)
+    ids = [_checkout(user, product).data["order_id"] for _ in range(5)]
+    assert release_reservations(ids[:1]) == ids[:1]
+
+    Order.objects.filter(pk__in=ids[1:4]).update(created_at=timezone.now() - timedelta(hours=1))
+    assert release_expired(ttl=60, batch_size=2) == 3
+
+    product.refresh_from_db()
+    assert (product.stock, product.reserved) == (10, 1)
+    assert Order.objects.filter(status="cancelled").count() == 4
+    assert Order.objects.get(pk=ids[4]).status == "pending"
+
+
+@pytest.mark.django_db(transaction=True)
+def test_concurrent_checkouts_never_oversell():
+    user, product = _setup(stock=5)
+    workers = 40
+    barrier = threading.Barrier(workers)
+    statuses = []
+    lock = threading.Lock()
+
+    def run():
+        try:
+            barrier.wait()
+            code = _checkout(user, product).status_code
+        except Exception as exc:  # cualquier error de BD cuenta como colapso
+            code = repr(exc)
+        finally:
+            connection.close()
+        with lock:
+            statuses.append(code)
+
+    threads = [threading.Thread(target=run) for _ in range(workers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert sorted(set(statuses), key=str) == [201, 400]
+    assert statuses.count(201) == 5
+    product.refresh_from_db()
+    assert product.reserved == 5
+    assert Order.objects.count() == 5
@@ -0,0 +1,61 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.checkout import place_orders
+from apps.orders.models import Order
+from apps.orders.state_machine import InvalidTransition, bulk_transition
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shop(db):
+    owner = User.objects.create_user(email="cocina@test.com", password="pass1234")
+    return Shop.objects.create(owner=owner, name="Cocina", slug="cocina")
+
+
+def _orders(shop, statuses):
+    return [Order.objects.create(shop=shop, total=1000, status=s).pk for s in statuses]
+
+
+def test_bulk_transition_is_one_update_and_reports_skipped(shop):
+    ids = _orders(shop, ["preparing"] * 300 + ["pending", "delivered"])
+    with CaptureQueriesContext(connection) as ctx:
+        result = bulk_transition(ids + [999999], "dispatched")
+    assert len(ctx.captured_queries) == 1
+    assert result.updated == ids[:300]
+    assert result.skipped == ids[300:] + [999999]
+    assert Order.objects.filter(status="dispatched").count() == 300
+    # repetir no mueve nada
+    assert bulk_transition(ids, "dispatched").updated == []
+
+
+def test_unknown_target_is_rejected(shop):
+    with pytest.raises(InvalidTransition):
+        bulk_transition(_orders(shop, ["pending"]), "lost")
+
+
+def test_merchant_endpoint_scopes_to_own_shops_and_releases_stock(shop):
+    other = Shop.objects.create(owner=User.objects.create_user(email="o@test.com", password="x"), name="O", slug="o")
+    product = Product.objects.create(shop=shop, name="Sopa", price=5000, stock=4)
+    pending = place_orders([{"product": product.id, "qty": 3}])[0].pk
+    paid = _orders(shop, ["paid"])[0]
+    foreign = _orders(other, ["paid"])[0]
+
+    client = APIClient()
+    client.force_authenticate(user=shop.owner)
+    url = reverse("merchant-orders-transition")
+    resp = client.post(url, {"ids": [paid, foreign], "status": "preparing"}, format="json")
+    assert resp.data == {"status": "preparing", "updated": [paid], "skipped": [foreign]}
+
+    resp = client.post(url, {"ids": [pending, paid], "status": "cancelled"}, format="json")
+    assert resp.data["updated"] == [pending, paid]
+    product.refresh_from_db()
+    assert (product.stock, product.reserved) == (4, 0)
+
+    assert client.post(url, {"ids": [paid], "status": "paid"}, format="json").status_code == 400
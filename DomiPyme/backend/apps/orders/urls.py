@@ -1,6 +1,17 @@
 from django.urls import path
-from .views import CheckoutView
+from .views import (
+    CartItemDetailView, CartItemsView, CartView, CheckoutQuoteView, CheckoutView, CustomerOrderListView, MerchantOrderListView,
+    MerchantOrderTransitionView, OrderDetailView,
+)
 
 urlpatterns = [
     path("checkout/", CheckoutView.as_view(), name="orders-checkout"),
+    path("checkout/quote/", CheckoutQuoteView.as_view(), name="orders-checkout-quote"),
+    path("cart/", CartView.as_view(), name="cart"),
+    path("cart/items/", CartItemsView.as_view(), name="cart-items"),
+    path("cart/items/<int:product_id>/", CartItemDetailView.as_view(), name="cart-item-detail"),
+    path("orders/", CustomerOrderListView.as_view(), name="orders-list"),
+    path("orders/<int:pk>/", OrderDetailView.as_view(), name="orders-detail"),
+    path("merchant/orders/", MerchantOrderListView.as_view(), name="merchant-orders-list"),
+    path("merchant/orders/transition/", MerchantOrderTransitionView.as_view(), name="merchant-orders-transition"),
 ]
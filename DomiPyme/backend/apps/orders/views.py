@@ -1,95 +1,259 @@
+from datetime import datetime, time, timedelta
+
+from django.db.models import Prefetch, Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status, permissions
-from .serializers import CheckoutSerializer
-from .models import Order, OrderItem
-from apps.shops.models import Product, Shop
-from decimal import Decimal
-from django.db import transaction
+from rest_framework import generics, status, permissions
+from rest_framework.exceptions import ValidationError
+from apps.common.pagination import KeysetPagination
+from apps.payments.intents import start_payments
+from . import carts
+from .models import Cart, CartLine, CartShopTotal, Order, OrderItem
+from .quote import build_quote
+from .reservations import cancel_orders
+from .serializers import (
+    CartItemInputSerializer, CartItemUpdateSerializer, CartSerializer,
+    CheckoutSerializer, OrderSerializer, OrderTransitionSerializer,
+)
+from .state_machine import bulk_transition
+from .checkout import CheckoutError, place_orders
+from .idempotency import idempotent
 
 class CheckoutView(APIView):
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
 
+    @idempotent
     def post(self, request):
         """
         Recibe:
         { "items": [ { product, qty }, ... ] }
+        o { "from_cart": true } para convertir el carrito guardado del usuario
+        (que se vacía en la misma transacción).
         - Recalcula precios desde DB (product.price).
-        - Valida stock.
+        - Valida stock y lo reserva (Product.reserved) con un UPDATE condicional.
         - Agrupa items por shop y crea 1 Order por shop.
-        - No decrementa stock (se hace al confirmar pago vía webhook).
-        - Retorna lista de órdenes con `payment_url` (sandbox).
+        - No decrementa stock: la reserva se confirma al pagar (webhook) o se
+          libera si la orden sigue pendiente pasado STOCK_RESERVATION_TTL.
+        - Retorna lista de órdenes con `payment_url` del proveedor configurado
+          (PAYMENT_PROVIDER), pedida fuera de la transacción del checkout.
+
+        Acepta la cabecera `Idempotency-Key`: los reintentos reciben la misma
+        respuesta sin crear órdenes nuevas.
+
+        El trabajo se hace por conjuntos (ver `apps.orders.checkout`): el
+        número de queries no depende del tamaño del carrito.
         """
         serializer = CheckoutSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        items = serializer.validated_data.get("items", [])
+        cart = None
+        if serializer.validated_data["from_cart"]:
+            if not request.user.is_authenticated:
+                return Response({"detail": "Inicia sesión para usar tu carrito."}, status=status.HTTP_401_UNAUTHORIZED)
+            cart = Cart.objects.filter(user=request.user).first()
+            items = carts.checkout_items(cart) if cart else []
+        else:
+            items = serializer.validated_data.get("items", [])
         if not items:
             return Response({"detail": "Cart vacío"}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Cargar productos y validar existencia y stock
-        product_map = {}
-        for it in items:
-            pid = it["product"]
-            try:
-                prod = Product.objects.select_related('shop').get(pk=pid)
-            except Product.DoesNotExist:
-                return Response({"detail": f"Producto {pid} no encontrado"}, status=status.HTTP_400_BAD_REQUEST)
-            qty = it.get("qty", 1)
-            if prod.stock < qty:
-                return Response({"detail": f"Stock insuficiente para {prod.name}"}, status=status.HTTP_400_BAD_REQUEST)
-            product_map[pid] = prod
-
-        # Agrupar items por shop_id
-        shops_items = {}
-        for it in items:
-            pid = it["product"]
-            qty = it.get("qty", 1)
-            prod = product_map[pid]
-            shop_id = prod.shop.id
-            shops_items.setdefault(shop_id, []).append({
-                "product": prod,
-                "qty": qty
-            })
+        customer = request.user if request.user.is_authenticated else None
+        try:
+            if cart is None:
+                orders = place_orders(items, customer)
+            else:
+                orders = carts.place_cart_orders(cart, items, customer)
+        except CheckoutError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
 
+        payment_urls = start_payments(orders)
         created_orders = []
-
-        # Para cada shop crea una order atómica
-        for shop_id, shop_items in shops_items.items():
-            shop = Shop.objects.get(pk=shop_id)
-            with transaction.atomic():
-                order = Order.objects.create(
-                    customer=request.user if request.user.is_authenticated else None,
-                    shop=shop,
-                    total=Decimal("0.0"),
-                    status="pending",
-                    payment_confirmed=False
-                )
-                total = Decimal("0.0")
-                for it in shop_items:
-                    prod = it["product"]
-                    qty = int(it["qty"])
-                    price = Decimal(prod.price)  # price from DB
-                    OrderItem.objects.create(
-                        order=order,
-                        product=prod,
-                        price=price,
-                        quantity=qty
-                    )
-                    total += (price * qty)
-                order.total = total
-                order.save()
-
-                # Crear "payment_url" sandbox (en producción, invocar API del proveedor)
-                payment_url = f"https://sandbox.payment.provider/pay?order_id={order.id}&amount={order.total}"
-                created_orders.append({
-                    "order_id": order.id,
-                    "shop_id": shop.id,
-                    "shop_name": shop.name,
-                    "total": str(order.total),
-                    "payment_url": payment_url
-                })
+        for order in orders:
+            created_orders.append({
+                "order_id": order.id,
+                "shop_id": order.shop.id,
+                "shop_name": order.shop.name,
+                "total": str(order.total),
+                "payment_url": payment_urls[order.id]
+            })
 
         # Si solo hay una orden, devolvemos un objeto; si varias, lista (frontend debe manejar ambos casos)
         if len(created_orders) == 1:
             return Response(created_orders[0], status=status.HTTP_201_CREATED)
         return Response({"orders": created_orders}, status=status.HTTP_201_CREATED)
+
+class CartView(APIView):
+    """
+    GET: carrito guardado del usuario con líneas y subtotales por comercio.
+    DELETE: vacía el carrito.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_cart_response(self, cart):
+        cart = (
+            Cart.objects.prefetch_related(
+                Prefetch("lines", queryset=CartLine.objects.select_related("product")),
+                Prefetch("shop_totals", queryset=CartShopTotal.objects.select_related("shop")),
+            ).get(pk=cart.pk)
+        )
+        return Response(CartSerializer(cart).data)
+
+    def get(self, request):
+        return self.get_cart_response(carts.get_cart(request.user))
+
+    def delete(self, request):
+        carts.clear_cart(carts.get_cart(request.user))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+class CartItemsView(CartView):
+    """POST { product, qty }: suma unidades a la línea del producto."""
+
+    def post(self, request):
+        serializer = CartItemInputSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart = carts.get_cart(request.user)
+        try:
+            carts.add_item(cart, serializer.validated_data["product"], serializer.validated_data["qty"])
+        except CheckoutError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
+        return self.get_cart_response(cart)
+
+class CartItemDetailView(CartView):
+    """PATCH { qty }: fija la cantidad (0 elimina). DELETE: quita la línea."""
+
+    def patch(self, request, product_id):
+        serializer = CartItemUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        cart = carts.get_cart(request.user)
+        try:
+            carts.set_quantity(cart, product_id, serializer.validated_data["qty"])
+        except CheckoutError as exc:
+            return Response({"detail": exc.detail}, status=exc.status_code)
+        return self.get_cart_response(cart)
+
+    def delete(self, request, product_id):
+        cart = carts.get_cart(request.user)
+        carts.remove_item(cart, product_id)
+        return self.get_cart_response(cart)
+
+class CheckoutQuoteView(APIView):
+    """
+    Cotiza el mismo payload de checkout sin crear nada: precio actual,
+    disponibilidad por línea y subtotales por comercio. Lee de un cache corto
+    de snapshots (como máximo una query). No autentica: no necesita usuario y
+    así no paga el lookup del token.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request):
+        serializer = CheckoutSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        items = serializer.validated_data.get("items", [])
+        if not items:
+            return Response({"detail": "Cart vacío"}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(build_quote(items))
+
+class OrderHistoryMixin:
+    """
+    Base común de los listados de órdenes: carga shop + items + productos en un
+    número fijo de queries y aplica los filtros `status`, `created_after`,
+    `created_before` (fecha o fecha/hora ISO).
+    """
+    serializer_class = OrderSerializer
+    permission_classes = [permissions.IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def base_queryset(self):
+        raise NotImplementedError
+
+    def get_queryset(self):
+        qs = self.base_queryset().select_related("shop").prefetch_related(
+            Prefetch("items", queryset=OrderItem.objects.select_related("product"))
+        )
+        if self.request.method == "GET":
+            qs = self.filter_queryset_params(qs)
+        return qs
+
+    def filter_queryset_params(self, qs):
+        params = self.request.query_params
+        statuses = [s for s in params.get("status", "").split(",") if s]
+        if statuses:
+            valid = dict(Order.STATUS_CHOICES)
+            unknown = [s for s in statuses if s not in valid]
+            if unknown:
+                raise ValidationError({"status": f"Estados inválidos: {', '.join(unknown)}"})
+            qs = qs.filter(status__in=statuses)
+        after = self.parse_moment("created_after")
+        if after is not None:
+            qs = qs.filter(created_at__gte=after)
+        before = self.parse_moment("created_before", end_of_day=True)
+        if before is not None:
+            qs = qs.filter(created_at__lt=before)
+        return qs
+
+    def parse_moment(self, name, end_of_day=False):
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return None
+        value = parse_datetime(raw)
+        if value is None:
+            day = parse_date(raw)
+            if day is None:
+                raise ValidationError({name: "Usa una fecha (YYYY-MM-DD) o fecha/hora ISO."})
+            if end_of_day:
+                day += timedelta(days=1)
+            value = datetime.combine(day, time.min)
+        elif end_of_day:
+            value += timedelta(microseconds=1)
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        return value
+
+class CustomerOrderListView(OrderHistoryMixin, generics.ListAPIView):
+    """Órdenes del usuario autenticado (como cliente)."""
+
+    def base_queryset(self):
+        return Order.objects.filter(customer=self.request.user)
+
+class MerchantOrderListView(OrderHistoryMixin, generics.ListAPIView):
+    """Órdenes de los comercios del usuario; `?shop=<slug>` limita a uno."""
+
+    def base_queryset(self):
+        qs = Order.objects.filter(shop__owner=self.request.user)
+        shop = self.request.query_params.get("shop")
+        if shop:
+            qs = qs.filter(shop__slug=shop)
+        return qs
+
+class MerchantOrderTransitionView(APIView):
+    """
+    Cambio de estado masivo para comercios:
+    { "ids": [1, 2, ...], "status": "dispatched" }
+    Cada transición es un único UPDATE condicional; las órdenes ajenas o en
+    un estado de origen no válido se reportan en `skipped`.
+    """
+    permission_classes = [permissions.IsAuthenticated]
+
+    def post(self, request):
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = serializer.validated_data["ids"]
+        target = serializer.validated_data["status"]
+        scope = Order.objects.filter(shop__owner=request.user)
+        if target == "cancelled":
+            result = cancel_orders(ids, queryset=scope)
+        else:
+            result = bulk_transition(ids, target, queryset=scope)
+        return Response({"status": target, "updated": result.updated, "skipped": result.skipped})
+
+class OrderDetailView(OrderHistoryMixin, generics.RetrieveAPIView):
+    """Detalle de una orden visible para su cliente o el dueño del comercio."""
+
+    def base_queryset(self):
+        user = self.request.user
+        return Order.objects.filter(Q(customer=user) | Q(shop__owner=user))
+
+    def filter_queryset_params(self, qs):
+        return qs
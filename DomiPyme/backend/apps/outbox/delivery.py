@@ -0,0 +1,136 @@
+# backend/apps/outbox/delivery.py
+"""
+Outbox de correos transaccionales.
+
+`enqueue()` / `enqueue_many()` solo insertan filas de OutboxEmail: el request
+nunca espera al servidor SMTP y una caída del SMTP no le devuelve 500 a nadie.
+
+`send_batch()` (comando `send_outbox`):
+
+- toma hasta OUTBOX_BATCH_SIZE correos vencidos en una transacción corta
+  (select_for_update skip_locked donde se pueda) y corre su `next_attempt_at`
+  OUTBOX_LEASE_SECONDS hacia adelante: si el worker muere a mitad, vuelven a
+  la cola solos al vencer el plazo;
+- los envía por una sola conexión del EMAIL_BACKEND, abierta una vez por
+  lote (si un envío falla, se reabre para el resto);
+- marca los enviados y reprograma los fallidos con backoff exponencial
+  (OUTBOX_BACKOFF_SECONDS * 2^(intentos-1), tope OUTBOX_MAX_BACKOFF_SECONDS).
+  Después de OUTBOX_MAX_ATTEMPTS intentos quedan `failed`.
+
+La entrega es "al menos una vez": un worker que muere entre el envío y el
+UPDATE final puede repetir un correo.
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxEmail
+
+
+def _build(subject, body, to, kind="", from_email=None):
+    return OutboxEmail(
+        kind=kind, subject=subject, body=body, to=list(to), from_email=from_email or settings.DEFAULT_FROM_EMAIL
+    )
+
+
+def enqueue(subject, body, to, kind="", from_email=None):
+    """Encola un correo (un INSERT, en la transacción actual)."""
+    email = _build(subject, body, to, kind, from_email)
+    email.save()
+    return email
+
+
+def enqueue_many(messages):
+    """Encola varios: `messages` son dicts con los argumentos de `enqueue`. Un INSERT."""
+    return OutboxEmail.objects.bulk_create([_build(**message) for message in messages])
+
+
+def backoff(attempts):
+    delay = settings.OUTBOX_BACKOFF_SECONDS * 2 ** max(attempts - 1, 0)
+    return timedelta(seconds=min(delay, settings.OUTBOX_MAX_BACKOFF_SECONDS))
+
+
+def claim(batch_size=None, now=None):
+    """Toma un lote de correos vencidos y los reserva por OUTBOX_LEASE_SECONDS."""
+    batch_size = batch_size or settings.OUTBOX_BATCH_SIZE
+    now = now or timezone.now()
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects.select_for_update(skip_locked=True)
+            .filter(status="pending", next_attempt_at__lte=now)
+            .order_by("next_attempt_at", "id")[:batch_size]
+        )
+        if emails:
+            OutboxEmail.objects.filter(pk__in=[e.pk for e in emails]).update(
+                next_attempt_at=now + timedelta(seconds=settings.OUTBOX_LEASE_SECONDS)
+            )
+    return emails
+
+
+def _message(email, connection):
+    return EmailMessage(email.subject, email.body, email.from_email, email.to, connection=connection)
+
+
+def _send_all(emails):
+    """Envía por una conexión. Retorna ({id: error} de los que fallaron)."""
+    errors = {}
+    connection = get_connection(fail_silently=False)
+    try:
+        connection.open()
+    except Exception as exc:  # SMTP caído: todo el lote a reintentar
+        return {email.pk: exc for email in emails}
+    try:
+        for email in emails:
+            try:
+                connection.send_messages([_message(email, connection)])
+            except Exception as exc:
+                errors[email.pk] = exc
+                # La conexión puede haber quedado rota: otra para el resto
+                connection.close()
+                connection = get_connection(fail_silently=False)
+                try:
+                    connection.open()
+                except Exception as exc:
+                    rest = emails[emails.index(email) + 1:]
+                    errors.update({e.pk: exc for e in rest})
+                    return errors
+    finally:
+        connection.close()
+    return errors
+
+
+def send_batch(batch_size=None, now=None):
+    """Envía un lote. Retorna (enviados, fallidos)."""
+    emails = claim(batch_size, now)
+    if not emails:
+        return 0, 0
+    errors = _send_all(emails)
+    now = timezone.now()
+    sent = [e.pk for e in emails if e.pk not in errors]
+    if sent:
+        OutboxEmail.objects.filter(pk__in=sent).update(
+            status="sent", sent_at=now, attempts=F("attempts") + 1, last_error=""
+        )
+    failed = [e for e in emails if e.pk in errors]
+    for email in failed:
+        email.attempts += 1
+        email.last_error = f"{type(errors[email.pk]).__name__}: {errors[email.pk]}"[:1000]
+        email.next_attempt_at = now + backoff(email.attempts)
+        if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+            email.status = "failed"
+    OutboxEmail.objects.bulk_update(failed, ["attempts", "last_error", "next_attempt_at", "status"])
+    return len(sent), len(failed)
+
+
+def send_pending(batch_size=None):
+    """Envía lotes hasta que no queden correos vencidos. Retorna (enviados, fallidos)."""
+    total_sent = total_failed = 0
+    while True:
+        sent, failed = send_batch(batch_size)
+        if not sent and not failed:
+            return total_sent, total_failed
+        total_sent, total_failed = total_sent + sent, total_failed + failed
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.outbox.delivery import send_pending
+
+
+class Command(BaseCommand):
+    help = "Envía por lotes los correos pendientes del outbox, con una conexión SMTP por lote."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", type=float, default=0, metavar="SECONDS",
+                            help="Seguir enviando, esperando N segundos cuando la cola está vacía")
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_pending(batch_size=options["batch_size"])
+            if sent or failed or not options["loop"]:
+                self.stdout.write(f"Correos enviados: {sent}, fallidos: {failed}")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
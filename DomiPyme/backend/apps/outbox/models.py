@@ -0,0 +1,38 @@
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+class OutboxEmail(models.Model):
+    """
+    Correo por enviar. Se inserta en la misma transacción del request que lo
+    genera (si esa transacción se revierte, el correo no sale) y
+    `apps.outbox.delivery` lo envía por lotes desde `manage.py send_outbox`.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("sent", "Sent"),
+        ("failed", "Failed"),
+    ]
+    kind = models.CharField(max_length=50, blank=True)  # password_reset, order_paid, ...
+    from_email = models.CharField(max_length=254)
+    to = models.JSONField()
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Cola del worker (delivery.claim): solo los pendientes, por turno
+            models.Index(
+                fields=["next_attempt_at", "id"], name="outbox_pending_due_idx", condition=Q(status="pending")
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind or 'email'} -> {', '.join(self.to)} ({self.status})"
@@ -0,0 +1,122 @@
+from datetime import timedelta
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.orders.checkout import place_orders
+from apps.outbox import delivery
+from apps.outbox.models import OutboxEmail
+from apps.payments.models import WebhookEvent
+from apps.payments.webhooks import process_pending
+from apps.shops.models import Product, Shop
+
+User = get_user_model()
+
+
+class FlakyBackend(EmailBackend):
+    """locmem que falla con las direcciones de `reject` y cuenta las conexiones."""
+    opened = 0
+    down = False
+    reject = ()
+
+    def open(self):
+        if FlakyBackend.down:
+            raise ConnectionRefusedError("smtp caído")
+        FlakyBackend.opened += 1
+        return True
+
+    def send_messages(self, messages):
+        for message in messages:
+            if set(message.to) & set(self.reject):
+                raise OSError("buzón rechazado")
+        return super().send_messages(messages)
+
+
+@pytest.fixture
+def flaky(monkeypatch):
+    FlakyBackend.opened, FlakyBackend.down, FlakyBackend.reject = 0, False, ()
+    monkeypatch.setattr(delivery, "get_connection", lambda **kwargs: FlakyBackend(**kwargs))
+    return FlakyBackend
+
+
+def test_password_reset_only_enqueues(db, flaky):
+    User.objects.create_user(email="olvido@test.com", password="pass1234")
+    resp = APIClient().post(reverse("accounts:password-reset-request"), {"email": "olvido@test.com"})
+    assert resp.status_code == 200
+    assert mail.outbox == []
+    email = OutboxEmail.objects.get()
+    assert (email.kind, email.to, email.status) == ("password_reset", ["olvido@test.com"], "pending")
+
+    out = StringIO()
+    call_command("send_outbox", stdout=out)
+    assert "Correos enviados: 1, fallidos: 0" in out.getvalue()
+    assert [m.to for m in mail.outbox] == [["olvido@test.com"]]
+    assert "reset-password" in mail.outbox[0].body
+    assert OutboxEmail.objects.get().status == "sent"
+
+
+def test_batch_reuses_one_connection_and_retries_failures(db, flaky, settings):
+    settings.OUTBOX_MAX_ATTEMPTS = 2
+    for i in range(5):
+        delivery.enqueue(f"Asunto {i}", "cuerpo", [f"c{i}@test.com"])
+    flaky.reject = ("c2@test.com",)
+
+    assert delivery.send_batch() == (4, 1)
+    # Una conexión para el lote y otra después del envío fallido
+    assert flaky.opened == 2 and len(mail.outbox) == 4
+    failed = OutboxEmail.objects.get(to=["c2@test.com"])
+    assert (failed.status, failed.attempts) == ("pending", 1)
+    assert "buzón rechazado" in failed.last_error
+    assert failed.next_attempt_at > timezone.now() + timedelta(seconds=settings.OUTBOX_BACKOFF_SECONDS - 5)
+
+    # Antes del backoff no se reintenta; después sí, y al tope queda failed
+    assert delivery.send_batch() == (0, 0)
+    later = timezone.now() + timedelta(hours=2)
+    assert delivery.send_batch(now=later) == (0, 1)
+    failed.refresh_from_db()
+    assert (failed.status, failed.attempts) == ("failed", 2)
+
+
+def test_smtp_outage_reschedules_the_whole_batch(db, flaky):
+    delivery.enqueue_many([{"subject": "A", "body": "x", "to": [f"d{i}@test.com"]} for i in range(3)])
+    flaky.down = True
+    assert delivery.send_batch() == (0, 3)
+    assert set(OutboxEmail.objects.values_list("attempts", "status")) == {(1, "pending")}
+
+    flaky.down = False
+    assert delivery.send_batch(now=timezone.now() + timedelta(minutes=5)) == (3, 0)
+
+
+def test_claimed_emails_are_leased(db, flaky):
+    delivery.enqueue("A", "x", ["e@test.com"])
+    assert len(delivery.claim()) == 1
+    # Otro worker no lo ve mientras dura la reserva
+    assert delivery.claim() == []
+    assert len(delivery.claim(now=timezone.now() + timedelta(hours=1))) == 1
+
+
+def test_paid_orders_notify_customer_and_merchant(db, flaky):
+    merchant = User.objects.create_user(email="comercio@test.com", password="pass1234")
+    customer = User.objects.create_user(email="cliente@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=merchant, name="Quesos", slug="quesos")
+    product = Product.objects.create(shop=shop, name="Queso", price=4000, stock=5)
+    [order] = place_orders([{"product": product.id, "qty": 1}], customer)
+    WebhookEvent.objects.create(
+        provider="sandbox", provider_tx_id="tx-1", payload={
+            "order_id": order.pk, "provider_tx_id": "tx-1", "status": "approved", "amount": str(order.total),
+        },
+    )
+    process_pending()
+    assert sorted(OutboxEmail.objects.values_list("kind", "to")) == [
+        ("merchant_order_paid", ["comercio@test.com"]), ("order_paid", ["cliente@test.com"]),
+    ]
+    assert mail.outbox == []
+    delivery.send_pending()
+    assert len(mail.outbox) == 2
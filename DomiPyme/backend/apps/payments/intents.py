@@ -0,0 +1,41 @@
+# backend/apps/payments/intents.py
+"""
+Creación de intenciones de pago para órdenes recién creadas.
+
+Se llama después de que la transacción del checkout hizo commit: las
+llamadas HTTP al proveedor nunca ocurren con locks de BD tomados.
+"""
+import logging
+
+from .models import Transaction
+from .providers import ProviderError, get_provider
+
+logger = logging.getLogger(__name__)
+
+
+def start_payments(orders, provider_name=None):
+    """
+    Crea una intención de pago por orden y guarda sus `Transaction` con un
+    solo INSERT. Retorna {order_id: payment_url}; la URL es None si el
+    proveedor falló (la reserva de stock vence sola si nadie paga).
+    """
+    provider = get_provider(provider_name)
+    urls, transactions = {}, []
+    for order in orders:
+        try:
+            intent = provider.create_intent(order)
+        except ProviderError as exc:
+            logger.warning("No se pudo crear el pago de la orden %s: %s", order.id, exc)
+            urls[order.id] = None
+            continue
+        urls[order.id] = intent.payment_url
+        transactions.append(Transaction(
+            order=order,
+            provider=provider.name,
+            provider_tx_id=intent.provider_tx_id,
+            amount=order.total,
+            status="pending",
+            raw_response=intent.raw or None,
+        ))
+    Transaction.objects.bulk_create(transactions)
+    return urls
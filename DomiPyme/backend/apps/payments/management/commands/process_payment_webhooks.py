@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.payments.webhooks import process_pending
+
+
+class Command(BaseCommand):
+    help = "Procesa por lotes los callbacks de pago pendientes."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=None)
+        parser.add_argument("--loop", type=float, default=0, metavar="SECONDS",
+                            help="Seguir consumiendo, esperando N segundos cuando la cola está vacía")
+
+    def handle(self, *args, **options):
+        while True:
+            processed = process_pending(batch_size=options["batch_size"])
+            if processed or not options["loop"]:
+                self.stdout.write(f"Eventos procesados: {processed}")
+            if not options["loop"]:
+                return
+            time.sleep(options["loop"])
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from apps.payments.stub_server import StubProviderServer
+
+
+class Command(BaseCommand):
+    help = "Levanta un proveedor de pagos falso (PayU / Mercado Pago) para pruebas de carga offline."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8089)
+        parser.add_argument("--latency", type=float, default=0.0, help="Segundos de demora por request")
+        parser.add_argument("--fail-rate", type=float, default=0.0, help="Fracción de requests que responden 503")
+        parser.add_argument("--webhook-base", default="",
+                            help="URL base de los webhooks, p.ej. http://127.0.0.1:8000/api/payments/webhooks")
+        parser.add_argument("--callback-delay", type=float, default=0.5)
+        parser.add_argument("--verbose", action="store_true")
+
+    def handle(self, *args, **options):
+        server = StubProviderServer(
+            (options["host"], options["port"]),
+            latency=options["latency"],
+            fail_rate=options["fail_rate"],
+            webhook_base=options["webhook_base"],
+            callback_delay=options["callback_delay"],
+            webhook_token=settings.PAYMENT_WEBHOOK_SECRET,
+            verbose=options["verbose"],
+        )
+        self.stdout.write(f"Stub de pagos en http://{options['host']}:{options['port']}/{{payu,mercadopago}}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
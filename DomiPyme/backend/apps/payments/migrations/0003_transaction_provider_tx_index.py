@@ -0,0 +1,23 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("payments", "0002_webhookevent"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="transaction",
+            index=models.Index(
+                fields=["provider_tx_id"], name="payments_tx_provider_id_idx"
+            ),
+        ),
+    ]
@@ -6,6 +6,40 @@ class Transaction(models.Model):
     provider = models.CharField(max_length=50)  # e.g., payu, mercadopago
     provider_tx_id = models.CharField(max_length=200, blank=True, null=True)
     amount = models.DecimalField(max_digits=12, decimal_places=2)
-    status = models.CharField(max_length=50)  # pending, approved, rejected
+    status = models.CharField(max_length=50)  # pending, approved, rejected, needs_refund
     raw_response = models.JSONField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            # Deduplicación de webhooks (webhooks.process_pending)
+            models.Index(fields=["provider_tx_id"], name="payments_tx_provider_id_idx"),
+        ]
+
+
+class WebhookEvent(models.Model):
+    """
+    Callback crudo de un proveedor de pagos. El endpoint solo lo persiste;
+    `apps.payments.webhooks.process_pending` lo procesa por lotes.
+    """
+    STATUS_CHOICES = [
+        ("pending", "Pending"),
+        ("processed", "Processed"),
+        ("duplicate", "Duplicate"),
+        ("error", "Error"),
+    ]
+    provider = models.CharField(max_length=50)
+    provider_tx_id = models.CharField(max_length=200, blank=True)
+    payload = models.JSONField()
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default="pending")
+    error = models.TextField(blank=True)
+    received_at = models.DateTimeField(auto_now_add=True)
+    processed_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "id"], name="payments_webhook_status_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.provider}:{self.provider_tx_id} ({self.status})"
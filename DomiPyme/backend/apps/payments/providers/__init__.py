@@ -0,0 +1,54 @@
+# backend/apps/payments/providers/__init__.py
+"""
+Registro de adaptadores de pago. Los adaptadores se crean una vez por
+proceso (cada uno con su pool HTTP y su circuit breaker) a partir de
+`settings.PAYMENT_PROVIDERS`.
+"""
+import threading
+
+from django.conf import settings
+
+from .base import CircuitOpenError, PaymentIntent, PaymentProvider, ProviderError
+from .mercadopago import MercadoPagoProvider
+from .payu import PayUProvider
+from .sandbox import SandboxProvider
+
+ADAPTERS = {
+    "sandbox": SandboxProvider,
+    "payu": PayUProvider,
+    "mercadopago": MercadoPagoProvider,
+}
+
+_instances = {}
+_lock = threading.Lock()
+
+
+def get_provider(name=None):
+    """Adaptador configurado para `name` (default: PAYMENT_PROVIDER). KeyError si no existe."""
+    name = name or settings.PAYMENT_PROVIDER
+    provider = _instances.get(name)
+    if provider is None:
+        with _lock:
+            provider = _instances.get(name)
+            if provider is None:
+                conf = settings.PAYMENT_PROVIDERS[name]
+                provider = ADAPTERS[name](
+                    base_url=conf.get("BASE_URL", ""),
+                    credentials={"WEBHOOK_SECRET": settings.PAYMENT_WEBHOOK_SECRET, **conf},
+                    timeout=(settings.PAYMENT_HTTP_CONNECT_TIMEOUT, settings.PAYMENT_HTTP_READ_TIMEOUT),
+                    pool_size=settings.PAYMENT_HTTP_POOL_SIZE,
+                    failure_threshold=settings.PAYMENT_CIRCUIT_FAILURES,
+                    reset_timeout=settings.PAYMENT_CIRCUIT_RESET_SECONDS,
+                )
+                _instances[name] = provider
+    return provider
+
+
+def provider_names():
+    return tuple(settings.PAYMENT_PROVIDERS)
+
+
+def reset_providers():
+    """Descarta los adaptadores creados (p.ej. al cambiar settings en tests)."""
+    with _lock:
+        _instances.clear()
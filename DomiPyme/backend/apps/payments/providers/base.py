@@ -0,0 +1,172 @@
+# backend/apps/payments/providers/base.py
+"""
+Base de los adaptadores de proveedores de pago.
+
+Cada adaptador mantiene una `requests.Session` propia (pool keep-alive), usa
+timeouts estrictos de conexión/lectura y pasa por un circuit breaker: tras
+varios fallos seguidos deja de llamar al proveedor durante un tiempo en vez
+de bloquear workers esperando timeouts.
+"""
+import hmac
+import threading
+import time
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+class ProviderError(Exception):
+    """El proveedor falló, respondió algo inesperado o no está disponible."""
+
+
+class CircuitOpenError(ProviderError):
+    """El circuit breaker está abierto: no se intenta la llamada."""
+
+
+@dataclass
+class PaymentIntent:
+    provider_tx_id: str
+    payment_url: str
+    raw: dict = field(default_factory=dict)
+
+
+class CircuitBreaker:
+    """
+    closed -> open tras `failure_threshold` fallos seguidos; pasado
+    `reset_timeout` deja pasar una llamada de prueba (half-open) y se cierra
+    si esa llamada funciona.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0, clock=time.monotonic):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.failures = 0
+        self.opened_at = None
+        self._probing = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if self.clock() - self.opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def before_call(self):
+        with self._lock:
+            state = self.state
+            if state == "open" or (state == "half-open" and self._probing):
+                raise CircuitOpenError("proveedor temporalmente deshabilitado")
+            if state == "half-open":
+                self._probing = True
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._probing = False
+            if self.failures >= self.failure_threshold or self.opened_at is not None:
+                self.opened_at = self.clock()
+
+
+class PaymentProvider:
+    """
+    Adaptador base. Las subclases implementan `build_intent_request`,
+    `parse_intent_response` y `parse_webhook`.
+    """
+    name = None
+
+    def __init__(self, base_url="", credentials=None, timeout=(2.0, 5.0), pool_size=20,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.base_url = base_url.rstrip("/")
+        self.credentials = credentials or {}
+        self.timeout = timeout
+        self.pool_size = pool_size
+        self.breaker = CircuitBreaker(failure_threshold, reset_timeout)
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self):
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    # Sin reintentos automáticos: un pago no debe duplicarse por un retry ciego
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size, max_retries=0)
+                    session.mount("http://", adapter)
+                    session.mount("https://", adapter)
+                    session.headers.update(self.default_headers())
+                    self._session = session
+        return self._session
+
+    def default_headers(self):
+        return {"Content-Type": "application/json", "Accept": "application/json"}
+
+    def request(self, method, path, **kwargs):
+        self.breaker.before_call()
+        try:
+            resp = self.session.request(method, f"{self.base_url}{path}", timeout=self.timeout, **kwargs)
+            resp.raise_for_status()
+            data = resp.json()
+        except (requests.RequestException, ValueError) as exc:
+            self.breaker.record_failure()
+            raise ProviderError(f"{self.name}: {exc}") from exc
+        self.breaker.record_success()
+        return data
+
+    # --- API de los adaptadores ---
+
+    def create_intent(self, order):
+        """Crea la intención de pago de `order` en el proveedor."""
+        method, path, body = self.build_intent_request(order)
+        data = self.request(method, path, json=body)
+        try:
+            return self.parse_intent_response(order, data)
+        except (KeyError, TypeError) as exc:
+            raise ProviderError(f"{self.name}: respuesta inesperada") from exc
+
+    def build_intent_request(self, order):
+        raise NotImplementedError
+
+    def parse_intent_response(self, order, data):
+        raise NotImplementedError
+
+    def verify_webhook(self, headers, payload):
+        """
+        True si el callback viene del proveedor. Base: el token compartido
+        (credencial WEBHOOK_SECRET, por defecto PAYMENT_WEBHOOK_SECRET) en
+        la cabecera X-Webhook-Token. Sin secreto configurado no se acepta
+        ningún callback; los adaptadores con firma propia la verifican.
+        """
+        secret = self.credentials.get("WEBHOOK_SECRET") or ""
+        return bool(secret) and hmac.compare_digest(headers.get("X-Webhook-Token", ""), secret)
+
+    def webhook_tx_id(self, payload):
+        """Id de la transacción en el payload crudo (para guardar el evento)."""
+        return payload.get("provider_tx_id", "")
+
+    def parse_webhook(self, payload):
+        """
+        Normaliza un callback a {order_id, provider_tx_id, status, amount}.
+        Lanza ValueError si el payload no sirve.
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def to_decimal(value):
+        if value is None:
+            return None
+        try:
+            return Decimal(str(value))
+        except InvalidOperation:
+            raise ValueError("amount inválido")
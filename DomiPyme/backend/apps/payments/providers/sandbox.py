@@ -0,0 +1,38 @@
+# backend/apps/payments/providers/sandbox.py
+import uuid
+
+from .base import PaymentIntent, PaymentProvider
+
+STATUSES = ("pending", "approved", "rejected")
+
+
+class SandboxProvider(PaymentProvider):
+    """
+    Proveedor local sin HTTP (desarrollo y tests): arma la URL de pago en el
+    proceso. Sus webhooks usan el formato normalizado
+    {order_id, provider_tx_id, status, amount}.
+    """
+    name = "sandbox"
+
+    def create_intent(self, order):
+        base = self.base_url or "https://sandbox.payment.provider"
+        return PaymentIntent(
+            provider_tx_id=f"sbx-{uuid.uuid4().hex}",
+            payment_url=f"{base}/pay?order_id={order.id}&amount={order.total}",
+        )
+
+    def parse_webhook(self, payload):
+        try:
+            order_id = int(payload["order_id"])
+            provider_tx_id = str(payload["provider_tx_id"])
+        except (KeyError, TypeError, ValueError):
+            raise ValueError("payload sin order_id/provider_tx_id")
+        status = str(payload.get("status", "")).lower()
+        if status not in STATUSES:
+            raise ValueError(f"estado desconocido: {status!r}")
+        return {
+            "order_id": order_id,
+            "provider_tx_id": provider_tx_id,
+            "status": status,
+            "amount": self.to_decimal(payload.get("amount")),
+        }
@@ -0,0 +1,7 @@
+from rest_framework import serializers
+from .models import Transaction
+
+class TransactionSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Transaction
+        fields = ("id", "order", "provider", "provider_tx_id", "amount", "status", "created_at")
@@ -0,0 +1,145 @@
+# backend/apps/payments/stub_server.py
+"""
+Servidor HTTP local que imita a PayU y Mercado Pago para probar el flujo
+completo (checkout -> intención de pago -> webhook) sin red.
+
+    python manage.py run_payment_stub --port 8089 \
+        --webhook-base http://127.0.0.1:8000/api/payments/webhooks
+
+    PAYMENT_PROVIDER=payu PAYU_BASE_URL=http://127.0.0.1:8089/payu ...
+    PAYMENT_PROVIDER=mercadopago MERCADOPAGO_BASE_URL=http://127.0.0.1:8089/mercadopago ...
+
+Con `--webhook-base` cada intención creada dispara, tras `--callback-delay`
+segundos, el callback de aprobación en el formato de cada proveedor.
+`--latency` y `--fail-rate` sirven para ejercitar timeouts y el circuit breaker.
+"""
+import json
+import random
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.request import Request, urlopen
+
+from .providers.payu import confirmation_sign
+
+
+def payu_intent(body, tx_id, base):
+    order = body["transaction"]["order"]
+    callback = {
+        "reference_sale": order["referenceCode"],
+        "transaction_id": tx_id,
+        "state_pol": "4",
+        "value": order["additionalValues"]["TX_VALUE"]["value"],
+        "merchant_id": body["merchant"].get("apiLogin", ""),
+        "currency": order["additionalValues"]["TX_VALUE"]["currency"],
+    }
+    # Firmado con la apiKey del request, como lo haría PayU
+    if body["merchant"].get("apiKey"):
+        callback["sign"] = confirmation_sign(body["merchant"]["apiKey"], callback)
+    response = {
+        "code": "SUCCESS",
+        "transactionResponse": {
+            "transactionId": tx_id,
+            "state": "PENDING",
+            "extraParameters": {"BANK_URL": f"{base}/pay/{tx_id}"},
+        },
+    }
+    return response, callback
+
+
+def mercadopago_intent(body, tx_id, base):
+    callback = {
+        "id": tx_id,
+        "external_reference": body["external_reference"],
+        "status": "approved",
+        "transaction_amount": body["items"][0]["unit_price"],
+    }
+    return {"id": tx_id, "init_point": f"{base}/pay/{tx_id}"}, callback
+
+
+ROUTES = {
+    ("payu", "/payments-api/4.0/service.cgi"): payu_intent,
+    ("mercadopago", "/checkout/preferences"): mercadopago_intent,
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, como un proveedor real
+
+    def _send(self, code, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b"{}"
+        config = self.server.config
+        provider, _, path = self.path.lstrip("/").partition("/")
+        handler = ROUTES.get((provider, f"/{path}"))
+        if handler is None:
+            return self._send(404, {"error": "not found"})
+        if config["latency"]:
+            time.sleep(config["latency"])
+        if config["fail_rate"] and random.random() < config["fail_rate"]:
+            return self._send(503, {"error": "stub failure"})
+        try:
+            body = json.loads(raw)
+            tx_id = f"stub-{uuid.uuid4().hex[:16]}"
+            response, callback = handler(body, tx_id, f"http://{self.headers.get('Host')}/{provider}")
+        except (ValueError, KeyError, IndexError, TypeError):
+            return self._send(400, {"error": "bad request"})
+        self.server.stats[provider] = self.server.stats.get(provider, 0) + 1
+        if config["webhook_base"]:
+            timer = threading.Timer(config["callback_delay"], self.server.send_callback, (provider, callback))
+            timer.daemon = True
+            timer.start()
+        return self._send(200, response)
+
+    def do_GET(self):
+        if self.path == "/stats":
+            return self._send(200, self.server.stats)
+        return self._send(404, {"error": "not found"})
+
+    def log_message(self, format, *args):
+        if self.server.config["verbose"]:
+            super().log_message(format, *args)
+
+
+class StubProviderServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, latency=0.0, fail_rate=0.0, webhook_base="", callback_delay=0.5,
+                 webhook_token="", verbose=False):
+        super().__init__(address, StubHandler)
+        self.stats = {}
+        self.config = {
+            "latency": latency,
+            "fail_rate": fail_rate,
+            "webhook_base": webhook_base.rstrip("/"),
+            "callback_delay": callback_delay,
+            "webhook_token": webhook_token,
+            "verbose": verbose,
+        }
+
+    def send_callback(self, provider, payload):
+        headers = {"Content-Type": "application/json"}
+        if self.config["webhook_token"]:
+            headers["X-Webhook-Token"] = self.config["webhook_token"]
+        req = Request(f"{self.config['webhook_base']}/{provider}/", json.dumps(payload).encode(), headers)
+        try:
+            urlopen(req, timeout=5).read()
+        except OSError:
+            pass
+
+
+def serve_in_thread(host="127.0.0.1", port=0, **options):
+    """Levanta el stub en un hilo (para tests/benchmarks). Retorna el servidor."""
+    server = StubProviderServer((host, port), **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
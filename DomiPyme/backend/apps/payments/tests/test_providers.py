@@ -0,0 +1,111 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.payments.models import Transaction
+from apps.payments.providers import CircuitOpenError, ProviderError, get_provider, reset_providers
+from apps.payments.providers.mercadopago import MercadoPagoProvider, notification_signature
+from apps.payments.providers.payu import PayUProvider, confirmation_sign
+from apps.payments.stub_server import serve_in_thread
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+@pytest.fixture
+def stub(settings):
+    server = serve_in_thread()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    settings.PAYMENT_PROVIDERS = {
+        "sandbox": {},
+        "payu": {"BASE_URL": f"{base}/payu"},
+        "mercadopago": {"BASE_URL": f"{base}/mercadopago"},
+    }
+    settings.PAYMENT_CIRCUIT_FAILURES = 2
+    reset_providers()
+    yield server
+    server.shutdown()
+    server.server_close()
+    reset_providers()
+
+
+def _order(total="15000.00"):
+    user = User.objects.create_user(email="prov@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=user, name="Prov", slug="prov")
+    return Order.objects.create(customer=user, shop=shop, total=total)
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("name", ["payu", "mercadopago"])
+def test_adapters_create_intents_against_stub(stub, name):
+    order = _order()
+    provider = get_provider(name)
+    first = provider.create_intent(order)
+    second = provider.create_intent(order)
+    assert first.provider_tx_id.startswith("stub-")
+    assert first.payment_url.endswith(first.provider_tx_id)
+    assert first.provider_tx_id != second.provider_tx_id
+    assert stub.stats[name] == 2
+    assert get_provider(name) is provider  # una sesión (pool) por proceso
+
+
+@pytest.mark.django_db
+def test_circuit_breaker_opens_after_failures(stub):
+    stub.config["fail_rate"] = 1.0
+    order = _order()
+    provider = get_provider("payu")
+    for _ in range(2):
+        with pytest.raises(ProviderError):
+            provider.create_intent(order)
+    with pytest.raises(CircuitOpenError):
+        provider.create_intent(order)
+    assert provider.breaker.state == "open"
+
+
+@pytest.mark.django_db
+def test_checkout_uses_configured_provider(stub, settings):
+    settings.PAYMENT_PROVIDER = "mercadopago"
+    user = User.objects.create_user(email="buyer@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=user, name="MP", slug="mp")
+    product = Product.objects.create(shop=shop, name="Té", price=3000, stock=5)
+    client = APIClient()
+    client.force_authenticate(user=user)
+    payload = {"items": [{"product": product.id, "price": "3000.00", "qty": 1}]}
+
+    resp = client.post(reverse("orders-checkout"), payload, format="json")
+    assert resp.status_code == 201
+    tx = Transaction.objects.get(order_id=resp.data["order_id"])
+    assert (tx.provider, tx.status) == ("mercadopago", "pending")
+    assert resp.data["payment_url"].endswith(tx.provider_tx_id)
+
+    # si el proveedor falla la orden queda creada (pendiente) y sin URL de pago
+    stub.config["fail_rate"] = 1.0
+    resp = client.post(reverse("orders-checkout"), payload, format="json")
+    assert resp.status_code == 201
+    assert resp.data["payment_url"] is None
+
+
+def test_payu_confirmation_signature():
+    payload = {"merchant_id": "508029", "reference_sale": "17", "value": "15000.00", "currency": "COP",
+               "state_pol": "4", "transaction_id": "tx-1"}
+    # new_value a un decimal cuando el segundo es cero
+    assert confirmation_sign("key", payload) == confirmation_sign("key", {**payload, "value": "15000.0"})
+    provider = PayUProvider(credentials={"API_KEY": "key", "WEBHOOK_SECRET": "token"})
+    assert provider.verify_webhook({}, {**payload, "sign": confirmation_sign("key", payload)})
+    # Con firma configurada el token compartido no alcanza
+    assert not provider.verify_webhook({"X-Webhook-Token": "token"}, payload)
+    assert not provider.verify_webhook({}, {**payload, "state_pol": "6", "sign": confirmation_sign("key", payload)})
+
+
+def test_mercadopago_notification_signature():
+    provider = MercadoPagoProvider(credentials={"SIGNATURE_SECRET": "mp-secret"})
+    payload = {"id": "ABC123", "external_reference": "17", "status": "approved"}
+    v1 = notification_signature("mp-secret", "ABC123", "req-1", "1700000000")
+    headers = {"x-signature": f"ts=1700000000,v1={v1}", "x-request-id": "req-1"}
+    assert provider.verify_webhook(headers, payload)
+    assert not provider.verify_webhook({**headers, "x-request-id": "req-2"}, payload)
+    assert not provider.verify_webhook({}, payload)
+    # Sin firma ni token configurados no entra nada
+    assert not MercadoPagoProvider().verify_webhook({"X-Webhook-Token": ""}, payload)
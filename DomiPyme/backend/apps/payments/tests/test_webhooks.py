@@ -0,0 +1,187 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.checkout import place_orders
+from apps.orders.reservations import release_expired
+from apps.payments import webhooks
+from apps.payments.models import Transaction, WebhookEvent
+from apps.payments.providers import reset_providers
+from apps.payments.webhooks import process_batch, process_pending
+from apps.shops.models import Shop, Product
+
+User = get_user_model()
+
+
+def _orders(count, stock=50):
+    user = User.objects.create_user(email=f"w{count}@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=user, name=f"Pagos {count}", slug=f"pagos-{count}")
+    product = Product.objects.create(shop=shop, name="Queso", price=4000, stock=stock)
+    orders = [place_orders([{"product": product.id, "qty": 2}], user)[0] for _ in range(count)]
+    return product, orders
+
+
+def _event(order, tx_id, status="approved"):
+    return {"order_id": order.id, "provider_tx_id": tx_id, "status": status, "amount": str(order.total)}
+
+
+@pytest.fixture
+def webhook_secret(settings):
+    settings.PAYMENT_WEBHOOK_SECRET = "s3cret"
+    reset_providers()
+    yield "s3cret"
+    reset_providers()
+
+
+@pytest.mark.django_db
+def test_webhook_endpoint_only_persists_event(webhook_secret):
+    _, [order] = _orders(1)
+    client = APIClient()
+    url = reverse("payments-webhook", kwargs={"provider": "payu"})
+    payload = {"reference_sale": order.id, "transaction_id": "tx-1", "state_pol": "4", "value": str(order.total)}
+    assert client.post(url, payload, format="json").status_code == 403
+    assert client.post(url, payload, format="json", HTTP_X_WEBHOOK_TOKEN="otro").status_code == 403
+    resp = client.post(url, payload, format="json", HTTP_X_WEBHOOK_TOKEN=webhook_secret)
+    assert resp.status_code == 202
+    event = WebhookEvent.objects.get()
+    assert (event.provider, event.provider_tx_id, event.status) == ("payu", "tx-1", "pending")
+    order.refresh_from_db()
+    assert order.status == "pending"
+    process_pending()
+    order.refresh_from_db()
+    assert order.status == "paid"
+
+    assert client.post(reverse("payments-webhook", kwargs={"provider": "acme"}), {}, format="json").status_code == 404
+
+
+@pytest.mark.django_db
+def test_batch_confirms_orders_dedupes_and_decrements_stock():
+    product, orders = _orders(3, stock=10)
+    for i, order in enumerate(orders[:2]):
+        WebhookEvent.objects.create(provider="sandbox", provider_tx_id=f"tx-{i}", payload=_event(order, f"tx-{i}"))
+    # reintento del proveedor para la misma transacción
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-0", payload=_event(orders[0], "tx-0"))
+    WebhookEvent.objects.create(
+        provider="sandbox", provider_tx_id="tx-9", payload=_event(orders[2], "tx-9", "rejected")
+    )
+
+    assert process_pending() == 4
+    for order in orders:
+        order.refresh_from_db()
+    assert [o.status for o in orders] == ["paid", "paid", "cancelled"]
+    assert all(o.payment_confirmed for o in orders[:2])
+    product.refresh_from_db()
+    assert (product.stock, product.reserved) == (6, 0)
+    assert Transaction.objects.filter(status="approved").count() == 2
+    assert WebhookEvent.objects.filter(status="duplicate").count() == 1
+
+    # un callback tardío de una transacción ya cerrada también es duplicado
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-1", payload=_event(orders[1], "tx-1"))
+    process_pending()
+    product.refresh_from_db()
+    assert product.stock == 6
+    assert WebhookEvent.objects.filter(status="duplicate").count() == 2
+
+
+@pytest.mark.django_db
+def test_batch_query_count_does_not_grow_with_batch():
+    def run(count):
+        _, orders = _orders(count)
+        for i, order in enumerate(orders):
+            WebhookEvent.objects.create(provider="sandbox", provider_tx_id=f"{count}-{i}", payload=_event(order, f"{count}-{i}"))
+        with CaptureQueriesContext(connection) as ctx:
+            process_batch(batch_size=100)
+        return len(ctx.captured_queries)
+
+    assert run(2) == run(25)
+
+
+@pytest.mark.django_db
+def test_bad_events_are_marked_as_error():
+    WebhookEvent.objects.create(provider="payu", provider_tx_id="", payload={"foo": 1})
+    process_pending()
+    event = WebhookEvent.objects.get()
+    assert event.status == "error" and event.error
+
+
+@pytest.mark.django_db
+def test_two_transactions_for_one_order_keep_the_last():
+    product, [order] = _orders(1, stock=5)
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-a", payload=_event(order, "tx-a", "rejected"))
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-b", payload=_event(order, "tx-b"))
+
+    assert process_pending() == 2
+    order.refresh_from_db()
+    assert order.status == "paid"
+    assert list(Transaction.objects.values_list("provider_tx_id", "status")) == [("tx-b", "approved")]
+    assert dict(WebhookEvent.objects.values_list("provider_tx_id", "status")) == {
+        "tx-a": "duplicate", "tx-b": "processed",
+    }
+
+
+@pytest.mark.django_db
+def test_approval_after_expiry_is_flagged_for_refund(caplog):
+    product, [order] = _orders(1, stock=5)
+    assert release_expired(ttl=-1) == 1
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-tarde", payload=_event(order, "tx-tarde"))
+
+    assert process_pending() == 1
+    order.refresh_from_db()
+    product.refresh_from_db()
+    assert order.status == "cancelled" and (product.stock, product.reserved) == (5, 0)
+    assert list(Transaction.objects.values_list("provider_tx_id", "status")) == [("tx-tarde", "needs_refund")]
+    assert f"orden {order.pk} en estado cancelled" in caplog.text
+
+    # Un reintento del proveedor es duplicado, no vuelve a procesarse
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-tarde", payload=_event(order, "tx-tarde"))
+    process_pending()
+    assert WebhookEvent.objects.order_by("-id").first().status == "duplicate"
+
+
+@pytest.mark.django_db
+def test_failing_event_does_not_block_the_batch(monkeypatch):
+    def broken(order_ids):
+        raise IntegrityError("falla simulada")
+
+    monkeypatch.setattr(webhooks, "release_reservations", broken)
+    product, orders = _orders(2, stock=10)
+    WebhookEvent.objects.create(provider="sandbox", provider_tx_id="tx-ok", payload=_event(orders[0], "tx-ok"))
+    WebhookEvent.objects.create(
+        provider="sandbox", provider_tx_id="tx-ko", payload=_event(orders[1], "tx-ko", "rejected")
+    )
+
+    assert process_pending() == 2
+    assert dict(WebhookEvent.objects.values_list("provider_tx_id", "status")) == {
+        "tx-ok": "processed", "tx-ko": "error",
+    }
+    assert list(Transaction.objects.values_list("provider_tx_id", flat=True)) == ["tx-ok"]
+    orders[0].refresh_from_db()
+    assert orders[0].status == "paid"
+
+
+@pytest.mark.django_db
+def test_webhooks_are_refused_without_secret_or_signature(settings):
+    settings.PAYMENT_WEBHOOK_SECRET = ""
+    reset_providers()
+    _, [order] = _orders(1)
+    resp = APIClient().post(
+        reverse("payments-webhook", kwargs={"provider": "sandbox"}), _event(order, "tx-x"), format="json",
+        HTTP_X_WEBHOOK_TOKEN="",
+    )
+    assert resp.status_code == 403
+    assert not WebhookEvent.objects.exists()
+    reset_providers()
+
+
+@pytest.mark.django_db
+def test_sandbox_is_not_registered_outside_debug(settings, webhook_secret):
+    settings.PAYMENT_PROVIDERS = {name: conf for name, conf in settings.PAYMENT_PROVIDERS.items() if name != "sandbox"}
+    _, [order] = _orders(1)
+    resp = APIClient().post(
+        reverse("payments-webhook", kwargs={"provider": "sandbox"}), _event(order, "tx-x"), format="json",
+        HTTP_X_WEBHOOK_TOKEN=webhook_secret,
+    )
+    assert resp.status_code == 404
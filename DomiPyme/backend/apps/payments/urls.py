@@ -1,7 +1,8 @@
 # backend/apps/payments/urls.py
 from django.urls import path
-from .views import PaymentListView
+from .views import PaymentListView, WebhookView
 
 urlpatterns = [
-    path('', PaymentListView.as_view(), name='payments-list'),
+    path('payments/', PaymentListView.as_view(), name='payments-list'),
+    path('payments/webhooks/<str:provider>/', WebhookView.as_view(), name='payments-webhook'),
 ]
@@ -1,28 +1,40 @@
 # backend/apps/payments/views.py
-from django.http import JsonResponse
-from django.views import View
+from rest_framework import generics, permissions, status
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
-# Intentamos importar el modelo Payment si existe.
-# Si hay algún error (modelo inexistente o import error), lo capturamos
-# para no romper el arranque del servidor.
-try:
-    from .models import Payment
-except Exception:
-    Payment = None
+from .models import Transaction, WebhookEvent
+from .serializers import TransactionSerializer
+from .providers import get_provider, provider_names
 
-class PaymentListView(View):
+class PaymentListView(generics.ListAPIView):
     """
-    Vista simple que devuelve un JSON con la lista de payments.
-    Si el modelo Payment no está definido, devuelve un placeholder para evitar errores al arrancar.
+    Lista de transacciones de pago (solo staff).
     """
-    def get(self, request, *args, **kwargs):
-        if Payment is None:
-            return JsonResponse({
-                "payments": [],
-                "detail": "Payment model not available (placeholder response)."
-            }, status=200)
+    queryset = Transaction.objects.select_related("order").order_by("-created_at")
+    serializer_class = TransactionSerializer
+    permission_classes = [permissions.IsAdminUser]
 
-        # Ajusta los campos que quieras exponer
-        qs = Payment.objects.all().values('id', 'amount', 'status', 'created_at') if hasattr(Payment, 'objects') else []
-        data = list(qs)
-        return JsonResponse({"payments": data})
+class WebhookView(APIView):
+    """
+    Recibe callbacks de los proveedores. Solo guarda el evento crudo y responde
+    202; el procesamiento lo hace `manage.py process_payment_webhooks` por lotes.
+    Cada adaptador verifica su firma (o el token compartido): sin ninguna de
+    las dos configurada se rechaza todo.
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, provider):
+        if provider not in provider_names():
+            return Response({"detail": "Proveedor no soportado."}, status=status.HTTP_404_NOT_FOUND)
+        adapter = get_provider(provider)
+        payload = request.data if isinstance(request.data, dict) else {"body": request.data}
+        if not adapter.verify_webhook(request.headers, payload):
+            return Response({"detail": "Firma o token inválido."}, status=status.HTTP_403_FORBIDDEN)
+        WebhookEvent.objects.create(
+            provider=provider,
+            provider_tx_id=str(adapter.webhook_tx_id(payload))[:200],
+            payload=payload,
+        )
+        return Response({"received": True}, status=status.HTTP_202_ACCEPTED)
@@ -0,0 +1,191 @@
+# backend/apps/payments/webhooks.py
+"""
+Procesamiento por lotes de los callbacks de pago.
+
+El endpoint (`WebhookView`) solo inserta el evento crudo y responde 202. Un
+consumidor (`manage.py process_payment_webhooks`) toma lotes de eventos
+pendientes y por cada lote:
+
+- descarta duplicados por `provider_tx_id` (dentro del lote y contra
+  transacciones ya cerradas) y, de varias transacciones de una misma orden,
+  se queda con la última,
+- crea/actualiza las `Transaction` con bulk_create/bulk_update,
+- confirma las órdenes aprobadas (pending -> paid) y descuenta su stock con
+  un solo UPDATE para todos los productos del lote, y encola los correos de
+  confirmación (cliente y comercio) en el outbox,
+- libera las reservas de las órdenes rechazadas.
+
+Un pago aprobado para una orden que ya no está pendiente (la canceló el
+barrido de reservas vencidas, p.ej.) no la revive: su Transaction queda en
+`needs_refund` (el dinero se cobró y hay que devolverlo) con un warning en el
+log.
+
+Las escrituras del lote van en un savepoint; si fallan, se reintenta evento
+por evento (cada uno en su savepoint) y el que falla queda como `error`.
+"""
+import logging
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+
+from apps.orders import notifications
+from apps.orders.models import Order
+from apps.orders.reservations import commit_reservations, release_reservations
+from .models import Transaction, WebhookEvent
+from .providers import get_provider
+
+FINAL_STATUSES = ("approved", "rejected", "needs_refund")
+
+logger = logging.getLogger(__name__)
+
+
+def parse_event(provider, payload):
+    """
+    Normaliza el payload con el adaptador del proveedor a
+    {order_id, provider_tx_id, status, amount}. Lanza ValueError si no sirve.
+    """
+    try:
+        adapter = get_provider(provider)
+    except KeyError:
+        raise ValueError(f"proveedor desconocido: {provider!r}")
+    return adapter.parse_webhook(payload)
+
+
+def _finish(events, status, error=""):
+    if events:
+        WebhookEvent.objects.filter(pk__in=[e.pk for e in events]).update(
+            status=status, error=error, processed_at=timezone.now()
+        )
+
+
+def _apply(items, existing):
+    """
+    Crea/actualiza las Transaction de `items` [(evento, datos, orden)] (una
+    por orden) y confirma o libera sus órdenes.
+    """
+    to_create, to_update, approved, rejected = [], [], [], []
+    orders = {}
+    for event, data, order in items:
+        tx = existing.get(order.pk)
+        if tx is None:
+            tx = Transaction(order=order, amount=order.total)
+            to_create.append(tx)
+        else:
+            to_update.append(tx)
+        tx.provider = event.provider
+        tx.provider_tx_id = data["provider_tx_id"]
+        tx.status = data["status"]
+        tx.raw_response = event.payload
+        orders[order.pk] = order
+        if data["status"] == "approved":
+            approved.append(order.pk)
+        elif data["status"] == "rejected":
+            rejected.append(order.pk)
+
+    Transaction.objects.bulk_create(to_create)
+    Transaction.objects.bulk_update(to_update, ["provider", "provider_tx_id", "status", "raw_response"])
+    if approved:
+        confirmed = commit_reservations(approved)
+        notifications.order_paid(confirmed)
+        confirmed_ids = set(confirmed)
+        late = [pk for pk in approved if pk not in confirmed_ids]
+        if late:
+            Transaction.objects.filter(order_id__in=late).update(status="needs_refund")
+            for pk in late:
+                logger.warning(
+                    "Pago aprobado para la orden %s en estado %s: la transacción queda needs_refund",
+                    pk, orders[pk].status,
+                )
+    if rejected:
+        release_reservations(rejected)
+
+
+def process_batch(batch_size=None):
+    """Procesa un lote de eventos pendientes. Retorna cuántos eventos tomó."""
+    batch_size = batch_size or settings.PAYMENT_WEBHOOK_BATCH_SIZE
+    with transaction.atomic():
+        events = list(
+            WebhookEvent.objects.select_for_update(skip_locked=True)
+            .filter(status="pending")
+            .order_by("id")[:batch_size]
+        )
+        if not events:
+            return 0
+
+        # El último evento de cada transacción en el lote es el que cuenta
+        latest, duplicates, errors = {}, [], []
+        for event in events:
+            try:
+                data = parse_event(event.provider, event.payload)
+            except ValueError as exc:
+                event.error = str(exc)
+                errors.append(event)
+                continue
+            key = (event.provider, data["provider_tx_id"])
+            if key in latest:
+                duplicates.append(latest[key][0])
+            latest[key] = (event, data)
+
+        closed = set(
+            Transaction.objects.filter(
+                provider_tx_id__in=[tx_id for _, tx_id in latest], status__in=FINAL_STATUSES
+            ).values_list("provider", "provider_tx_id")
+        )
+        for key in list(latest):
+            if key in closed:
+                duplicates.append(latest.pop(key)[0])
+
+        orders = Order.objects.in_bulk([data["order_id"] for _, data in latest.values()])
+        # Una Transaction por orden: de dos transacciones distintas de la misma
+        # orden en el lote cuenta la última
+        by_order = {}
+        for event, data in latest.values():
+            order = orders.get(data["order_id"])
+            if order is None:
+                event.error = f"orden {data['order_id']} no existe"
+                errors.append(event)
+                continue
+            if data["status"] == "approved" and data["amount"] is not None and data["amount"] != order.total:
+                event.error = f"monto {data['amount']} no coincide con el total {order.total}"
+                errors.append(event)
+                continue
+            if order.pk in by_order:
+                duplicates.append(by_order[order.pk][0])
+            by_order[order.pk] = (event, data, order)
+
+        items = list(by_order.values())
+        existing = {tx.order_id: tx for tx in Transaction.objects.filter(order_id__in=list(by_order))}
+        processed = []
+        try:
+            with transaction.atomic():
+                _apply(items, existing)
+            processed = [event for event, _, _ in items]
+        except DatabaseError:
+            # Algo del lote falló: uno por uno, cada evento en su savepoint,
+            # para que el que falla no deje a los demás pendientes para siempre
+            existing = {tx.order_id: tx for tx in Transaction.objects.filter(order_id__in=list(by_order))}
+            for item in items:
+                try:
+                    with transaction.atomic():
+                        _apply([item], existing)
+                    processed.append(item[0])
+                except DatabaseError as exc:
+                    item[0].error = str(exc)
+                    errors.append(item[0])
+
+        _finish(processed, "processed")
+        _finish(duplicates, "duplicate")
+        for event in errors:
+            _finish([event], "error", event.error)
+    return len(events)
+
+
+def process_pending(batch_size=None):
+    """Procesa lotes hasta vaciar la cola. Retorna el total de eventos."""
+    total = 0
+    while True:
+        taken = process_batch(batch_size)
+        total += taken
+        if not taken:
+            return total
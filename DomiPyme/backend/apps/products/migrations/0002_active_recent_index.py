@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:42
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("active", True)),
+                fields=["-created_at", "-id"],
+                name="catalog_active_seek_idx",
+            ),
+        ),
+    ]
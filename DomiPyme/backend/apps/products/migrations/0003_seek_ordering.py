@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:08
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_active_recent_index"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="product",
+            options={
+                "ordering": ["-created_at", "-id"],
+                "verbose_name": "Product",
+                "verbose_name_plural": "Products",
+            },
+        ),
+    ]
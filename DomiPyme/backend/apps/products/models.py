@@ -1,6 +1,7 @@
 # backend/apps/products/models.py
 from django.db import models
-from django.utils.text import slugify
+
+from apps.common.slugs import save_with_slug
 
 class Product(models.Model):
     name = models.CharField(max_length=200)
@@ -13,7 +14,14 @@ class Product(models.Model):
     updated_at = models.DateTimeField(auto_now=True)
 
     class Meta:
-        ordering = ['-created_at']
+        # Mismo orden que el cursor de HybridPagination (apps.common.pagination)
+        ordering = ['-created_at', '-id']
+        indexes = [
+            # El listado público solo muestra activos, del más nuevo al más viejo
+            models.Index(
+                fields=['-created_at', '-id'], name='catalog_active_seek_idx', condition=models.Q(active=True)
+            ),
+        ]
         verbose_name = 'Product'
         verbose_name_plural = 'Products'
 
@@ -21,12 +29,6 @@ class Product(models.Model):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug and self.name:
-            base = slugify(self.name)[:200]
-            slug = base
-            counter = 1
-            while Product.objects.filter(slug=slug).exclude(pk=self.pk).exists():
-                slug = f"{base}-{counter}"
-                counter += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        if not self.name:
+            return super().save(*args, **kwargs)
+        save_with_slug(self, lambda: super(Product, self).save(*args, **kwargs))
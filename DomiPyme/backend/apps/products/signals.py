@@ -0,0 +1,15 @@
+# backend/apps/products/signals.py
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.common import response_cache
+from .models import Product
+
+# Scope de cache de /api/products/ (ver ProductViewSet)
+PRODUCTS_SCOPE = "products"
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def bump_products_cache(sender, instance, **kwargs):
+    response_cache.bump([PRODUCTS_SCOPE])
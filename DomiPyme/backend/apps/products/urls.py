@@ -4,6 +4,8 @@ from .views import ProductViewSet
 from django.urls import path, include
 
 router = DefaultRouter()
+# Sin vista raíz: /api/ es el listado/creación de comercios (apps.shops.urls)
+router.include_root_view = False
 router.register('products', ProductViewSet, basename='product')
 
 urlpatterns = [
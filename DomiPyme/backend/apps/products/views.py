@@ -1,11 +1,16 @@
 from rest_framework import viewsets, permissions
+from apps.common.pagination import HybridPagination
+from apps.common.response_cache import VersionedCacheMixin
+from apps.common.values_serializers import ValuesReadMixin
 from .models import Product
 from .serializers import ProductSerializer
 from .permissions import IsMerchantOrAdmin
+from .signals import PRODUCTS_SCOPE
 
-class ProductViewSet(viewsets.ModelViewSet):
+class ProductViewSet(VersionedCacheMixin, ValuesReadMixin, viewsets.ModelViewSet):
     queryset = Product.objects.all()  # mostrar todo (filter activo en list o serializer)
     serializer_class = ProductSerializer
+    pagination_class = HybridPagination
 
     def get_queryset(self):
         qs = Product.objects.filter(active=True)
@@ -15,3 +20,7 @@ class ProductViewSet(viewsets.ModelViewSet):
         return qs
 
     permission_classes = [IsMerchantOrAdmin]
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        # list y retrieve muestran lo mismo a todos (solo activos)
+        return [PRODUCTS_SCOPE]
@@ -0,0 +1,343 @@
+# backend/apps/shops/catalog_io.py
+"""
+Importación y exportación masiva del catálogo de un comercio (CSV o JSON).
+
+Importar: el archivo se lee como stream (CSV con csv.DictReader; JSON como
+arreglo o una fila por línea, decodificado objeto por objeto) y se procesa en
+bloques de IMPORT_CHUNK_SIZE filas. Por bloque: validación fila a fila, una
+query para los productos existentes por (shop, sku) (bloqueados hasta el
+fin del bloque), una para categorías, bulk_create de los nuevos, un UPDATE ... FROM (VALUES ...) por lote para los
+existentes que cambiaron (ver `apps.common.bulk`) y un
+`products_changed` para caches e índice de búsqueda. La memoria depende del
+tamaño del bloque, no del archivo.
+
+Una fila que dejaría el stock por debajo de las unidades reservadas por
+órdenes pendientes (`stock < reservado`) se rechaza y queda en el reporte:
+checkout cuenta con `stock >= reserved`.
+
+Exportar: `.values()` + `.iterator()` y generadores de texto, para devolver un
+StreamingHttpResponse o escribir a un archivo sin cargar el catálogo entero.
+"""
+import codecs
+import csv
+import io
+import json
+from decimal import Decimal, InvalidOperation
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+
+from apps.common.bulk import bulk_update_values
+from .models import Category, Product
+from .signals import products_changed
+
+IMPORT_CHUNK_SIZE = 1000
+EXPORT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 500
+FORMATS = ("csv", "json")
+FIELDS = ("sku", "name", "description", "price", "stock", "category", "active")
+UPDATE_FIELDS = ["name", "description", "price", "stock", "category", "active"]
+TRUE_VALUES = {"1", "true", "t", "yes", "si", "sí", "y"}
+FALSE_VALUES = {"0", "false", "f", "no", "n"}
+
+
+class ImportFormatError(ValueError):
+    """El archivo no se puede leer como el formato indicado."""
+
+
+# --- lectura ------------------------------------------------------------------
+
+def detect_format(name="", content_type=""):
+    name, content_type = (name or "").lower(), (content_type or "").lower()
+    if name.endswith((".json", ".jsonl", ".ndjson")) or "json" in content_type:
+        return "json"
+    return "csv"
+
+
+def _text_stream(fileobj):
+    """Texto UTF-8 (con o sin BOM) sobre un archivo binario, sin leerlo entero."""
+    if isinstance(fileobj, io.TextIOBase):
+        return fileobj
+    return codecs.getreader("utf-8-sig")(fileobj)
+
+
+def iter_csv(fileobj):
+    reader = csv.DictReader(_text_stream(fileobj))
+    if not reader.fieldnames:
+        return
+    if not {"sku", "name"} <= {f.strip().lower() for f in reader.fieldnames}:
+        raise ImportFormatError("El CSV debe tener al menos las columnas sku y name.")
+    for row in reader:
+        # line_num apunta a la última línea leída (la fila actual)
+        yield reader.line_num, {(k or "").strip().lower(): v for k, v in row.items()}
+
+
+def iter_json(fileobj, read_size=64 * 1024):
+    """
+    Objetos de un arreglo JSON (`[{...}, {...}]`) o de JSON Lines, decodificados
+    de a uno a medida que llegan los bytes.
+    """
+    decoder = json.JSONDecoder()
+    stream = _text_stream(fileobj)
+    buffer, pos, index = "", 0, 0
+    started = eof = False
+    while True:
+        while pos < len(buffer) and buffer[pos] in " \t\r\n,":
+            pos += 1
+        if pos < len(buffer) and not started:
+            started = True
+            if buffer[pos] == "[":
+                pos += 1
+            continue
+        if pos < len(buffer) and buffer[pos] == "]":
+            return
+        obj = None
+        if pos < len(buffer):
+            try:
+                obj, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise ImportFormatError(f"JSON inválido cerca del objeto {index + 1}.")
+        if obj is not None:
+            index += 1
+            if not isinstance(obj, dict):
+                raise ImportFormatError(f"El elemento {index} no es un objeto.")
+            yield index, {str(k).lower(): v for k, v in obj.items()}
+            continue
+        if eof:
+            return
+        # Objeto incompleto (o buffer vacío): traer más texto
+        chunk = stream.read(read_size)
+        eof = not chunk
+        buffer, pos = buffer[pos:] + chunk, 0
+
+
+def iter_rows(fileobj, fmt):
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Formato no soportado: {fmt}")
+    return iter_csv(fileobj) if fmt == "csv" else iter_json(fileobj)
+
+
+# --- validación ---------------------------------------------------------------
+
+def _text(value):
+    return "" if value is None else str(value).strip()
+
+
+def clean_row(raw):
+    """Retorna (datos, errores) para una fila del archivo."""
+    data, errors = {}, {}
+    data["sku"] = _text(raw.get("sku"))
+    if not data["sku"]:
+        errors["sku"] = "Requerido."
+    elif len(data["sku"]) > 100:
+        errors["sku"] = "Máximo 100 caracteres."
+    data["name"] = _text(raw.get("name"))
+    if not data["name"]:
+        errors["name"] = "Requerido."
+    elif len(data["name"]) > 200:
+        errors["name"] = "Máximo 200 caracteres."
+    data["description"] = _text(raw.get("description"))
+    try:
+        data["price"] = Decimal(_text(raw.get("price"))).quantize(Decimal("0.01"))
+        if data["price"] < 0 or data["price"] >= Decimal("1e10"):
+            errors["price"] = "Fuera de rango."
+    except InvalidOperation:
+        errors["price"] = "Precio inválido."
+    stock = _text(raw.get("stock")) or "0"
+    try:
+        data["stock"] = int(stock)
+        if data["stock"] < 0:
+            errors["stock"] = "No puede ser negativo."
+    except ValueError:
+        errors["stock"] = "Debe ser un entero."
+    data["category"] = _text(raw.get("category"))[:100] or None
+    active = raw.get("active")
+    if isinstance(active, bool):
+        data["active"] = active
+    else:
+        active = _text(active).lower()
+        if not active or active in TRUE_VALUES:
+            data["active"] = True
+        elif active in FALSE_VALUES:
+            data["active"] = False
+        else:
+            errors["active"] = "Usa true/false."
+    return data, errors
+
+
+# --- importación --------------------------------------------------------------
+
+class ImportReport:
+    def __init__(self):
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.unchanged = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, row, sku, errors):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"row": row, "sku": sku, "errors": errors})
+
+    def as_dict(self):
+        return {
+            "rows": self.rows,
+            "created": self.created,
+            "updated": self.updated,
+            "unchanged": self.unchanged,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "errors_truncated": self.error_count > len(self.errors),
+        }
+
+
+class CatalogImporter:
+    """Upsert por (shop, sku) en bloques. `run(rows)` retorna un ImportReport."""
+
+    def __init__(self, shop, chunk_size=IMPORT_CHUNK_SIZE):
+        self.shop = shop
+        self.chunk_size = chunk_size
+        self.categories = {}
+        self.report = ImportReport()
+
+    def run(self, rows):
+        rows = iter(rows)
+        while True:
+            try:
+                chunk = list(islice(rows, self.chunk_size))
+            except (csv.Error, UnicodeDecodeError) as exc:
+                chunk = None
+                error = ImportFormatError(f"Archivo ilegible tras la fila {self.report.rows}: {exc}")
+            except ImportFormatError as exc:
+                chunk, error = None, exc
+            if chunk is None:
+                # Los bloques anteriores ya quedaron guardados
+                error.report = self.report.as_dict()
+                raise error
+            if not chunk:
+                return self.report
+            self.import_chunk(chunk)
+
+    def import_chunk(self, chunk):
+        valid = {}
+        for line, raw in chunk:
+            self.report.rows += 1
+            data, errors = clean_row(raw)
+            if errors:
+                self.report.add_error(line, data.get("sku"), errors)
+            else:
+                # Si un SKU se repite en el bloque, gana la última fila
+                valid[data["sku"]] = (line, data)
+        if not valid:
+            return
+        try:
+            with transaction.atomic():
+                created, updated, rejected = self.upsert(valid)
+        except IntegrityError as exc:
+            for line, data in valid.values():
+                self.report.add_error(line, data["sku"], {"detail": f"Conflicto al guardar: {exc}"})
+            return
+        for line, sku, reserved in rejected:
+            self.report.add_error(line, sku, {"stock": f"stock < reservado ({reserved} en órdenes pendientes)."})
+        self.report.created += len(created)
+        self.report.updated += len(updated)
+        self.report.unchanged += len(valid) - len(created) - len(updated) - len(rejected)
+        products_changed.send(sender=Product, product_ids=[p.pk for p in created + updated])
+
+    def resolve_categories(self, names):
+        missing = [n for n in names if n not in self.categories]
+        if missing:
+            for category in Category.objects.filter(shop=self.shop, name__in=missing):
+                self.categories.setdefault(category.name, category)
+            new = [n for n in missing if n not in self.categories]
+            if new:
+                # Otro import pudo crear las mismas: las que choquen con
+                # unique_shop_category_name se ignoran y se leen de nuevo
+                Category.objects.bulk_create([Category(shop=self.shop, name=n) for n in new], ignore_conflicts=True)
+                for category in Category.objects.filter(shop=self.shop, name__in=new):
+                    self.categories[category.name] = category
+
+    def upsert(self, valid):
+        self.resolve_categories({data["category"] for _, data in valid.values() if data["category"]})
+        existing = {
+            # sku__gt="" repite la condición del índice único parcial para que la BD lo use.
+            # Bloqueadas: una reserva no puede subir `reserved` entre el chequeo y el UPDATE
+            p.sku: p
+            for p in Product.objects.select_for_update().filter(shop=self.shop, sku__gt="", sku__in=list(valid))
+        }
+        to_create, to_update, rejected = [], [], []
+        for sku, (line, data) in valid.items():
+            category = self.categories.get(data["category"]) if data["category"] else None
+            values = {
+                "name": data["name"],
+                "description": data["description"],
+                "price": data["price"],
+                "stock": data["stock"],
+                "active": data["active"],
+                "category_id": category.pk if category else None,
+            }
+            product = existing.get(sku)
+            if product is not None and data["stock"] < product.reserved:
+                rejected.append((line, sku, product.reserved))
+                continue
+            if product is None:
+                to_create.append(Product(shop=self.shop, sku=sku, **values))
+            elif any(getattr(product, field) != value for field, value in values.items()):
+                # Las filas idénticas a lo guardado no se reescriben
+                for field, value in values.items():
+                    setattr(product, field, value)
+                to_update.append(product)
+        Product.objects.bulk_create(to_create)
+        bulk_update_values(to_update, UPDATE_FIELDS)
+        return to_create, to_update, rejected
+
+
+def import_catalog(shop, fileobj, fmt="csv", chunk_size=IMPORT_CHUNK_SIZE):
+    """Importa el archivo al catálogo de `shop`. Retorna el reporte como dict."""
+    return CatalogImporter(shop, chunk_size).run(iter_rows(fileobj, fmt)).as_dict()
+
+
+# --- exportación --------------------------------------------------------------
+
+def export_rows(shop):
+    qs = (
+        Product.objects.filter(shop=shop)
+        .order_by("pk")
+        .values_list("sku", "name", "description", "price", "stock", "category__name", "active")
+    )
+    for row in qs.iterator(chunk_size=EXPORT_CHUNK_SIZE):
+        yield dict(zip(FIELDS, row))
+
+
+class _Echo:
+    """Pseudo-archivo para csv.writer: devuelve la línea en vez de guardarla."""
+
+    def write(self, value):
+        return value
+
+
+def export_csv(shop):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(FIELDS)
+    for row in export_rows(shop):
+        yield writer.writerow(["" if row[f] is None else row[f] for f in FIELDS])
+
+
+def export_json(shop):
+    yield "["
+    first = True
+    for row in export_rows(shop):
+        row["price"] = str(row["price"])
+        yield ("\n" if first else ",\n") + json.dumps(row, ensure_ascii=False)
+        first = False
+    yield "\n]\n"
+
+
+def export_catalog(shop, fmt="csv"):
+    """Generador de fragmentos de texto del catálogo completo de `shop`."""
+    if fmt not in FORMATS:
+        raise ImportFormatError(f"Formato no soportado: {fmt}")
+    return export_csv(shop) if fmt == "csv" else export_json(shop)
@@ -0,0 +1,192 @@
+# backend/apps/shops/facets.py
+"""
+Contadores de filtros de la vitrina (ShopFacet), sin COUNT ... GROUP BY por
+request.
+
+Cada escritura de `apps.shops.projection` corre dentro de `tracking(ids)`:
+se leen las filas de CatalogEntry de esos productos antes y después
+(una query por lote cada vez), se restan los contadores y solo la
+diferencia se aplica con un INSERT ... ON CONFLICT DO UPDATE
+SET count = count + delta. `projection.refresh_stock` (el camino del
+checkout) no necesita el antes/después completo: consulta solo las filas que
+cruzan el cero (`stock_flips`) y un cambio que no lo cruza no escribe nada.
+
+La primera lectura de `tracking` bloquea esas filas (SELECT ... FOR UPDATE,
+en orden de id) hasta el commit: dos escrituras concurrentes del mismo
+producto no parten del mismo "antes" ni cuentan dos veces la misma diferencia.
+
+Facetas por comercio (solo productos activos): `total`, `category` (por id,
+con el nombre en `label`), `stock` (`in`/`out`) y `price` (índice del rango
+según FACET_PRICE_BUCKETS). `reconcile()` recalcula desde la proyección y
+corrige lo que se haya desviado.
+"""
+from bisect import bisect_right
+from collections import Counter
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .models import CatalogEntry, ShopFacet
+
+BATCH_SIZE = 500
+UPSERT_BATCH = 100
+ROW_FIELDS = ("shop_id", "category_id", "category_name", "in_stock", "price")
+
+
+def price_bucket(price):
+    return str(bisect_right(settings.FACET_PRICE_BUCKETS, price))
+
+
+def keys(shop_id, category_id, in_stock, price):
+    """Claves (shop_id, faceta, valor) a las que suma un producto."""
+    result = [
+        (shop_id, "total", "all"),
+        (shop_id, "stock", "in" if in_stock else "out"),
+        (shop_id, "price", price_bucket(price)),
+    ]
+    if category_id is not None:
+        result.append((shop_id, "category", str(category_id)))
+    return result
+
+
+def _count(rows, counts, labels):
+    for shop_id, category_id, category_name, in_stock, price in rows:
+        counts.update(keys(shop_id, category_id, in_stock, price))
+        if category_id is not None:
+            labels[(shop_id, "category", str(category_id))] = category_name or ""
+
+
+def snapshot(product_ids, lock=False):
+    """
+    (contadores, nombres de categoría) de las filas actuales de esos
+    productos. Con `lock` las deja bloqueadas (hay que estar en una transacción).
+    """
+    counts, labels = Counter(), {}
+    ids = sorted(product_ids) if lock else list(product_ids)
+    entries = CatalogEntry.objects.select_for_update().order_by("pk") if lock else CatalogEntry.objects.all()
+    for start in range(0, len(ids), BATCH_SIZE):
+        rows = entries.filter(pk__in=ids[start:start + BATCH_SIZE]).values_list(*ROW_FIELDS)
+        _count(rows, counts, labels)
+    return counts, labels
+
+
+@contextmanager
+def tracking(product_ids):
+    """Aplica a ShopFacet lo que cambie en CatalogEntry para esos productos."""
+    ids = list(dict.fromkeys(product_ids))
+    if not ids:
+        yield
+        return
+    # Sin savepoint propio: dentro de la transacción de la señal no suma queries
+    with transaction.atomic(savepoint=False):
+        before, _ = snapshot(ids, lock=True)
+        yield
+        after, labels = snapshot(ids)
+        after.subtract(before)
+        apply({key: delta for key, delta in after.items() if delta}, labels)
+
+
+def apply(deltas, labels=None):
+    """Suma `deltas` ({(shop_id, faceta, valor): n}) a los contadores."""
+    if not deltas:
+        return
+    labels = labels or {}
+    items = [(*key, labels.get(key, ""), delta) for key, delta in deltas.items()]
+    if connection.vendor not in ("sqlite", "postgresql"):
+        for shop_id, facet, value, label, delta in items:
+            row, _ = ShopFacet.objects.get_or_create(shop_id=shop_id, facet=facet, value=value)
+            changes = {"count": F("count") + delta}
+            if label:
+                changes["label"] = label
+            ShopFacet.objects.filter(pk=row.pk).update(**changes)
+        return
+    table = ShopFacet._meta.db_table
+    with connection.cursor() as cursor:
+        for start in range(0, len(items), UPSERT_BATCH):
+            batch = items[start:start + UPSERT_BATCH]
+            cursor.execute(
+                f"INSERT INTO {table} (shop_id, facet, value, label, count) VALUES "
+                + ", ".join(["(%s, %s, %s, %s, %s)"] * len(batch))
+                + " ON CONFLICT (shop_id, facet, value) DO UPDATE SET "
+                f"count = {table}.count + excluded.count, "
+                f"label = CASE WHEN excluded.label <> '' THEN excluded.label ELSE {table}.label END",
+                [param for item in batch for param in item],
+            )
+
+
+def stock_flips(rows):
+    """Deltas de la faceta `stock` para filas (shop_id, in_stock nuevo) que cruzaron el cero."""
+    deltas = Counter()
+    for shop_id, in_stock in rows:
+        deltas[(shop_id, "stock", "in" if in_stock else "out")] += 1
+        deltas[(shop_id, "stock", "out" if in_stock else "in")] -= 1
+    return {key: delta for key, delta in deltas.items() if delta}
+
+
+def rename_category(category):
+    ShopFacet.objects.filter(shop_id=category.shop_id, facet="category", value=str(category.pk)).update(
+        label=category.name
+    )
+
+
+@transaction.atomic
+def reconcile(shop_ids=None):
+    """
+    Recalcula los contadores desde CatalogEntry (de todos los comercios o de
+    `shop_ids`) y corrige los que difieran. Retorna cuántas filas cambió.
+    """
+    entries = CatalogEntry.objects.all()
+    stored = ShopFacet.objects.all()
+    if shop_ids is not None:
+        entries = entries.filter(shop_id__in=shop_ids)
+        stored = stored.filter(shop_id__in=shop_ids)
+    expected, labels = Counter(), {}
+    _count(entries.values_list(*ROW_FIELDS).iterator(chunk_size=2000), expected, labels)
+
+    fixed, to_update, seen = 0, [], set()
+    for row in stored.select_for_update():
+        key = (row.shop_id, row.facet, row.value)
+        seen.add(key)
+        count, label = expected.get(key, 0), labels.get(key, row.label)
+        if count == 0:
+            row.delete()
+            fixed += 1
+        elif (row.count, row.label) != (count, label):
+            row.count, row.label = count, label
+            to_update.append(row)
+    ShopFacet.objects.bulk_update(to_update, ["count", "label"])
+    missing = [
+        ShopFacet(shop_id=shop_id, facet=facet, value=value, label=labels.get((shop_id, facet, value), ""),
+                  count=count)
+        for (shop_id, facet, value), count in expected.items() if (shop_id, facet, value) not in seen
+    ]
+    ShopFacet.objects.bulk_create(missing)
+    return fixed + len(to_update) + len(missing)
+
+
+def price_ranges():
+    """[(min, max|None)] de cada índice de rango."""
+    bounds = [0, *settings.FACET_PRICE_BUCKETS]
+    return [(low, bounds[i + 1] if i + 1 < len(bounds) else None) for i, low in enumerate(bounds)]
+
+
+def for_shop(slug):
+    """Facetas de la vitrina de un comercio, listas para la respuesta. Una query."""
+    rows = ShopFacet.objects.filter(shop__slug=slug, count__gt=0).values_list("facet", "value", "label", "count")
+    result = {"total": 0, "in_stock": 0, "categories": [], "price": []}
+    ranges = price_ranges()
+    for facet, value, label, count in rows:
+        if facet == "total":
+            result["total"] = count
+        elif facet == "stock" and value == "in":
+            result["in_stock"] = count
+        elif facet == "category":
+            result["categories"].append({"id": int(value), "name": label, "count": count})
+        elif facet == "price" and int(value) < len(ranges):
+            low, high = ranges[int(value)]
+            result["price"].append({"min": low, "max": high, "count": count})
+    result["categories"].sort(key=lambda c: (-c["count"], c["name"], c["id"]))
+    result["price"].sort(key=lambda p: p["min"])
+    return result
@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shops import catalog_io
+from apps.shops.models import Shop
+
+
+class Command(BaseCommand):
+    help = "Exporta el catálogo de un comercio a CSV/JSON (en streaming)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("shop", help="Slug del comercio")
+        parser.add_argument("--format", dest="file_format", choices=catalog_io.FORMATS, default="csv")
+        parser.add_argument("--output", default="-", help="Archivo destino (default: stdout)")
+
+    def handle(self, *args, **options):
+        try:
+            shop = Shop.objects.get(slug=options["shop"])
+        except Shop.DoesNotExist:
+            raise CommandError(f"No existe el comercio {options['shop']!r}")
+        chunks = catalog_io.export_catalog(shop, options["file_format"])
+        if options["output"] == "-":
+            for chunk in chunks:
+                self.stdout.write(chunk, ending="")
+            return
+        with open(options["output"], "w", encoding="utf-8", newline="") as out:
+            for chunk in chunks:
+                out.write(chunk)
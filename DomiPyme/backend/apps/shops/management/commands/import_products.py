@@ -0,0 +1,35 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.shops import catalog_io
+from apps.shops.models import Shop
+
+
+class Command(BaseCommand):
+    help = "Importa (upsert por SKU) un catálogo CSV/JSON al comercio indicado."
+
+    def add_arguments(self, parser):
+        parser.add_argument("shop", help="Slug del comercio")
+        parser.add_argument("path", help="Archivo CSV o JSON")
+        parser.add_argument("--format", dest="file_format", choices=catalog_io.FORMATS, default=None,
+                            help="Default: según la extensión del archivo")
+        parser.add_argument("--chunk-size", type=int, default=catalog_io.IMPORT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            shop = Shop.objects.get(slug=options["shop"])
+        except Shop.DoesNotExist:
+            raise CommandError(f"No existe el comercio {options['shop']!r}")
+        fmt = options["file_format"] or catalog_io.detect_format(options["path"])
+        with open(options["path"], "rb") as fileobj:
+            try:
+                report = catalog_io.import_catalog(shop, fileobj, fmt, options["chunk_size"])
+            except catalog_io.ImportFormatError as exc:
+                raise CommandError(f"{exc} (parcial: {getattr(exc, 'report', None)})")
+        for error in report["errors"]:
+            self.stderr.write(f"fila {error['row']} ({error['sku']}): {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(
+            f"Filas: {report['rows']} · creados: {report['created']} · actualizados: {report['updated']}"
+            f" · con error: {report['error_count']}"
+        )
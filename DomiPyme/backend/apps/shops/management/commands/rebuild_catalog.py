@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.shops import projection
+
+
+class Command(BaseCommand):
+    help = "Regenera completa la proyección de la vitrina (CatalogEntry) desde los productos."
+
+    def handle(self, *args, **options):
+        total = projection.rebuild()
+        self.stdout.write(f"Productos en la vitrina: {total}")
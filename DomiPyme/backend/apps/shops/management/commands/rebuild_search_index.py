@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.shops import search
+
+
+class Command(BaseCommand):
+    help = "Regenera completo el índice de búsqueda de productos (FTS5 / tsvector)."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=2000)
+
+    def handle(self, *args, **options):
+        total = search.rebuild(batch_size=options["batch_size"])
+        self.stdout.write(f"Productos indexados: {total}")
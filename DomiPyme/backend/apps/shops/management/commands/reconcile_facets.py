@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from apps.shops import facets
+
+
+class Command(BaseCommand):
+    help = "Recalcula los contadores de filtros (ShopFacet) desde la vitrina y corrige los desviados."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--shop", type=int, action="append", dest="shops", help="Solo ese comercio (id).")
+
+    def handle(self, *args, **options):
+        fixed = facets.reconcile(options["shops"])
+        self.stdout.write(f"Contadores corregidos: {fixed}")
@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:27
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("shops", "0003_product_reserved"),
+    ]
+
+    operations = [
+        AddIndexOnline(
+            model_name="product",
+            index=models.Index(
+                condition=models.Q(("active", True)),
+                fields=["shop", "-created_at", "-id"],
+                name="shop_product_active_idx",
+            ),
+        ),
+    ]
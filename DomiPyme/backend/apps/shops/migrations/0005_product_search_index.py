@@ -0,0 +1,52 @@
+from django.db import migrations
+
+# Copia fija del DDL y del llenado inicial de apps.shops.search: la migración
+# no debe cambiar si cambia ese módulo
+SQLITE_DDL = [
+    "CREATE VIRTUAL TABLE IF NOT EXISTS shops_product_fts USING fts5("
+    "name, description, sku, category, tokenize = 'unicode61 remove_diacritics 2')",
+    "INSERT INTO shops_product_fts (rowid, name, description, sku, category) "
+    "SELECT p.id, p.name, p.description, coalesce(p.sku, ''), coalesce(c.name, '') "
+    "FROM shops_product p LEFT JOIN shops_category c ON c.id = p.category_id",
+]
+SQLITE_DROP = ["DROP TABLE IF EXISTS shops_product_fts"]
+
+PG_DDL = [
+    "CREATE TABLE IF NOT EXISTS shops_product_search ("
+    "product_id bigint PRIMARY KEY REFERENCES shops_product (id) ON DELETE CASCADE, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS shops_product_search_document_gin ON shops_product_search USING GIN (document)",
+    "INSERT INTO shops_product_search (product_id, document) SELECT p.id, "
+    "setweight(to_tsvector('spanish', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.sku, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(p.description, '')), 'C') "
+    "FROM shops_product p LEFT JOIN shops_category c ON c.id = p.category_id "
+    "ON CONFLICT (product_id) DO NOTHING",
+]
+PG_DROP = ["DROP TABLE IF EXISTS shops_product_search"]
+
+
+def _run(schema_editor, statements):
+    with schema_editor.connection.cursor() as cursor:
+        for statement in statements.get(schema_editor.connection.vendor, []):
+            cursor.execute(statement)
+
+
+def create_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_DDL, "postgresql": PG_DDL})
+
+
+def drop_index(apps, schema_editor):
+    _run(schema_editor, {"sqlite": SQLITE_DROP, "postgresql": PG_DROP})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0004_product_listing_index"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
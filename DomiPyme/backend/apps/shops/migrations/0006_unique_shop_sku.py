@@ -0,0 +1,21 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0005_product_search_index"),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name="product",
+            constraint=models.UniqueConstraint(
+                condition=models.Q(("sku__gt", "")),
+                fields=("shop", "sku"),
+                name="unique_shop_sku",
+            ),
+        ),
+    ]
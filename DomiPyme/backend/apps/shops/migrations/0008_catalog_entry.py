@@ -0,0 +1,89 @@
+# Generated by Django 4.2.30 on 2026-10-18 14:54
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+BATCH_SIZE = 2000
+
+
+def fill(apps, schema_editor):
+    """
+    Llena la proyección con los productos activos. Con los modelos históricos
+    (no apps.shops.projection): la migración no cambia si cambia ese módulo.
+    ShopFacet todavía no existe en este punto; sus contadores los llena 0009.
+    """
+    db = schema_editor.connection.alias
+    Product = apps.get_model("shops", "Product")
+    CatalogEntry = apps.get_model("shops", "CatalogEntry")
+    products = Product.objects.using(db).filter(active=True).select_related("shop", "category").order_by("pk")
+    batch = []
+    for p in products.iterator(chunk_size=BATCH_SIZE):
+        category = p.category.name if p.category_id else None
+        batch.append(CatalogEntry(
+            id=p.pk, shop_id=p.shop_id, shop_slug=p.shop.slug, shop_name=p.shop.name,
+            category_id=p.category_id, category_name=category, name=p.name, sku=p.sku,
+            description=p.description, price=p.price, stock=p.stock, available=p.stock - p.reserved,
+            in_stock=p.stock > p.reserved, search_text=" ".join([p.name, p.sku or "", category or ""]),
+            created_at=p.created_at,
+        ))
+        if len(batch) >= BATCH_SIZE:
+            CatalogEntry.objects.using(db).bulk_create(batch)
+            batch = []
+    CatalogEntry.objects.using(db).bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0006_unique_shop_sku"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CatalogEntry",
+            fields=[
+                ("id", models.BigIntegerField(primary_key=True, serialize=False)),
+                ("shop_slug", models.SlugField(db_index=False)),
+                ("shop_name", models.CharField(max_length=150)),
+                (
+                    "category_id",
+                    models.BigIntegerField(blank=True, db_index=True, null=True),
+                ),
+                (
+                    "category_name",
+                    models.CharField(blank=True, max_length=100, null=True),
+                ),
+                ("name", models.CharField(max_length=200)),
+                ("sku", models.CharField(blank=True, max_length=100, null=True)),
+                ("description", models.TextField(blank=True)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=12)),
+                ("stock", models.IntegerField(default=0)),
+                ("available", models.IntegerField(default=0)),
+                ("in_stock", models.BooleanField(default=False)),
+                ("search_text", models.TextField(blank=True)),
+                ("created_at", models.DateTimeField()),
+                (
+                    "shop",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="shops.shop",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["shop_slug", "-created_at", "-id"],
+                        name="catalog_shop_recent_idx",
+                    ),
+                    models.Index(
+                        fields=["shop_slug", "category_id", "-created_at", "-id"],
+                        name="catalog_shop_category_idx",
+                    ),
+                ],
+            },
+        ),
+        migrations.RunPython(fill, migrations.RunPython.noop),
+    ]
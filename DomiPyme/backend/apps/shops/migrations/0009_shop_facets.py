@@ -0,0 +1,90 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:00
+
+from bisect import bisect_right
+from collections import Counter
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def fill(apps, schema_editor):
+    """
+    Contadores iniciales desde la proyección, con los modelos históricos (no
+    apps.shops.facets: la migración no cambia si cambia ese módulo).
+    """
+    db = schema_editor.connection.alias
+    CatalogEntry = apps.get_model("shops", "CatalogEntry")
+    ShopFacet = apps.get_model("shops", "ShopFacet")
+    counts, labels = Counter(), {}
+    rows = CatalogEntry.objects.using(db).values_list("shop_id", "category_id", "category_name", "in_stock", "price")
+    for shop_id, category_id, category_name, in_stock, price in rows.iterator(chunk_size=2000):
+        counts[(shop_id, "total", "all")] += 1
+        counts[(shop_id, "stock", "in" if in_stock else "out")] += 1
+        counts[(shop_id, "price", str(bisect_right(settings.FACET_PRICE_BUCKETS, price)))] += 1
+        if category_id is not None:
+            key = (shop_id, "category", str(category_id))
+            counts[key] += 1
+            labels[key] = category_name or ""
+    ShopFacet.objects.using(db).bulk_create(
+        [
+            ShopFacet(shop_id=shop_id, facet=facet, value=value, label=labels.get((shop_id, facet, value), ""),
+                      count=count)
+            for (shop_id, facet, value), count in counts.items()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0008_catalog_entry"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ShopFacet",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "facet",
+                    models.CharField(
+                        choices=[
+                            ("total", "Total"),
+                            ("category", "Category"),
+                            ("stock", "Stock"),
+                            ("price", "Price"),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ("value", models.CharField(max_length=50)),
+                ("label", models.CharField(blank=True, max_length=100)),
+                ("count", models.IntegerField(default=0)),
+                (
+                    "shop",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="facets",
+                        to="shops.shop",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="shopfacet",
+            constraint=models.UniqueConstraint(
+                fields=("shop", "facet", "value"), name="shops_facet_shop_facet_value"
+            ),
+        ),
+        migrations.RunPython(fill, migrations.RunPython.noop),
+    ]
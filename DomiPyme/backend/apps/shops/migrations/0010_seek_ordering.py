@@ -0,0 +1,25 @@
+# Generated by Django 4.2.30 on 2026-10-18 15:08
+
+from django.db import migrations, models
+
+from apps.common.operations import AddIndexOnline
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY (Postgres) no puede correr dentro de una transacción
+    atomic = False
+
+    dependencies = [
+        ("shops", "0009_shop_facets"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="shop",
+            options={"ordering": ["-created_at", "-id"]},
+        ),
+        AddIndexOnline(
+            model_name="shop",
+            index=models.Index(fields=["-created_at", "-id"], name="shop_recent_idx"),
+        ),
+    ]
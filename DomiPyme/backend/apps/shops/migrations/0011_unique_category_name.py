@@ -0,0 +1,51 @@
+# Generated by Django 4.2.30 on 2026-10-18 16:09
+
+from django.db import migrations, models
+from django.db.models import Count, Min, Sum
+
+
+def merge_duplicates(apps, schema_editor):
+    """Deja una categoría por (shop, name): la de menor id se queda con los productos de las demás."""
+    db = schema_editor.connection.alias
+    Category = apps.get_model("shops", "Category")
+    Product = apps.get_model("shops", "Product")
+    CatalogEntry = apps.get_model("shops", "CatalogEntry")
+    ShopFacet = apps.get_model("shops", "ShopFacet")
+    groups = (
+        Category.objects.using(db).values("shop_id", "name")
+        .annotate(n=Count("id"), keep=Min("id")).filter(n__gt=1)
+    )
+    for group in groups:
+        shop_id, keep = group["shop_id"], group["keep"]
+        rest = list(
+            Category.objects.using(db).filter(shop_id=shop_id, name=group["name"])
+            .exclude(pk=keep).values_list("pk", flat=True)
+        )
+        Product.objects.using(db).filter(category_id__in=rest).update(category_id=keep)
+        CatalogEntry.objects.using(db).filter(category_id__in=rest).update(category_id=keep)
+        facets = ShopFacet.objects.using(db).filter(shop_id=shop_id, facet="category", value__in=[str(pk) for pk in rest])
+        moved = facets.aggregate(total=Sum("count"))["total"] or 0
+        facets.delete()
+        if moved:
+            row, _ = ShopFacet.objects.using(db).get_or_create(
+                shop_id=shop_id, facet="category", value=str(keep), defaults={"label": group["name"]}
+            )
+            ShopFacet.objects.using(db).filter(pk=row.pk).update(count=models.F("count") + moved)
+        Category.objects.using(db).filter(pk__in=rest).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("shops", "0010_seek_ordering"),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_duplicates, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(
+                fields=("shop", "name"), name="unique_shop_category_name"
+            ),
+        ),
+    ]
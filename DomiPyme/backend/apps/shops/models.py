@@ -1,11 +1,17 @@
 from django.db import models
 from django.conf import settings
 from django.utils import timezone
-from django.utils.text import slugify
 from django.core.validators import MinValueValidator
 
+from apps.common.slugs import save_with_slug
+
 User = settings.AUTH_USER_MODEL
 
+# La vitrina vive en /api/<slug>/: estos slugs chocarían con otras rutas de /api/
+RESERVED_SHOP_SLUGS = frozenset({
+    "auth", "products", "checkout", "cart", "orders", "merchant", "payments", "search",
+})
+
 class Shop(models.Model):
     owner = models.ForeignKey(settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="shops")
     name = models.CharField(max_length=150)
@@ -16,26 +22,26 @@ class Shop(models.Model):
     created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
-        ordering = ["-created_at"]
+        # Mismo orden que el cursor de HybridPagination (apps.common.pagination)
+        ordering = ["-created_at", "-id"]
+        indexes = [models.Index(fields=["-created_at", "-id"], name="shop_recent_idx")]
 
     def __str__(self):
         return self.name
 
     def save(self, *args, **kwargs):
-        if not self.slug:
-            base = slugify(self.name)[:50]
-            slug = base
-            count = 1
-            while Shop.objects.filter(slug=slug).exists():
-                slug = f"{base}-{count}"
-                count += 1
-            self.slug = slug
-        super().save(*args, **kwargs)
+        save_with_slug(self, lambda: super(Shop, self).save(*args, **kwargs), reserved=RESERVED_SHOP_SLUGS)
 
 class Category(models.Model):
     shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="categories")
     name = models.CharField(max_length=100)
 
+    class Meta:
+        constraints = [
+            # El import de catálogo crea categorías por nombre (ignore_conflicts)
+            models.UniqueConstraint(fields=["shop", "name"], name="unique_shop_category_name"),
+        ]
+
     def __str__(self):
         return f"{self.shop.name} - {self.name}"
 
@@ -47,8 +53,97 @@ class Product(models.Model):
     description = models.TextField(blank=True)
     price = models.DecimalField(max_digits=12, decimal_places=2, validators=[MinValueValidator(0)])
     stock = models.IntegerField(default=0)
+    # Unidades apartadas por órdenes pendientes de pago (ver apps.orders.reservations)
+    reserved = models.IntegerField(default=0)
     active = models.BooleanField(default=True)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # Vitrina del comercio: activos, más nuevos primero (keyset por created_at, id).
+            # Parcial: `active` sin `= 1` (así lo compila el ORM) no sirve como
+            # columna de igualdad de un índice compuesto en SQLite
+            models.Index(
+                fields=["shop", "-created_at", "-id"], name="shop_product_active_idx", condition=models.Q(active=True)
+            ),
+        ]
+        constraints = [
+            # Clave del import de catálogo (upsert por comercio + SKU)
+            models.UniqueConstraint(
+                fields=["shop", "sku"], condition=models.Q(sku__gt=""), name="unique_shop_sku",
+            ),
+        ]
+
     def __str__(self):
         return self.name
+
+    @property
+    def available(self):
+        return self.stock - self.reserved
+
+
+class CatalogEntry(models.Model):
+    """
+    Proyección desnormalizada de la vitrina: una fila por producto activo con
+    lo que muestran los listados (comercio, categoría, precio, stock), para
+    leer sin joins. No se escribe a mano: la mantiene `apps.shops.projection`
+    desde las señales de Product/Shop/Category y `products_changed`;
+    `rebuild_catalog` la regenera completa.
+    """
+    # Mismo id que el Product (sin FK: la fila vive y muere con las señales)
+    id = models.BigIntegerField(primary_key=True)
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="+")
+    shop_slug = models.SlugField(db_index=False)
+    shop_name = models.CharField(max_length=150)
+    category_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    category_name = models.CharField(max_length=100, null=True, blank=True)
+    name = models.CharField(max_length=200)
+    sku = models.CharField(max_length=100, blank=True, null=True)
+    description = models.TextField(blank=True)
+    price = models.DecimalField(max_digits=12, decimal_places=2)
+    stock = models.IntegerField(default=0)
+    available = models.IntegerField(default=0)
+    in_stock = models.BooleanField(default=False)
+    # nombre + sku + categoría, para el filtro `q` (icontains)
+    search_text = models.TextField(blank=True)
+    created_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["shop_slug", "-created_at", "-id"], name="catalog_shop_recent_idx"),
+            models.Index(
+                fields=["shop_slug", "category_id", "-created_at", "-id"], name="catalog_shop_category_idx"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.shop_slug}: {self.name}"
+
+
+class ShopFacet(models.Model):
+    """
+    Contador de un filtro de la vitrina de un comercio (productos activos por
+    categoría, con/sin stock, por rango de precio, y el total). Lo mantiene
+    `apps.shops.facets` con los cambios de CatalogEntry; `reconcile_facets`
+    corrige desvíos.
+    """
+    FACET_CHOICES = [
+        ("total", "Total"),
+        ("category", "Category"),
+        ("stock", "Stock"),
+        ("price", "Price"),
+    ]
+    shop = models.ForeignKey(Shop, on_delete=models.CASCADE, related_name="facets")
+    facet = models.CharField(max_length=20, choices=FACET_CHOICES)
+    # id de categoría, "in"/"out" para stock, índice del rango de precio, "all"
+    value = models.CharField(max_length=50)
+    label = models.CharField(max_length=100, blank=True)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=["shop", "facet", "value"], name="shops_facet_shop_facet_value"),
+        ]
+
+    def __str__(self):
+        return f"{self.shop_id}:{self.facet}:{self.value}={self.count}"
@@ -0,0 +1,172 @@
+# backend/apps/shops/projection.py
+"""
+Mantenimiento de `CatalogEntry`, la proyección de lectura de la vitrina.
+
+Las escrituras pasan por Product/Shop/Category; las señales de
+`apps.shops.signals` llaman a estas funciones dentro de la misma transacción,
+así que la proyección nunca queda adelantada ni atrasada respecto al commit:
+
+- `refresh(ids)`: un INSERT ... SELECT ... ON CONFLICT DO UPDATE por lote de
+  ids (la BD arma las filas con el join a comercio y categoría) y un DELETE
+  de los que ya no están activos o no existen. Dos sentencias por lote sin
+  importar cuántas filas.
+- `refresh_stock(ids)`: solo stock/disponible, con un UPDATE ... FROM (es lo
+  que cambia en cada checkout).
+- `update_shop(shop)`: renombres de comercio, un UPDATE por comercio.
+- `rebuild()`: regenera todo (comando `rebuild_catalog`).
+
+Las escrituras por producto corren dentro de `facets.tracking(ids)`, que
+traslada la diferencia a los contadores de ShopFacet; `refresh_stock` solo
+ajusta la faceta de stock de las filas que cruzan el cero.
+
+En motores sin ON CONFLICT / UPDATE FROM cae a bulk_create / refresh.
+"""
+from django.db import connection, transaction
+
+from apps.common.bulk import supports_update_from
+from . import facets
+from .models import CatalogEntry, Product
+
+BATCH_SIZE = 500
+COLUMNS = (
+    "id", "shop_id", "shop_slug", "shop_name", "category_id", "category_name", "name", "sku",
+    "description", "price", "stock", "available", "in_stock", "search_text", "created_at",
+)
+SELECT = (
+    "p.id, p.shop_id, s.slug, s.name, p.category_id, c.name, p.name, p.sku, p.description, p.price, "
+    "p.stock, p.stock - p.reserved, (p.stock > p.reserved), "
+    "p.name || ' ' || coalesce(p.sku, '') || ' ' || coalesce(c.name, ''), p.created_at "
+    "FROM shops_product p JOIN shops_shop s ON s.id = p.shop_id "
+    "LEFT JOIN shops_category c ON c.id = p.category_id"
+)
+
+
+def search_text(name, sku=None, category_name=None):
+    """Lo mismo que arma SELECT: el filtro `q` busca con icontains sobre esto."""
+    return " ".join([name, sku or "", category_name or ""])
+
+
+def supported(vendor=None):
+    return (vendor or connection.vendor) in ("sqlite", "postgresql")
+
+
+def _batches(ids):
+    ids = list(dict.fromkeys(ids))
+    for start in range(0, len(ids), BATCH_SIZE):
+        yield ids[start:start + BATCH_SIZE]
+
+
+def _placeholders(ids):
+    return ", ".join(["%s"] * len(ids))
+
+
+def _write(cursor, ids):
+    """Upsert de los productos activos de `ids` (None = todos)."""
+    table = CatalogEntry._meta.db_table
+    where, params = "WHERE p.active", []
+    if ids is not None:
+        where += f" AND p.id IN ({_placeholders(ids)})"
+        params = list(ids)
+    updates = ", ".join(f"{col} = excluded.{col}" for col in COLUMNS[1:])
+    cursor.execute(
+        f"INSERT INTO {table} ({', '.join(COLUMNS)}) SELECT {SELECT} {where} "
+        f"ON CONFLICT (id) DO UPDATE SET {updates}",
+        params,
+    )
+
+
+def refresh(product_ids):
+    """Sincroniza las filas de esos productos con la tabla de productos."""
+    product_ids = list(product_ids)
+    with facets.tracking(product_ids):
+        _refresh(product_ids)
+
+
+def _refresh(product_ids):
+    if not supported():
+        return _refresh_orm(product_ids)
+    table, product = CatalogEntry._meta.db_table, Product._meta.db_table
+    with connection.cursor() as cursor:
+        for ids in _batches(product_ids):
+            _write(cursor, ids)
+            marks = _placeholders(ids)
+            cursor.execute(
+                f"DELETE FROM {table} WHERE id IN ({marks}) "
+                f"AND id NOT IN (SELECT p.id FROM {product} p WHERE p.active AND p.id IN ({marks}))",
+                ids + ids,
+            )
+
+
+def _refresh_orm(product_ids):
+    for ids in _batches(product_ids):
+        products = Product.objects.filter(pk__in=ids, active=True).select_related("shop", "category")
+        entries = [
+            CatalogEntry(
+                id=p.pk, shop_id=p.shop_id, shop_slug=p.shop.slug, shop_name=p.shop.name,
+                category_id=p.category_id, category_name=p.category.name if p.category else None,
+                name=p.name, sku=p.sku, description=p.description, price=p.price, stock=p.stock,
+                available=p.available, in_stock=p.available > 0, created_at=p.created_at,
+                search_text=search_text(p.name, p.sku, p.category.name if p.category else None),
+            )
+            for p in products
+        ]
+        CatalogEntry.objects.bulk_create(
+            entries, update_conflicts=True, unique_fields=["id"], update_fields=list(COLUMNS[1:]),
+        )
+        present = {entry.id for entry in entries}
+        CatalogEntry.objects.filter(pk__in=[pk for pk in ids if pk not in present]).delete()
+
+
+def refresh_stock(product_ids):
+    """Solo stock / disponible / in_stock. Una sentencia por lote."""
+    if not supports_update_from(connection):
+        return refresh(product_ids)
+    table, product = CatalogEntry._meta.db_table, Product._meta.db_table
+    with connection.cursor() as cursor:
+        for ids in _batches(product_ids):
+            # Solo la faceta `stock` puede cambiar: basta con ver qué filas
+            # cruzan el cero antes de escribirlas
+            cursor.execute(
+                f"SELECT c.shop_id, (p.stock > p.reserved) FROM {table} c JOIN {product} p ON p.id = c.id "
+                f"WHERE c.id IN ({_placeholders(ids)}) AND c.in_stock <> (p.stock > p.reserved)",
+                ids,
+            )
+            facets.apply(facets.stock_flips(cursor.fetchall()))
+            cursor.execute(
+                f"UPDATE {table} SET stock = p.stock, available = p.stock - p.reserved, "
+                f"in_stock = (p.stock > p.reserved) FROM {product} p "
+                f"WHERE p.id = {table}.id AND {table}.id IN ({_placeholders(ids)})",
+                ids,
+            )
+
+
+def remove(product_ids):
+    product_ids = list(product_ids)
+    with facets.tracking(product_ids):
+        for ids in _batches(product_ids):
+            CatalogEntry.objects.filter(pk__in=ids).delete()
+
+
+def update_shop(shop):
+    CatalogEntry.objects.filter(shop_id=shop.pk).exclude(shop_slug=shop.slug, shop_name=shop.name).update(
+        shop_slug=shop.slug, shop_name=shop.name,
+    )
+
+
+def refresh_category(category_id):
+    """Productos que la proyección tiene en esa categoría (renombrada o borrada)."""
+    refresh(list(CatalogEntry.objects.filter(category_id=category_id).values_list("pk", flat=True)))
+
+
+@transaction.atomic
+def rebuild(reconcile_facets=True):
+    """Regenera la proyección completa (y sus facetas). Retorna cuántas filas quedaron."""
+    CatalogEntry.objects.all().delete()
+    if not supported():
+        _refresh_orm(Product.objects.filter(active=True).values_list("pk", flat=True))
+    else:
+        with connection.cursor() as cursor:
+            _write(cursor, None)
+    if reconcile_facets:
+        facets.reconcile()
+    return CatalogEntry.objects.count()
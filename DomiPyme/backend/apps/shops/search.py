@@ -0,0 +1,201 @@
+# backend/apps/shops/search.py
+"""
+Búsqueda de productos con índice de texto completo (nombre, descripción, SKU y
+nombre de categoría).
+
+- SQLite: tabla virtual FTS5 `shops_product_fts` (rowid = id del producto),
+  ranking bm25 con pesos por columna.
+- Postgres: tabla `shops_product_search` con un tsvector ponderado (A/B/C) y
+  un índice GIN, ranking ts_rank.
+
+Las tablas (y su llenado inicial) las crea la migración 0005, con su propia
+copia del DDL. El índice se mantiene por producto:
+`reindex(ids)` reescribe solo esas filas con un INSERT ... SELECT desde
+shops_product (las señales de `signals.py` lo llaman al guardar/borrar productos o renombrar
+categorías). `rebuild()` lo regenera completo por lotes.
+"""
+import re
+
+from django.db import connection
+
+# Campos de Product que alimentan el índice; cambios en otros (stock, reserved,
+# price...) no requieren reindexar
+INDEXED_FIELDS = frozenset({"name", "description", "sku", "category", "category_id"})
+MAX_TERMS = 10
+
+FTS_TABLE = "shops_product_fts"
+PG_TABLE = "shops_product_search"
+
+SOURCE = (
+    "FROM shops_product p LEFT JOIN shops_category c ON c.id = p.category_id"
+)
+PG_DOCUMENT = (
+    "setweight(to_tsvector('spanish', coalesce(p.name, '')), 'A') || "
+    "setweight(to_tsvector('simple', coalesce(p.sku, '')), 'A') || "
+    "setweight(to_tsvector('spanish', coalesce(c.name, '')), 'B') || "
+    "setweight(to_tsvector('spanish', coalesce(p.description, '')), 'C')"
+)
+
+
+def supported(vendor=None):
+    return (vendor or connection.vendor) in ("sqlite", "postgresql")
+
+
+def _id_filter(ids, column):
+    if ids is None:
+        return "", []
+    return f" WHERE {column} IN ({', '.join(['%s'] * len(ids))})", list(ids)
+
+
+def _write(cursor, ids):
+    """Reescribe las filas del índice de `ids` (None = todos)."""
+    if connection.vendor == "sqlite":
+        where, params = _id_filter(ids, "rowid")
+        cursor.execute(f"DELETE FROM {FTS_TABLE}{where}", params)
+        where, params = _id_filter(ids, "p.id")
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} (rowid, name, description, sku, category) "
+            f"SELECT p.id, p.name, p.description, coalesce(p.sku, ''), coalesce(c.name, '') {SOURCE}{where}",
+            params,
+        )
+    else:
+        where, params = _id_filter(ids, "p.id")
+        cursor.execute(
+            f"INSERT INTO {PG_TABLE} (product_id, document) SELECT p.id, {PG_DOCUMENT} {SOURCE}{where} "
+            "ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+            params,
+        )
+
+
+def reindex(product_ids):
+    """Actualiza el índice de esos productos (los que ya no existen se quitan)."""
+    ids = list(dict.fromkeys(product_ids))
+    if not ids or not supported():
+        return
+    with connection.cursor() as cursor:
+        _write(cursor, ids)
+        if connection.vendor == "postgresql":
+            # Los borrados ya los quita el ON DELETE CASCADE; esto cubre ids
+            # que nunca llegaron a existir
+            cursor.execute(
+                f"DELETE FROM {PG_TABLE} WHERE product_id = ANY(%s) "
+                "AND NOT EXISTS (SELECT 1 FROM shops_product p WHERE p.id = product_id)",
+                [ids],
+            )
+
+
+def remove(product_ids):
+    ids = list(product_ids)
+    if not ids or not supported():
+        return
+    column, table = ("rowid", FTS_TABLE) if connection.vendor == "sqlite" else ("product_id", PG_TABLE)
+    where, params = _id_filter(ids, column)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {table}{where}", params)
+
+
+def rebuild(batch_size=2000):
+    """Regenera todo el índice por lotes de ids. Retorna cuántos productos indexó."""
+    from .models import Product
+
+    if not supported():
+        return 0
+    with connection.cursor() as cursor:
+        if connection.vendor == "sqlite":
+            cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        else:
+            cursor.execute(f"TRUNCATE {PG_TABLE}")
+    total, last = 0, 0
+    while True:
+        ids = list(
+            Product.objects.filter(pk__gt=last).order_by("pk").values_list("pk", flat=True)[:batch_size]
+        )
+        if not ids:
+            return total
+        with connection.cursor() as cursor:
+            _write(cursor, ids)
+        total += len(ids)
+        last = ids[-1]
+
+
+def terms(query):
+    """Palabras de la búsqueda (solo alfanuméricos: nada de sintaxis FTS del usuario)."""
+    return re.findall(r"[^\W_]+", (query or "").lower())[:MAX_TERMS]
+
+
+def _filters(shop=None, category=None, min_price=None, max_price=None):
+    sql, params = ["p.active"], []
+    if shop is not None:
+        sql.append("p.shop_id = (SELECT s.id FROM shops_shop s WHERE s.slug = %s)")
+        params.append(shop)
+    if category is not None:
+        sql.append("p.category_id = %s")
+        params.append(category)
+    if min_price is not None:
+        sql.append("p.price >= %s")
+        params.append(min_price)
+    if max_price is not None:
+        sql.append("p.price <= %s")
+        params.append(max_price)
+    return " AND ".join(sql), params
+
+
+def search(query, limit=20, offset=0, **filters):
+    """
+    Busca productos activos cuyo texto contenga todas las palabras (como
+    prefijo, para buscar mientras se escribe). Retorna [(product_id, score)]
+    de mayor a menor relevancia. Una sola query contra el índice.
+    """
+    words = terms(query)
+    if not words:
+        return []
+    where, params = _filters(**filters)
+    vendor = connection.vendor
+    if vendor == "sqlite":
+        match = " ".join(f'"{w}"*' for w in words)
+        sql = (
+            f"SELECT p.id, -bm25({FTS_TABLE}, 10.0, 1.0, 8.0, 4.0) AS score "
+            f"FROM {FTS_TABLE} JOIN shops_product p ON p.id = {FTS_TABLE}.rowid "
+            f"WHERE {FTS_TABLE} MATCH %s AND {where} "
+            "ORDER BY score DESC, p.id DESC LIMIT %s OFFSET %s"
+        )
+        params = [match, *params, limit, offset]
+    elif vendor == "postgresql":
+        tsquery = " & ".join(f"{w}:*" for w in words)
+        sql = (
+            "SELECT p.id, ts_rank(i.document, q.query) AS score "
+            f"FROM {PG_TABLE} i JOIN shops_product p ON p.id = i.product_id, "
+            "to_tsquery('spanish', %s) AS q(query) "
+            f"WHERE i.document @@ q.query AND {where} "
+            "ORDER BY score DESC, p.id DESC LIMIT %s OFFSET %s"
+        )
+        params = [tsquery, *params, limit, offset]
+    else:
+        return _fallback_search(words, limit, offset, **filters)
+    with connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return [(pk, float(score)) for pk, score in cursor.fetchall()]
+
+
+def _fallback_search(words, limit, offset, shop=None, category=None, min_price=None, max_price=None):
+    """Motores sin índice de texto: icontains (recorre la tabla)."""
+    from django.db.models import Q
+
+    from .models import Product
+
+    qs = Product.objects.filter(active=True)
+    for word in words:
+        qs = qs.filter(
+            Q(name__icontains=word) | Q(description__icontains=word)
+            | Q(sku__icontains=word) | Q(category__name__icontains=word)
+        )
+    if shop is not None:
+        qs = qs.filter(shop__slug=shop)
+    if category is not None:
+        qs = qs.filter(category_id=category)
+    if min_price is not None:
+        qs = qs.filter(price__gte=min_price)
+    if max_price is not None:
+        qs = qs.filter(price__lte=max_price)
+    ids = qs.order_by("-id").values_list("pk", flat=True)[offset:offset + limit]
+    return [(pk, 0.0) for pk in ids]
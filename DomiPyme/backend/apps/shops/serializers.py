@@ -1,18 +1,79 @@
+from django.conf import settings
+from django.urls import reverse
 from rest_framework import serializers
-from .models import Shop, Product, Category
+from rest_framework.utils.urls import replace_query_param
+
+from apps.common.pagination import KeysetPagination
+from .models import RESERVED_SHOP_SLUGS, CatalogEntry, Shop, Product, Category
+
+
+class ShopProductPagination(KeysetPagination):
+    """Páginas de productos de un comercio: más nuevos primero."""
+
+    @property
+    def page_size(self):
+        return settings.SHOP_DETAIL_PRODUCTS
+
+
+def active_products():
+    """Productos visibles en la vitrina, en el orden de `ShopProductPagination`."""
+    return Product.objects.filter(active=True).order_by(*ShopProductPagination.ordering)
+
+
+def catalog_entries(slug):
+    """Filas de la proyección de un comercio, en el orden de `ShopProductPagination`."""
+    return CatalogEntry.objects.filter(shop_slug=slug).order_by(*ShopProductPagination.ordering)
+
 
 class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
         fields = ("id", "name", "price", "stock", "description")
 
+class CatalogEntrySerializer(serializers.ModelSerializer):
+    """Producto de la vitrina leído de la proyección; misma salida que ProductSerializer."""
+
+    class Meta:
+        model = CatalogEntry
+        fields = ProductSerializer.Meta.fields
+
+class ProductSearchResultSerializer(serializers.ModelSerializer):
+    shop_slug = serializers.CharField(source="shop.slug", read_only=True)
+    shop_name = serializers.CharField(source="shop.name", read_only=True)
+    category_name = serializers.CharField(source="category.name", default=None, read_only=True)
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Product
+        fields = ("id", "name", "sku", "price", "stock", "shop_slug", "shop_name", "category_name", "score")
+
+class CatalogSearchResultSerializer(serializers.ModelSerializer):
+    """Resultado de búsqueda desde la proyección (sin joins); misma salida que el de arriba."""
+    score = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = CatalogEntry
+        fields = ProductSearchResultSerializer.Meta.fields
+
 class ShopSerializer(serializers.ModelSerializer):
     class Meta:
         model = Shop
         fields = ("id", "name", "slug", "description")
 
-class ShopDetailSerializer(serializers.ModelSerializer):
-    products = ProductSerializer(many=True, read_only=True)
-    class Meta:
-        model = Shop
-        fields = ("id", "name", "slug", "description", "products")
+    def validate_slug(self, value):
+        if value in RESERVED_SHOP_SLUGS:
+            raise serializers.ValidationError("Este slug está reservado.")
+        return value
+
+def products_next_url(slug, rows, request=None):
+    """
+    URL de la segunda página de productos si `rows` (la primera página + 1,
+    filas de .values()) trae más de SHOP_DETAIL_PRODUCTS.
+    """
+    if len(rows) <= settings.SHOP_DETAIL_PRODUCTS:
+        return None
+    url = reverse("shops-products", kwargs={"slug": slug})
+    if request is not None:
+        url = request.build_absolute_uri(url)
+    cursor = ShopProductPagination().cursor_for(rows[settings.SHOP_DETAIL_PRODUCTS - 1])
+    return replace_query_param(url, ShopProductPagination.cursor_query_param, cursor)
@@ -0,0 +1,156 @@
+# backend/apps/shops/signals.py
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import Signal, receiver
+
+from apps.common import response_cache
+from . import facets, projection, search, snapshots
+from .models import Category, Product, Shop
+
+# Enviada por código que modifica productos sin pasar por save() (UPDATE
+# masivos, bulk_create/bulk_update). Argumentos: product_ids y, opcional,
+# fields (columnas tocadas; None = cualquiera).
+products_changed = Signal()
+
+
+# Cambios que no invalidan las respuestas cacheadas del catálogo (pasan en
+# cada checkout); el TTL de CATALOG_CACHE_TTL acota cuánto se ven viejos
+STOCK_FIELDS = frozenset({"stock", "reserved"})
+
+
+def touches_search(fields):
+    return fields is None or bool(search.INDEXED_FIELDS.intersection(fields))
+
+
+def touches_catalog(fields):
+    return fields is None or not STOCK_FIELDS.issuperset(fields)
+
+
+def shop_scope(slug):
+    return f"shop:{slug}"
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Product)
+def invalidate_product_snapshot(sender, instance, **kwargs):
+    snapshots.invalidate([instance.pk])
+
+
+@receiver(post_save, sender=Shop)
+def invalidate_shop_snapshots(sender, instance, created, **kwargs):
+    if not created:
+        snapshots.invalidate(list(instance.products.values_list("pk", flat=True)))
+
+
+@receiver(products_changed)
+def invalidate_changed_snapshots(sender, product_ids, **kwargs):
+    snapshots.invalidate(product_ids)
+
+
+@receiver(post_save, sender=Product)
+def index_product(sender, instance, update_fields=None, **kwargs):
+    if touches_search(update_fields):
+        search.reindex([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unindex_product(sender, instance, **kwargs):
+    search.remove([instance.pk])
+
+
+@receiver(post_save, sender=Category)
+def index_category_products(sender, instance, created, **kwargs):
+    if not created:
+        search.reindex(list(instance.products.values_list("pk", flat=True)))
+
+
+@receiver(pre_delete, sender=Category)
+def remember_category_products(sender, instance, **kwargs):
+    # Borrar la categoría deja sus productos en NULL con un UPDATE (SET_NULL)
+    # que no dispara señales de Product: se reindexan en post_delete
+    instance._product_ids = list(instance.products.values_list("pk", flat=True))
+
+
+@receiver(post_delete, sender=Category)
+def index_uncategorized_products(sender, instance, **kwargs):
+    search.reindex(getattr(instance, "_product_ids", []))
+
+
+@receiver(products_changed)
+def index_changed_products(sender, product_ids, fields=None, **kwargs):
+    if touches_search(fields):
+        search.reindex(product_ids)
+
+
+@receiver(pre_save, sender=Shop)
+def remember_old_slug(sender, instance, **kwargs):
+    instance._old_slug = None
+    if instance.pk is not None:
+        instance._old_slug = Shop.objects.filter(pk=instance.pk).values_list("slug", flat=True).first()
+
+
+@receiver(post_save, sender=Shop)
+@receiver(post_delete, sender=Shop)
+def bump_shop_cache(sender, instance, **kwargs):
+    scopes = {"shops", shop_scope(instance.slug)}
+    if getattr(instance, "_old_slug", None):
+        scopes.add(shop_scope(instance._old_slug))
+    response_cache.bump(scopes)
+
+
+@receiver(post_save, sender=Product)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Product)
+def bump_product_shop_cache(sender, instance, update_fields=None, **kwargs):
+    if touches_catalog(update_fields):
+        slugs = Shop.objects.filter(pk=instance.shop_id).values_list("slug", flat=True)
+        response_cache.bump(shop_scope(slug) for slug in slugs)
+
+
+@receiver(products_changed)
+def bump_changed_shops_cache(sender, product_ids, fields=None, **kwargs):
+    if product_ids and touches_catalog(fields):
+        slugs = Shop.objects.filter(products__pk__in=list(product_ids)).values_list("slug", flat=True).distinct()
+        response_cache.bump(shop_scope(slug) for slug in slugs)
+
+
+# --- proyección de la vitrina (CatalogEntry) ------------------------------------
+
+def stock_only(fields):
+    return fields is not None and STOCK_FIELDS.issuperset(fields)
+
+
+@receiver(post_save, sender=Product)
+def project_product(sender, instance, update_fields=None, **kwargs):
+    if stock_only(update_fields):
+        projection.refresh_stock([instance.pk])
+    else:
+        projection.refresh([instance.pk])
+
+
+@receiver(post_delete, sender=Product)
+def unproject_product(sender, instance, **kwargs):
+    projection.remove([instance.pk])
+
+
+@receiver(products_changed)
+def project_changed_products(sender, product_ids, fields=None, **kwargs):
+    if stock_only(fields):
+        projection.refresh_stock(product_ids)
+    else:
+        projection.refresh(product_ids)
+
+
+@receiver(post_save, sender=Shop)
+def project_shop(sender, instance, created, **kwargs):
+    if not created:
+        projection.update_shop(instance)
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def project_category(sender, instance, created=False, **kwargs):
+    if not created:
+        projection.refresh_category(instance.pk)
+        if kwargs["signal"] is post_save:
+            facets.rename_category(instance)
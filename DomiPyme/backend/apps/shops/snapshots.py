@@ -0,0 +1,56 @@
+# backend/apps/shops/snapshots.py
+"""
+Cache corto de precio/stock por producto para lecturas de alta frecuencia
+(cotización del carrito). Una entrada por producto; los faltantes se cargan
+todos juntos con una sola query. Se invalida desde `apps.shops.signals`.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Product
+
+KEY_PREFIX = "shops:product-snapshot:"
+
+
+def _key(pk):
+    return f"{KEY_PREFIX}{pk}"
+
+
+def load_snapshots(product_ids):
+    """{product_id: snapshot}; los ids inexistentes no aparecen."""
+    ids = list(dict.fromkeys(product_ids))
+    cached = cache.get_many([_key(pk) for pk in ids])
+    found = {pk: cached[_key(pk)] for pk in ids if _key(pk) in cached}
+    missing = [pk for pk in ids if pk not in found]
+    if missing:
+        rows = Product.objects.filter(pk__in=missing).values(
+            "id", "name", "price", "stock", "reserved", "active", "shop_id", "shop__name"
+        )
+        fresh = {
+            row["id"]: {
+                "id": row["id"],
+                "name": row["name"],
+                "price": row["price"],
+                "available": max(row["stock"] - row["reserved"], 0),
+                "active": row["active"],
+                "shop_id": row["shop_id"],
+                "shop_name": row["shop__name"],
+            }
+            for row in rows
+        }
+        cache.set_many({_key(pk): snap for pk, snap in fresh.items()}, timeout=settings.PRODUCT_SNAPSHOT_TTL)
+        found.update(fresh)
+    return found
+
+
+def invalidate(product_ids):
+    """
+    Borra las entradas ahora y de nuevo al hacer commit, para que una lectura
+    concurrente no deje en cache el valor previo a la transacción.
+    """
+    keys = [_key(pk) for pk in product_ids]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
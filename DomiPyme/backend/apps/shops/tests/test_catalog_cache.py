@@ -0,0 +1,100 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.accounts import tokens
+from apps.products.models import Product as CatalogProduct
+from apps.shops.models import Category, Product, Shop
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shops(db):
+    owner = User.objects.create_user(email="cache@test.com", password="pass1234")
+    a = Shop.objects.create(owner=owner, name="A", slug="cache-a")
+    b = Shop.objects.create(owner=owner, name="B", slug="cache-b")
+    pa = Product.objects.create(shop=a, name="Pan", price=1000, stock=5)
+    Product.objects.create(shop=b, name="Leche", price=3000, stock=5)
+    return a, b, pa
+
+
+def _get(url, **headers):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = APIClient().get(url, HTTP_ACCEPT="application/json", **headers)
+    return resp, len(ctx.captured_queries)
+
+
+def test_hit_and_304_skip_the_database(shops):
+    a, b, pa = shops
+    url = reverse("shops-detail", args=[a.slug])
+    first, _ = _get(url)
+    assert first["X-Cache"] == "MISS"
+    etag = first["ETag"]
+
+    resp, queries = _get(url)
+    assert resp["X-Cache"] == "HIT" and queries == 0
+    assert resp.content == first.content and resp["ETag"] == etag
+
+    resp, queries = _get(url, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 304 and queries == 0 and resp.content == b""
+
+
+def test_changes_bump_only_their_shop(shops):
+    a, b, pa = shops
+    url_a, url_b = reverse("shops-detail", args=[a.slug]), reverse("shops-detail", args=[b.slug])
+    etag = _get(url_a)[0]["ETag"]
+    _get(url_b)
+
+    pa.name = "Pan integral"
+    pa.save()
+    resp, _ = _get(url_a, HTTP_IF_NONE_MATCH=etag)
+    assert resp.status_code == 200 and resp["X-Cache"] == "MISS" and b"Pan integral" in resp.content
+    assert _get(url_b)[0]["X-Cache"] == "HIT"
+
+    # stock/reservas no invalidan (se ven al vencer CATALOG_CACHE_TTL)
+    pa.stock = 1
+    pa.save(update_fields=["stock"])
+    assert _get(url_a)[0]["X-Cache"] == "HIT"
+
+    Category.objects.create(shop=a, name="Panadería")
+    assert _get(url_a)[0]["X-Cache"] == "MISS"
+
+
+def test_list_endpoints_and_slug_rename(shops):
+    a, b, pa = shops
+    shops_url = reverse("shops-list-create")
+    _get(shops_url)
+    old_url = reverse("shops-detail", args=[a.slug])
+    _get(old_url)
+
+    a.slug = "cache-a2"
+    a.save()
+    assert _get(shops_url)[0]["X-Cache"] == "MISS"
+    assert _get(old_url)[0].status_code == 404
+
+    products_url = reverse("product-list")
+    _get(products_url)
+    assert _get(products_url)[0]["X-Cache"] == "HIT"
+    CatalogProduct.objects.create(name="Nuevo", price=10)
+    resp, _ = _get(products_url)
+    assert resp["X-Cache"] == "MISS" and b"Nuevo" in resp.content
+
+
+def test_cache_key_includes_host_and_bad_tokens_still_get_401(shops, settings):
+    settings.ALLOWED_HOSTS = ["backend", "testserver"]
+    a, b, pa = shops
+    url = reverse("shops-list-create") + "?limit=1"
+    first = APIClient().get(url, HTTP_ACCEPT="application/json", HTTP_HOST="backend:8000")
+    assert first["X-Cache"] == "MISS" and first.json()["next"].startswith("http://backend:8000/")
+    resp = APIClient().get(url, HTTP_ACCEPT="application/json", HTTP_HOST="testserver")
+    assert resp["X-Cache"] == "MISS" and "backend:8000" not in resp.content.decode()
+    assert _get(url)[0]["X-Cache"] == "HIT"
+
+    assert _get(url, HTTP_AUTHORIZATION="Bearer basura")[0].status_code == 401
+    user = User.objects.get(email="cache@test.com")
+    token = str(tokens.for_user(user).access_token)
+    assert _get(url, HTTP_AUTHORIZATION=f"Bearer {token}")[0]["X-Cache"] == "HIT"
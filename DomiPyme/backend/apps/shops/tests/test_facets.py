@@ -0,0 +1,124 @@
+from io import StringIO
+from unittest import mock
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.reservations import reserve
+from apps.shops import facets
+from apps.shops.models import Category, Product, Shop, ShopFacet
+from apps.shops.signals import products_changed
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shop(db, settings):
+    settings.FACET_PRICE_BUCKETS = [10000, 50000]
+    owner = User.objects.create_user(email="facetas@test.com", password="pass1234")
+    return Shop.objects.create(owner=owner, name="Tienda Facetas", slug="tienda-facetas")
+
+
+def counters(shop):
+    return {
+        (facet, value): count
+        for facet, value, count in ShopFacet.objects.filter(shop=shop, count__gt=0).values_list("facet", "value", "count")
+    }
+
+
+def test_counters_follow_product_changes(shop):
+    bebidas = Category.objects.create(shop=shop, name="Bebidas")
+    cafe = Product.objects.create(shop=shop, category=bebidas, name="Café", price=5000, stock=2)
+    Product.objects.create(shop=shop, name="Molino", price=80000, stock=0)
+    assert counters(shop) == {
+        ("total", "all"): 2, ("stock", "in"): 1, ("stock", "out"): 1,
+        ("price", "0"): 1, ("price", "2"): 1, ("category", str(bebidas.pk)): 1,
+    }
+
+    cafe.price = 20000
+    cafe.category = None
+    cafe.save()
+    assert counters(shop)[("price", "1")] == 1
+    assert ("price", "0") not in counters(shop)
+    assert ("category", str(bebidas.pk)) not in counters(shop)
+
+    # Reservar todo el stock lo pasa a agotado
+    assert reserve({cafe.pk: 2})
+    assert counters(shop)[("stock", "out")] == 2
+
+    cafe.active = False
+    cafe.save()
+    assert counters(shop) == {("total", "all"): 1, ("stock", "out"): 1, ("price", "2"): 1}
+    Product.objects.filter(shop=shop).delete()
+    assert counters(shop) == {}
+
+
+def test_bulk_changes_and_category_renames(shop):
+    bebidas = Category.objects.create(shop=shop, name="Bebidas")
+    products = Product.objects.bulk_create(
+        Product(shop=shop, category=bebidas, name=f"Jugo {i}", price=1000, stock=1) for i in range(5)
+    )
+    products_changed.send(sender=Product, product_ids=[p.pk for p in products])
+    assert counters(shop)[("category", str(bebidas.pk))] == 5
+
+    bebidas.name = "Refrescos"
+    bebidas.save()
+    assert facets.for_shop(shop.slug)["categories"] == [{"id": bebidas.pk, "name": "Refrescos", "count": 5}]
+
+    bebidas.delete()
+    assert facets.for_shop(shop.slug)["categories"] == []
+    assert counters(shop)[("total", "all")] == 5
+
+
+def test_tracking_locks_rows_before_the_write(shop):
+    cafe = Product.objects.create(shop=shop, name="Café", price=5000, stock=2)
+    seen = []
+
+    def spy(product_ids, lock=False):
+        seen.append(lock)
+        return snapshot(product_ids, lock)
+
+    snapshot = facets.snapshot
+    with mock.patch.object(facets, "snapshot", spy):
+        cafe.price = 20000
+        cafe.save()
+    # El "antes" bloquea las filas hasta el commit; el "después" ya no hace falta
+    assert seen == [True, False]
+    assert counters(shop)[("price", "1")] == 1
+
+
+def test_reconcile_fixes_drift(shop):
+    Product.objects.create(shop=shop, name="Arroz", price=2000, stock=3)
+    ShopFacet.objects.filter(shop=shop, facet="total").update(count=40)
+    ShopFacet.objects.create(shop=shop, facet="category", value="999", label="Fantasma", count=2)
+    ShopFacet.objects.filter(shop=shop, facet="stock").delete()
+
+    out = StringIO()
+    call_command("reconcile_facets", stdout=out)
+    assert "Contadores corregidos: 3" in out.getvalue()
+    assert counters(shop) == {("total", "all"): 1, ("stock", "in"): 1, ("price", "0"): 1}
+    assert facets.reconcile() == 0
+
+
+def test_first_page_includes_facets(shop):
+    cafe = Category.objects.create(shop=shop, name="Café")
+    for i in range(3):
+        Product.objects.create(shop=shop, category=cafe, name=f"Café {i}", price=12000, stock=i)
+    client = APIClient()
+    url = reverse("shops-products", args=[shop.slug])
+    data = client.get(url, {"page_size": 2}).data
+    assert data["facets"] == {
+        "total": 3,
+        "in_stock": 2,
+        "categories": [{"id": cafe.pk, "name": "Café", "count": 3}],
+        "price": [{"min": 10000, "max": 50000, "count": 3}],
+    }
+    assert data["next"] and "facets" not in client.get(data["next"]).data
+
+    empty = Shop.objects.create(owner=shop.owner, name="Vacía", slug="vacia")
+    resp = client.get(reverse("shops-products", args=[empty.slug]))
+    assert resp.data["facets"] == {"total": 0, "in_stock": 0, "categories": [], "price": []}
+    assert client.get(reverse("shops-products", args=["no-existe"])).status_code == 404
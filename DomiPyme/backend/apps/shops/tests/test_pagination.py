@@ -0,0 +1,89 @@
+from datetime import timedelta
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from apps.common.pagination import HybridPagination
+from apps.products.models import Product as CatalogProduct
+from apps.shops.models import Shop
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shops(db):
+    owner = User.objects.create_user(email="paginas@test.com", password="pass1234")
+    now = timezone.now()
+    # Empates de created_at de a tres: el id desempata
+    return Shop.objects.bulk_create(
+        Shop(owner=owner, name=f"Tienda {i}", slug=f"pag-{i}", created_at=now - timedelta(minutes=i // 3))
+        for i in range(10)
+    )
+
+
+def _expected():
+    return list(Shop.objects.order_by("-created_at", "-id").values_list("slug", flat=True))
+
+
+def _walk(client, url, params):
+    slugs, pages = [], 0
+    data = client.get(url, params).json()
+    while True:
+        pages += 1
+        slugs += [row["slug"] for row in data["results"]]
+        if not data["next"]:
+            return slugs, pages
+        assert "offset=" not in data["next"]
+        data = client.get(data["next"]).json()
+
+
+def test_cursor_walk_is_opt_in_and_skips_count(shops):
+    client = APIClient()
+    url = reverse("shops-list-create")
+    with CaptureQueriesContext(connection) as ctx:
+        data = client.get(url, {"mode": "cursor", "page_size": 4}).json()
+    assert len(ctx.captured_queries) == 1
+    assert set(data) == {"next", "previous", "results"}
+    assert _walk(client, url, {"mode": "cursor", "page_size": 4}) == (_expected(), 3)
+
+
+def test_default_is_limit_offset(shops):
+    client = APIClient()
+    url = reverse("shops-list-create")
+    data = client.get(url, {"limit": 3, "offset": 3}).json()
+    assert data["count"] == 10
+    assert [row["slug"] for row in data["results"]] == _expected()[3:6]
+    assert "offset=6" in data["next"] and "cursor" not in data["next"]
+    assert "offset" not in data["previous"] and "limit=3" in data["previous"]
+    assert set(client.get(url).json()) == {"count", "next", "previous", "results"}
+
+
+def test_estimated_count(shops, monkeypatch):
+    client = APIClient()
+    url = reverse("shops-list-create")
+    data = client.get(url, {"count": "estimate"}).json()
+    assert (data["count"], data["count_exact"]) == (10, True)
+
+    monkeypatch.setattr(HybridPagination, "estimate_cap", 5)
+    data = client.get(url, {"count": "estimate", "mode": "cursor", "page_size": 2}).json()
+    assert data["count"] >= 5 and data["count_exact"] is False
+    assert client.get(url, {"count": "exact", "mode": "cursor", "page_size": 2}).json()["count"] == 10
+
+
+def test_catalog_products_use_cursor(db):
+    for i in range(5):
+        CatalogProduct.objects.create(name=f"Producto {i}", price=1000, active=i != 2)
+    client = APIClient()
+    url = reverse("product-list")
+    slugs, pages = _walk(client, url, {"mode": "cursor", "limit": 2})
+    assert pages == 2
+    assert slugs == list(
+        CatalogProduct.objects.filter(active=True).order_by("-created_at", "-id").values_list("slug", flat=True)
+    )
+    assert client.get(url, {"cursor": "no-es-un-cursor"}).status_code == 404
+    assert client.get(url).json()["count"] == 4
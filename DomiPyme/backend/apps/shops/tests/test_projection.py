@@ -0,0 +1,96 @@
+from io import StringIO
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.reservations import reserve
+from apps.shops.models import CatalogEntry, Category, Product, Shop
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shop(db):
+    owner = User.objects.create_user(email="proyeccion@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=owner, name="Tienda Uno", slug="tienda-uno")
+    return shop
+
+
+def _entry(product):
+    return CatalogEntry.objects.filter(pk=product.pk).first()
+
+
+def test_product_changes_are_projected(shop):
+    bebidas = Category.objects.create(shop=shop, name="Bebidas")
+    product = Product.objects.create(shop=shop, category=bebidas, name="Café", sku="C-1", price=5000, stock=4)
+    entry = _entry(product)
+    assert (entry.shop_slug, entry.shop_name, entry.category_name) == ("tienda-uno", "Tienda Uno", "Bebidas")
+    assert (entry.available, entry.in_stock) == (4, True)
+    assert entry.search_text == "Café C-1 Bebidas"
+
+    product.price = 5500
+    product.save()
+    assert _entry(product).price == 5500
+
+    assert reserve({product.pk: 4})
+    entry = _entry(product)
+    assert (entry.stock, entry.available, entry.in_stock) == (4, 0, False)
+
+    product.active = False
+    product.save()
+    assert _entry(product) is None
+    product.active = True
+    product.save()
+    assert _entry(product) is not None
+    product.delete()
+    assert not CatalogEntry.objects.exists()
+
+
+def test_shop_and_category_changes_are_projected(shop):
+    bebidas = Category.objects.create(shop=shop, name="Bebidas")
+    product = Product.objects.create(shop=shop, category=bebidas, name="Jugo", price=3000, stock=1)
+
+    shop.name, shop.slug = "Tienda Dos", "tienda-dos"
+    shop.save()
+    bebidas.name = "Refrescos"
+    bebidas.save()
+    entry = _entry(product)
+    assert (entry.shop_slug, entry.shop_name, entry.category_name) == ("tienda-dos", "Tienda Dos", "Refrescos")
+
+    bebidas.delete()
+    entry = _entry(product)
+    assert entry.category_id is None and entry.category_name is None
+    assert entry.search_text == "Jugo  "
+
+    shop.delete()
+    assert not CatalogEntry.objects.exists()
+
+
+def test_rebuild_command_restores_drift(shop):
+    keep = Product.objects.create(shop=shop, name="Arroz", price=2000, stock=2)
+    Product.objects.create(shop=shop, name="Oculto", price=1, stock=1, active=False)
+    CatalogEntry.objects.filter(pk=keep.pk).update(name="viejo", stock=99)
+    CatalogEntry.objects.create(
+        id=999999, shop=shop, shop_slug=shop.slug, shop_name=shop.name, name="Fantasma", price=1,
+        created_at=keep.created_at,
+    )
+    call_command("rebuild_catalog", stdout=StringIO())
+    assert list(CatalogEntry.objects.values_list("pk", "name", "stock")) == [(keep.pk, "Arroz", 2)]
+
+
+def test_listing_reads_only_the_projection(shop):
+    for i in range(6):
+        Product.objects.create(shop=shop, name=f"Pan {i}", sku=f"PAN-{i}", price=1000 + i, stock=i % 2)
+    client = APIClient()
+    url = reverse("shops-products", args=[shop.slug])
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(url, {"q": "pan-", "in_stock": "1"})
+    assert resp.status_code == 200
+    # La página y los contadores de facetas, sin tocar productos ni comercios
+    assert len(ctx.captured_queries) == 2
+    assert [p["name"] for p in resp.data["results"]] == ["Pan 5", "Pan 3", "Pan 1"]
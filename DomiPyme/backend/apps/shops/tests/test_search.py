@@ -0,0 +1,78 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.shops import search
+from apps.shops.models import Category, Product, Shop
+from apps.shops.signals import products_changed
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog(db):
+    owner = User.objects.create_user(email="busca@test.com", password="pass1234")
+    a = Shop.objects.create(owner=owner, name="Granero A", slug="granero-a")
+    b = Shop.objects.create(owner=owner, name="Granero B", slug="granero-b")
+    bebidas = Category.objects.create(shop=a, name="Bebidas")
+    Product.objects.create(shop=a, category=bebidas, name="Café molido", price=12000, stock=3)
+    Product.objects.create(shop=a, name="Azúcar", description="ideal para el café", price=4000, stock=3)
+    Product.objects.create(shop=b, name="Café en grano", sku="CAF-01", price=25000, stock=3)
+    Product.objects.create(shop=b, name="Café viejo", price=1000, stock=3, active=False)
+    return a, b, bebidas
+
+
+def _search(**params):
+    with CaptureQueriesContext(connection) as ctx:
+        resp = APIClient().get(reverse("products-search"), params)
+    assert resp.status_code == 200
+    return [p["name"] for p in resp.data["results"]], len(ctx.captured_queries), resp.data
+
+
+def test_ranked_prefix_search_with_filters(catalog):
+    names, queries, _ = _search(q="cafe")
+    # el nombre pesa más que la descripción; los inactivos no salen
+    assert set(names[:2]) == {"Café molido", "Café en grano"} and names[2] == "Azúcar"
+    assert queries == 2
+
+    assert _search(q="caf mol")[0] == ["Café molido"]
+    assert _search(q="cafe", shop="granero-b")[0] == ["Café en grano"]
+    assert _search(q="cafe", min_price="5000", max_price="20000")[0] == ["Café molido"]
+    assert _search(q="bebidas")[0] == ["Café molido"]
+    assert _search(q="caf-01")[0] == ["Café en grano"]
+    assert _search(q='"*) OR (')[0] == []
+
+    names, _, data = _search(q="cafe", limit=1)
+    assert len(names) == 1 and "offset=1" in data["next"]
+
+
+def test_index_follows_changes(catalog):
+    a, b, bebidas = catalog
+    product = Product.objects.get(name="Azúcar")
+    product.name = "Panela"
+    product.save()
+    assert _search(q="panela")[0] == ["Panela"]
+
+    bebidas.name = "Granos"
+    bebidas.save()
+    assert _search(q="granos")[0] == ["Café molido"]
+
+    Product.objects.filter(pk=product.pk).update(name="Miel")
+    products_changed.send(sender=Product, product_ids=[product.pk])
+    assert _search(q="miel")[0] == ["Miel"]
+
+    product.delete()
+    assert _search(q="miel")[0] == []
+    assert search.rebuild() == 3
+    assert len(_search(q="cafe")[0]) == 2
+
+
+def test_deleted_category_leaves_the_index(catalog):
+    a, b, bebidas = catalog
+    assert _search(q="bebidas")[0] == ["Café molido"]
+    bebidas.delete()
+    assert _search(q="bebidas")[0] == []
+    assert "Café molido" in _search(q="molido")[0]
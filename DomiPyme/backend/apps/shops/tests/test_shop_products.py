@@ -0,0 +1,54 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.shops.models import Shop, Product
+from apps.shops.signals import products_changed
+
+User = get_user_model()
+
+
+@pytest.fixture
+def shop(db, settings):
+    settings.SHOP_DETAIL_PRODUCTS = 5
+    owner = User.objects.create_user(email="vitrina@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=owner, name="Vitrina", slug="vitrina")
+    products = Product.objects.bulk_create(
+        [Product(shop=shop, name=f"Producto {i}", price=1000 + i, stock=i % 3) for i in range(12)]
+        + [Product(shop=shop, name="Oculto", price=1, stock=1, active=False)]
+    )
+    # bulk_create no manda señales: el contrato es avisar con products_changed
+    products_changed.send(sender=Product, product_ids=[p.pk for p in products])
+    return shop
+
+
+def test_detail_is_bounded_and_links_to_next_page(shop):
+    client = APIClient()
+    with CaptureQueriesContext(connection) as ctx:
+        resp = client.get(reverse("shops-detail", args=[shop.slug]))
+    assert resp.status_code == 200
+    assert len(ctx.captured_queries) == 2
+    first = [p["id"] for p in resp.data["products"]]
+    assert len(first) == 5
+
+    seen = list(first)
+    url = resp.data["products_next"]
+    while url:
+        page = client.get(url).data
+        seen += [p["id"] for p in page["results"]]
+        url = page["next"]
+    expected = Product.objects.filter(shop=shop, active=True).order_by("-created_at", "-id")
+    assert seen == list(expected.values_list("id", flat=True))
+
+
+def test_products_endpoint_filters(shop):
+    client = APIClient()
+    url = reverse("shops-products", args=[shop.slug])
+    data = client.get(url, {"min_price": "1003", "max_price": "1006", "in_stock": "1"}).data
+    assert sorted(p["price"] for p in data["results"]) == ["1004.00", "1005.00"]
+    assert client.get(url, {"q": "oculto"}).data["results"] == []
+    assert client.get(url, {"min_price": "abc"}).status_code == 400
+    assert client.get(reverse("shops-products", args=["no-existe"])).status_code == 404
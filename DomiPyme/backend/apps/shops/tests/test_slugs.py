@@ -0,0 +1,64 @@
+import pytest
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from apps.common import slugs
+from apps.products.models import Product as CatalogProduct
+from apps.shops.models import Shop
+
+User = get_user_model()
+
+
+@pytest.fixture
+def owner(db):
+    return User.objects.create_user(email="slugs@test.com", password="pass1234")
+
+
+def _queries(fn):
+    with CaptureQueriesContext(connection) as ctx:
+        fn()
+    return len(ctx.captured_queries)
+
+
+def test_same_name_saves_cost_constant_queries(db):
+    first = _queries(lambda: CatalogProduct.objects.create(name="Empanada"))
+    for _ in range(20):
+        CatalogProduct.objects.create(name="Empanada")
+    last = _queries(lambda: CatalogProduct.objects.create(name="Empanada"))
+    assert last == first
+    slugs_ = set(CatalogProduct.objects.values_list("slug", flat=True))
+    assert slugs_ == {"empanada"} | {f"empanada-{i}" for i in range(1, 22)}
+
+
+def test_suffix_skips_gaps_and_lookalikes(owner):
+    Shop.objects.create(owner=owner, name="x", slug="pan")
+    Shop.objects.create(owner=owner, name="x", slug="pan-7")
+    Shop.objects.create(owner=owner, name="x", slug="pan-de-yuca")
+    assert Shop.objects.create(owner=owner, name="Pan").slug == "pan-8"
+    assert Shop.objects.create(owner=owner, name="Search").slug == "search-1"
+    long = Shop.objects.create(owner=owner, name="Tienda " * 20)
+    assert len(long.slug) <= 50
+
+
+def test_assign_slugs_for_bulk_create(db):
+    CatalogProduct.objects.create(name="Arepa")
+    items = [CatalogProduct(name="Arepa"), CatalogProduct(name="Arepa"), CatalogProduct(name="Jugo")]
+    assert _queries(lambda: slugs.assign_slugs(items)) == 2
+    CatalogProduct.objects.bulk_create(items)
+    assert [p.slug for p in items] == ["arepa-1", "arepa-2", "jugo"]
+
+
+def test_save_retries_when_slug_is_taken_concurrently(owner, monkeypatch):
+    Shop.objects.create(owner=owner, name="Tienda")
+    real = slugs.next_suffix
+    calls = []
+
+    def stale(*args, **kwargs):
+        # la primera lectura no ve el "tienda" ya insertado (como en una carrera)
+        calls.append(1)
+        return None if len(calls) == 1 else real(*args, **kwargs)
+
+    monkeypatch.setattr(slugs, "next_suffix", stale)
+    assert Shop.objects.create(owner=owner, name="Tienda").slug == "tienda-1"
+    assert len(calls) == 2
@@ -0,0 +1,91 @@
+from decimal import Decimal
+
+import pytest
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import Value
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.common.values_serializers import ValuesSerializer, values_serializer_for
+from apps.products.models import Product as CatalogProduct
+from apps.products.serializers import ProductSerializer as CatalogProductSerializer
+from apps.shops.models import Category, Product, Shop
+from apps.shops.serializers import (
+    ProductSearchResultSerializer, ProductSerializer, ShopSerializer,
+)
+
+User = get_user_model()
+
+
+@pytest.fixture
+def catalog(db, settings):
+    settings.SHOP_DETAIL_PRODUCTS = 3
+    owner = User.objects.create_user(email="rapido@test.com", password="pass1234")
+    shop = Shop.objects.create(owner=owner, name="Rápido & Cía", slug="rapido", description="")
+    category = Category.objects.create(shop=shop, name="Café")
+    prices = [Decimal("0"), Decimal("1234.5"), Decimal("99999.99"), Decimal("7")]
+    for i, price in enumerate(prices * 2):
+        Product.objects.create(
+            shop=shop, name=f"Café «{i}»", price=price, stock=i, description="ñ\n\"x\"",
+            category=category if i % 2 else None,
+        )
+    for i, price in enumerate(prices):
+        CatalogProduct.objects.create(name=f"Catálogo {i}", price=price, stock=i, active=i != 2)
+    return shop
+
+
+def _same_bytes(queryset, serializer_class):
+    fast = values_serializer_for(serializer_class)
+    model = JSONRenderer().render(serializer_class(list(queryset), many=True).data)
+    values = JSONRenderer().render(fast.serialize(list(fast.values(queryset))))
+    assert model == values
+    return values
+
+
+@pytest.mark.parametrize("tz", ["America/Bogota", "UTC"])
+def test_output_is_byte_identical(catalog, tz):
+    with timezone.override(tz):
+        body = _same_bytes(CatalogProduct.objects.all(), CatalogProductSerializer)
+    assert (b"Z\"" in body) == (tz == "UTC")
+    _same_bytes(Shop.objects.all(), ShopSerializer)
+    _same_bytes(Product.objects.order_by("id"), ProductSerializer)
+    scored = Product.objects.select_related("shop", "category").annotate(score=Value(-1.25)).order_by("id")
+    _same_bytes(scored, ProductSearchResultSerializer)
+
+
+def test_endpoints_match_model_serializers(catalog):
+    client = APIClient()
+    resp = client.get(reverse("shops-detail", args=[catalog.slug]), HTTP_HOST="testserver")
+    first_page = Product.objects.filter(shop=catalog, active=True).order_by("-created_at", "-id")[:3]
+    expected = {
+        **ShopSerializer(catalog).data,
+        "products": ProductSerializer(first_page, many=True).data,
+        "products_next": resp.json()["products_next"],
+    }
+    assert resp.content == JSONRenderer().render(expected)
+    assert resp.json()["products_next"].startswith(f"http://testserver/api/{catalog.slug}/products/?cursor=")
+
+    listed = client.get(reverse("shops-products", args=[catalog.slug])).data["results"]
+    assert listed == ProductSerializer(
+        Product.objects.filter(shop=catalog, active=True).order_by("-created_at", "-id")[:3], many=True
+    ).data
+
+    results = client.get(reverse("products-search"), {"q": "café"}).data["results"]
+    assert results and all(isinstance(r["score"], float) for r in results)
+    assert {r["category_name"] for r in results} == {None, "Café"}
+
+
+def test_unsupported_fields_are_rejected():
+    class WithMethod(serializers.ModelSerializer):
+        extra = serializers.SerializerMethodField()
+
+        class Meta:
+            model = Shop
+            fields = ("id", "extra")
+
+    with pytest.raises(ImproperlyConfigured):
+        ValuesSerializer(WithMethod)
@@ -1,7 +1,14 @@
 from django.urls import path
-from .views import ShopListCreateView, ShopDetailView
+from .views import (
+    ProductSearchView, ShopCatalogExportView, ShopCatalogImportView, ShopListCreateView,
+    ShopDetailView, ShopProductListView,
+)
 
 urlpatterns = [
     path("", ShopListCreateView.as_view(), name="shops-list-create"),
+    path("search/", ProductSearchView.as_view(), name="products-search"),
     path("<slug:slug>/", ShopDetailView.as_view(), name="shops-detail"),
+    path("<slug:slug>/products/", ShopProductListView.as_view(), name="shops-products"),
+    path("<slug:slug>/products/import/", ShopCatalogImportView.as_view(), name="shops-products-import"),
+    path("<slug:slug>/products/export/", ShopCatalogExportView.as_view(), name="shops-products-export"),
 ]
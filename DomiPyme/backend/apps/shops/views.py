@@ -1,16 +1,223 @@
-from rest_framework import generics, permissions
-from .models import Shop
-from .serializers import ShopSerializer, ShopDetailSerializer
+from decimal import Decimal, InvalidOperation
 
-class ShopListCreateView(generics.ListCreateAPIView):
+from django.conf import settings
+from django.http import Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404
+from rest_framework import generics, permissions, status
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.parsers import FileUploadParser, MultiPartParser
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from rest_framework.views import APIView
+from apps.common.pagination import HybridPagination
+from apps.common.response_cache import VersionedCacheMixin
+from apps.common.values_serializers import ValuesReadMixin, values_serializer_for
+from . import catalog_io, facets, search
+from .models import CatalogEntry, Shop
+from .signals import shop_scope
+from .serializers import (
+    CatalogEntrySerializer, CatalogSearchResultSerializer, ShopSerializer,
+    ShopProductPagination, catalog_entries, products_next_url,
+)
+
+def parse_price(params, name):
+    raw = params.get(name)
+    if not raw:
+        return None
+    try:
+        return Decimal(raw)
+    except InvalidOperation:
+        raise ValidationError({name: "Precio inválido."})
+
+class ShopListCreateView(VersionedCacheMixin, ValuesReadMixin, generics.ListCreateAPIView):
     queryset = Shop.objects.all()
     permission_classes = [permissions.IsAuthenticatedOrReadOnly]
     serializer_class = ShopSerializer
+    pagination_class = HybridPagination
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        return ["shops"]
 
     def perform_create(self, serializer):
         serializer.save(owner=self.request.user)
 
-class ShopDetailView(generics.RetrieveAPIView):
-    queryset = Shop.objects.all()
-    serializer_class = ShopDetailSerializer
-    lookup_field = "slug"
+class ShopCacheMixin(VersionedCacheMixin):
+    """Respuestas cacheadas por versión del comercio (ver apps.shops.signals)."""
+
+    def get_cache_scopes(self, request, *args, **kwargs):
+        return [shop_scope(kwargs["slug"])]
+
+class ShopDetailView(ShopCacheMixin, APIView):
+    """
+    Comercio + primera página de productos activos (`products`) y, si hay
+    más, `products_next` apuntando a /api/<slug>/products/ con el cursor.
+    Armado desde .values() (ver apps.common.values_serializers) y la
+    proyección: dos queries, sin instancias ni joins. La de productos va
+    rebanada: como mucho SHOP_DETAIL_PRODUCTS + 1 filas aunque el comercio
+    tenga miles.
+    """
+
+    def get(self, request, slug):
+        shops = values_serializer_for(ShopSerializer)
+        products = values_serializer_for(CatalogEntrySerializer)
+        shop = get_object_or_404(shops.values(Shop.objects.all()), slug=slug)
+        rows = list(
+            products.values(catalog_entries(shop["slug"]), extra=ShopProductPagination().fields)
+            [:settings.SHOP_DETAIL_PRODUCTS + 1]
+        )
+        data = shops.serialize_one(shop)
+        data["products"] = products.serialize(rows[:settings.SHOP_DETAIL_PRODUCTS])
+        data["products_next"] = products_next_url(shop["slug"], rows, request)
+        return Response(data)
+
+class ShopProductListView(ShopCacheMixin, ValuesReadMixin, generics.ListAPIView):
+    """
+    Productos activos de un comercio, paginados por cursor. Lee solo de la
+    proyección CatalogEntry (una query sobre catalog_shop_*_idx).
+    Filtros: `q` (nombre, sku o categoría), `category` (id), `min_price`,
+    `max_price`, `in_stock=1`.
+
+    La primera página trae además `facets`: los contadores precalculados del
+    comercio (ver apps.shops.facets), sin aplicar los filtros del request.
+    """
+    serializer_class = CatalogEntrySerializer
+    pagination_class = ShopProductPagination
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get(ShopProductPagination.cursor_query_param):
+            return response
+        response.data["facets"] = facets.for_shop(kwargs["slug"])
+        # Página vacía: puede ser un comercio sin productos o uno que no existe
+        if not response.data["results"] and not Shop.objects.filter(slug=kwargs["slug"]).exists():
+            raise Http404
+        return response
+
+    def get_queryset(self):
+        qs = catalog_entries(self.kwargs["slug"])
+        params = self.request.query_params
+        if params.get("q"):
+            qs = qs.filter(search_text__icontains=params["q"])
+        if params.get("category"):
+            if not params["category"].isdigit():
+                raise ValidationError({"category": "Debe ser un id."})
+            qs = qs.filter(category_id=params["category"])
+        min_price = self.parse_price("min_price")
+        if min_price is not None:
+            qs = qs.filter(price__gte=min_price)
+        max_price = self.parse_price("max_price")
+        if max_price is not None:
+            qs = qs.filter(price__lte=max_price)
+        if params.get("in_stock") in ("1", "true"):
+            qs = qs.filter(in_stock=True)
+        return qs
+
+    def parse_price(self, name):
+        return parse_price(self.request.query_params, name)
+
+class ProductSearchView(APIView):
+    """
+    Búsqueda de productos activos en todos los comercios, ordenada por
+    relevancia (índice FTS5 / tsvector, ver `apps.shops.search`).
+
+    GET /api/search/?q=cafe molido&shop=<slug>&category=<id>&min_price=&max_price=&limit=&offset=
+    Respuesta: {"next": url|null, "results": [...]} (sin COUNT).
+    """
+    authentication_classes = []
+    permission_classes = [permissions.AllowAny]
+    default_limit = 20
+    max_limit = 50
+
+    def get(self, request):
+        params = request.query_params
+        limit = self.parse_int("limit", self.default_limit)
+        limit = max(1, min(limit, self.max_limit))
+        offset = max(0, self.parse_int("offset", 0))
+        category = params.get("category")
+        if category and not category.isdigit():
+            raise ValidationError({"category": "Debe ser un id."})
+        hits = search.search(
+            params.get("q", ""),
+            limit=limit + 1,
+            offset=offset,
+            shop=params.get("shop") or None,
+            category=int(category) if category else None,
+            min_price=parse_price(params, "min_price"),
+            max_price=parse_price(params, "max_price"),
+        )
+        page = hits[:limit]
+        fast = values_serializer_for(CatalogSearchResultSerializer, computed=("score",))
+        rows = {row["id"]: row for row in fast.values(CatalogEntry.objects.filter(pk__in=[pk for pk, _ in page]))}
+        results = []
+        for pk, score in page:
+            row = rows.get(pk)
+            if row is not None:
+                row["score"] = score
+                results.append(row)
+        next_url = None
+        if len(hits) > limit:
+            url = replace_query_param(request.build_absolute_uri(), "offset", offset + limit)
+            next_url = replace_query_param(url, "limit", limit)
+        return Response({"next": next_url, "results": fast.serialize(results)})
+
+    def parse_int(self, name, default):
+        raw = self.request.query_params.get(name)
+        if not raw:
+            return default
+        try:
+            return int(raw)
+        except ValueError:
+            raise ValidationError({name: "Debe ser un entero."})
+
+class ShopCatalogMixin:
+    """Import/export del catálogo: solo el dueño del comercio (o staff)."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get_shop(self, slug):
+        shop = get_object_or_404(Shop, slug=slug)
+        if shop.owner_id != self.request.user.pk and not self.request.user.is_staff:
+            raise PermissionDenied("No administras este comercio.")
+        return shop
+
+    def get_format(self, default):
+        # No `format`: DRF lo reserva para elegir el renderer
+        fmt = self.request.query_params.get("file_format") or default
+        if fmt not in catalog_io.FORMATS:
+            raise ValidationError({"file_format": f"Usa uno de: {', '.join(catalog_io.FORMATS)}."})
+        return fmt
+
+class ShopCatalogImportView(ShopCatalogMixin, APIView):
+    """
+    POST multipart con `file` (CSV o JSON; `?file_format=` o se deduce del nombre).
+    Upsert por SKU en bloques; responde el reporte con errores por fila.
+    Columnas: sku, name, description, price, stock, category, active.
+    """
+    parser_classes = [MultiPartParser, FileUploadParser]
+
+    def post(self, request, slug):
+        shop = self.get_shop(slug)
+        upload = request.FILES.get("file")
+        if upload is None:
+            return Response({"detail": "Falta el archivo (campo file)."}, status=status.HTTP_400_BAD_REQUEST)
+        fmt = self.get_format(catalog_io.detect_format(upload.name, upload.content_type))
+        try:
+            report = catalog_io.import_catalog(shop, upload, fmt)
+        except catalog_io.ImportFormatError as exc:
+            return Response(
+                {"detail": str(exc), "report": getattr(exc, "report", None)},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        return Response(report)
+
+class ShopCatalogExportView(ShopCatalogMixin, APIView):
+    """GET ?file_format=csv|json: catálogo completo (activos e inactivos) en streaming."""
+
+    def get(self, request, slug):
+        shop = self.get_shop(slug)
+        fmt = self.get_format("csv")
+        content_type = "text/csv" if fmt == "csv" else "application/json"
+        response = StreamingHttpResponse(
+            catalog_io.export_catalog(shop, fmt), content_type=f"{content_type}; charset=utf-8"
+        )
+        response["Content-Disposition"] = f'attachment; filename="{shop.slug}-catalogo.{fmt}"'
+        return response
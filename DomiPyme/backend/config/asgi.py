@@ -14,3 +14,10 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
 
 application = get_asgi_application()
+
+# Bajo ASGI cada request síncrono tiene su hilo: los hashes de contraseña van
+# al pool acotado (PASSWORD_HASH_WORKERS) para que una ola de registros no se
+# lleve toda la CPU. Se arranca acá y no en el primer login.
+from apps.accounts import hashing  # noqa: E402
+
+hashing.pool.start()
@@ -29,8 +29,15 @@ INSTALLED_APPS = [
     "apps.payments",
     "apps.shops",
     "apps.orders",
+    "apps.outbox",
 ]
 
+# Harness de carga (manage.py run_benchmarks y sus baselines): herramienta de
+# desarrollo, fuera de producción salvo ENABLE_BENCHMARKS=1
+ENABLE_BENCHMARKS = DEBUG or os.getenv("ENABLE_BENCHMARKS", "0") == "1"
+if ENABLE_BENCHMARKS:
+    INSTALLED_APPS.append("apps.benchmarks")
+
 MIDDLEWARE = [
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
@@ -110,17 +117,27 @@ CORS_ALLOW_CREDENTIALS = True
 # Django Rest Framework & JWT
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "apps.accounts.authentication.CachedJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": (
         "rest_framework.permissions.IsAuthenticatedOrReadOnly",
     ),
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.LimitOffsetPagination",
     "PAGE_SIZE": 12,
+    # Endpoints de credenciales (apps.accounts.throttling): <scope>_ip / <scope>_email
+    "DEFAULT_THROTTLE_RATES": {
+        "login_ip": os.getenv("THROTTLE_LOGIN_IP", "30/min"),
+        "login_email": os.getenv("THROTTLE_LOGIN_EMAIL", "10/min"),
+        "register_ip": os.getenv("THROTTLE_REGISTER_IP", "20/min"),
+        "register_email": os.getenv("THROTTLE_REGISTER_EMAIL", "5/min"),
+        "password_reset_ip": os.getenv("THROTTLE_PASSWORD_RESET_IP", "10/min"),
+        "password_reset_email": os.getenv("THROTTLE_PASSWORD_RESET_EMAIL", "3/hour"),
+    },
 }
 
 from datetime import timedelta
-from rest_framework_simplejwt.settings import api_settings as jwt_settings
+# Sin importar rest_framework_simplejwt.settings acá: lee SIMPLE_JWT al
+# importarse y, a mitad de este módulo, se quedaba con los defaults
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=15),
@@ -128,12 +145,144 @@ SIMPLE_JWT = {
     "ROTATE_REFRESH_TOKENS": True,      # Opcional
     'BLACKLIST_AFTER_ROTATION': True,   # Para uso de blacklist
     "AUTH_HEADER_TYPES": ("Bearer",),
+    "TOKEN_REFRESH_SERIALIZER": "apps.accounts.serializers.TokenRefreshSerializer",
 }
 
+# Filtro de Bloom de refresh tokens revocados (apps.accounts.revocation): jti
+# que entran antes de rearmarlo y tasa de falsos positivos (cada uno cuesta una query)
+REVOCATION_FILTER_CAPACITY = int(os.getenv("REVOCATION_FILTER_CAPACITY", 100_000))
+REVOCATION_FILTER_ERROR = float(os.getenv("REVOCATION_FILTER_ERROR", 0.001))
+# Segundos tras los que el filtro se vuelve a armar desde la BD aunque no
+# falten avisos en el cache
+REVOCATION_FILTER_MAX_AGE = int(os.getenv("REVOCATION_FILTER_MAX_AGE", 300))
+
+# Cache (locmem por proceso en desarrollo y tests; REDIS_URL para compartirla
+# entre workers, requiere el paquete `redis`)
+# "catalog" guarda respuestas públicas del catálogo (ver apps.common.response_cache);
+# locmem desaloja por LRU al pasar MAX_ENTRIES, en Redis usar maxmemory-policy allkeys-lru
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+        },
+        "catalog": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": os.getenv("REDIS_URL"),
+            "KEY_PREFIX": "catalog",
+        },
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "domipyme-default",
+        },
+        "catalog": {
+            "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+            "LOCATION": "domipyme-catalog",
+            "OPTIONS": {"MAX_ENTRIES": int(os.getenv("CATALOG_CACHE_MAX_ENTRIES", 2000))},
+        },
+    }
+
+# Usuario autenticado por JWT (apps.accounts.principals): alias del cache con la
+# versión vigente de cada usuario (compartido entre workers en producción),
+# entradas y segundos de vida del LRU de usuarios por proceso
+AUTH_PRINCIPAL_CACHE_ALIAS = os.getenv("AUTH_PRINCIPAL_CACHE_ALIAS", "default")
+AUTH_PRINCIPAL_CACHE_SIZE = int(os.getenv("AUTH_PRINCIPAL_CACHE_SIZE", 1024))
+AUTH_PRINCIPAL_CACHE_TTL = int(os.getenv("AUTH_PRINCIPAL_CACHE_TTL", 60))
+
+# Hash de contraseñas (apps.accounts.hashing): hilos del pool (acotan cuántos
+# núcleos se llevan registro/login), hashes que pueden esperar turno y segundos
+# de espera antes de responder 503
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", max((os.cpu_count() or 2) // 2, 1)))
+PASSWORD_HASH_QUEUE = int(os.getenv("PASSWORD_HASH_QUEUE", 32))
+PASSWORD_HASH_WAIT = float(os.getenv("PASSWORD_HASH_WAIT", 5))
+
+# Contadores de los throttles de credenciales: en producción un cache
+# compartido entre workers (si no, cada proceso cuenta por su lado)
+THROTTLE_CACHE_ALIAS = os.getenv("THROTTLE_CACHE_ALIAS", "default")
+
+# Cache de respuestas del catálogo: alias y segundos de vida. Los cambios de
+# stock/reservas no invalidan (serían en cada checkout): se ven al vencer el TTL
+CATALOG_CACHE_ALIAS = os.getenv("CATALOG_CACHE_ALIAS", "catalog")
+CATALOG_CACHE_TTL = int(os.getenv("CATALOG_CACHE_TTL", 60))
+
+# Productos que trae el detalle de un comercio; el resto va por /api/<slug>/products/
+SHOP_DETAIL_PRODUCTS = int(os.getenv("SHOP_DETAIL_PRODUCTS", 24))
+
+# Cortes de los rangos de precio de los filtros de la vitrina (ShopFacet). Si
+# cambian, correr `manage.py reconcile_facets`
+FACET_PRICE_BUCKETS = [
+    int(v) for v in os.getenv("FACET_PRICE_BUCKETS", "10000,50000,100000,500000").split(",") if v
+]
+
+# Segundos que vive el snapshot de precio/stock de un producto (cotización del carrito)
+PRODUCT_SNAPSHOT_TTL = int(os.getenv("PRODUCT_SNAPSHOT_TTL", 30))
+
+# Reservas de stock: segundos que una orden puede seguir "pending" antes de
+# liberar sus unidades, y tamaño de lote del barrido (release_expired_reservations)
+STOCK_RESERVATION_TTL = int(os.getenv("STOCK_RESERVATION_TTL", 15 * 60))
+STOCK_RESERVATION_SWEEP_BATCH = int(os.getenv("STOCK_RESERVATION_SWEEP_BATCH", 500))
+
+# Idempotency-Key en POST /api/checkout/: retención de las respuestas guardadas
+# y cuánto espera un reintento a que termine el request original
+IDEMPOTENCY_KEY_TTL = int(os.getenv("IDEMPOTENCY_KEY_TTL", 24 * 60 * 60))
+IDEMPOTENCY_WAIT_SECONDS = float(os.getenv("IDEMPOTENCY_WAIT_SECONDS", 2))
+# Lease de una clave en proceso: pasado este tiempo se asume que el worker
+# murió y un reintento la puede volver a tomar
+IDEMPOTENCY_PROCESSING_LEASE = int(os.getenv("IDEMPOTENCY_PROCESSING_LEASE", 120))
+
+# Proveedores de pago (apps.payments.providers). "sandbox" arma la URL de pago
+# localmente y acepta webhooks en formato libre: solo se registra con DEBUG o
+# PAYMENT_SANDBOX_ENABLED=1. Para pruebas de carga sin red apunta
+# PAYU_BASE_URL / MERCADOPAGO_BASE_URL al stub (manage.py run_payment_stub).
+PAYMENT_SANDBOX_ENABLED = DEBUG or os.getenv("PAYMENT_SANDBOX_ENABLED", "0") == "1"
+PAYMENT_PROVIDER = os.getenv("PAYMENT_PROVIDER", "sandbox" if PAYMENT_SANDBOX_ENABLED else "payu")
+PAYMENT_PROVIDERS = {
+    "payu": {
+        "BASE_URL": os.getenv("PAYU_BASE_URL", "https://sandbox.api.payulatam.com"),
+        "API_KEY": os.getenv("PAYU_API_KEY", ""),
+        "API_LOGIN": os.getenv("PAYU_API_LOGIN", ""),
+        "ACCOUNT_ID": os.getenv("PAYU_ACCOUNT_ID", ""),
+    },
+    "mercadopago": {
+        "BASE_URL": os.getenv("MERCADOPAGO_BASE_URL", "https://api.mercadopago.com"),
+        "ACCESS_TOKEN": os.getenv("MERCADOPAGO_ACCESS_TOKEN", ""),
+        # Clave secreta de notificaciones: con ella se verifica x-signature
+        "SIGNATURE_SECRET": os.getenv("MERCADOPAGO_WEBHOOK_SECRET", ""),
+    },
+}
+if PAYMENT_SANDBOX_ENABLED:
+    PAYMENT_PROVIDERS["sandbox"] = {
+        "BASE_URL": os.getenv("SANDBOX_PAYMENT_BASE_URL", "https://sandbox.payment.provider"),
+    }
+PAYMENT_HTTP_CONNECT_TIMEOUT = float(os.getenv("PAYMENT_HTTP_CONNECT_TIMEOUT", 2))
+PAYMENT_HTTP_READ_TIMEOUT = float(os.getenv("PAYMENT_HTTP_READ_TIMEOUT", 5))
+PAYMENT_HTTP_POOL_SIZE = int(os.getenv("PAYMENT_HTTP_POOL_SIZE", 20))
+PAYMENT_CIRCUIT_FAILURES = int(os.getenv("PAYMENT_CIRCUIT_FAILURES", 5))
+PAYMENT_CIRCUIT_RESET_SECONDS = float(os.getenv("PAYMENT_CIRCUIT_RESET_SECONDS", 30))
+
+# Webhooks de pago: token compartido (cabecera X-Webhook-Token) para los
+# proveedores sin firma configurada (PayU firma con PAYU_API_KEY, Mercado Pago
+# con MERCADOPAGO_WEBHOOK_SECRET; sin firma ni token se rechaza todo) y tamaño
+# de lote del consumidor (process_payment_webhooks)
+PAYMENT_WEBHOOK_SECRET = os.getenv("PAYMENT_WEBHOOK_SECRET", "")
+PAYMENT_WEBHOOK_BATCH_SIZE = int(os.getenv("PAYMENT_WEBHOOK_BATCH_SIZE", 500))
+
 # EMAIL (en desarrollo imprimimos el correo en consola)
 EMAIL_BACKEND = os.getenv("EMAIL_BACKEND", "django.core.mail.backends.console.EmailBackend")
 DEFAULT_FROM_EMAIL = os.getenv("DEFAULT_FROM_EMAIL", "no-reply@domipyme.local")
 
+# Outbox de correos (apps.outbox): los requests solo encolan y
+# `manage.py send_outbox --loop 5` envía. Correos por lote / conexión SMTP,
+# segundos que un lote queda reservado para un worker, reintentos y backoff
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", 100))
+OUTBOX_LEASE_SECONDS = int(os.getenv("OUTBOX_LEASE_SECONDS", 300))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 6))
+OUTBOX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_BACKOFF_SECONDS", 60))
+OUTBOX_MAX_BACKOFF_SECONDS = int(os.getenv("OUTBOX_MAX_BACKOFF_SECONDS", 3600))
+
 # MEDIA (para subir logos / imágenes)
 MEDIA_URL = "/media/"
 MEDIA_ROOT = BASE_DIR / "media"
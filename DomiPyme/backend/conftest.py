@@ -1,6 +1,7 @@
 # conftest.py (colócalo en la misma carpeta que pytest.ini)
 import os
 import django
+import pytest
 from django.conf import settings
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
@@ -9,3 +10,28 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
 # e.g., you could override DATABASES here for tests if needed.
 
 django.setup()
+
+
+@pytest.fixture(scope="session")
+def django_db_modify_db_settings(django_db_modify_db_settings_parallel_suffix, tmp_path_factory):
+    # SQLite en memoria (cache compartida) bloquea tablas completas entre hilos;
+    # los tests de concurrencia necesitan una BD en archivo con busy timeout.
+    # En el directorio temporal de la sesión: propio de cada corrida y de cada
+    # worker de xdist, así dos corridas en paralelo no comparten la BD.
+    db = settings.DATABASES["default"]
+    if db["ENGINE"] == "django.db.backends.sqlite3":
+        test = db.setdefault("TEST", {})
+        if not test.get("NAME"):
+            test["NAME"] = str(tmp_path_factory.mktemp("db") / "domipyme_test.sqlite3")
+        db.setdefault("OPTIONS", {}).setdefault("timeout", 30)
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    # Los ids se reutilizan entre tests (rollback); no arrastrar entradas de cache
+    from django.core.cache import caches
+    from apps.accounts import principals, revocation
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
+    principals.local.clear()
+    revocation.local.reset()
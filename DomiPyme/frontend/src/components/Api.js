@@ -88,6 +88,8 @@ api.interceptors.response.use(
       if (!newAccess) throw new Error('No access token in refresh response');
 
       localStorage.setItem('access_token', newAccess);
+      // Con ROTATE_REFRESH_TOKENS el refresh anterior queda en la blacklist
+      if (resp.data?.refresh) localStorage.setItem('refresh_token', resp.data.refresh);
       api.defaults.headers.common['Authorization'] = 'Bearer ' + newAccess;
       processQueue(null, newAccess);
       return api(originalRequest);
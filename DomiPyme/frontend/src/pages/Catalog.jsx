@@ -12,6 +12,9 @@ export default function Catalog() {
   const [q, setQ] = useState('');
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
+  // URL de la página siguiente (cursor que arma el backend); null = no hay más
+  const [nextUrl, setNextUrl] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   // Para manejar animaciones de entrada detectando ids previos
   const prevIdsRef = useRef(new Set());
@@ -22,26 +25,31 @@ export default function Catalog() {
     return `${base}_${String(s?.updated_at ?? s?.created_at ?? '').slice(0,10)}_${idx}`;
   };
 
+  const mapShops = (data, offset = 0) =>
+    // mapear shops y añadir uid + flags de animación
+    data.map((s, i) => {
+      const uid = makeUid(s, offset + i);
+      return {
+        ...s,
+        uid,
+        added: !prevIdsRef.current.has(uid),
+        removing: false,
+      };
+    });
+
   const loadShops = async (signal) => {
     setLoading(true);
     setError(null);
     try {
-      const res = await api.get('shops/', { signal });
-      const data = Array.isArray(res.data) ? res.data : [];
-      // mapear shops y añadir uid + flags de animación
-      const mapped = data.map((s, idx) => {
-        const uid = makeUid(s, idx);
-        return {
-          ...s,
-          uid,
-          added: !prevIdsRef.current.has(uid),
-          removing: false,
-        };
-      });
+      const res = await api.get('shops/', { params: { mode: 'cursor' }, signal });
+      // respuesta paginada {next, results}; se acepta también una lista plana
+      const data = Array.isArray(res.data) ? res.data : res.data?.results ?? [];
+      const mapped = mapShops(data);
 
       prevIdsRef.current = new Set(mapped.map((m) => m.uid));
       setShops(mapped);
       setFiltered(mapped);
+      setNextUrl(Array.isArray(res.data) ? null : res.data?.next ?? null);
 
       // quitar bandera 'added' tras animación para que no vuelva a animarse
       setTimeout(() => {
@@ -78,6 +86,24 @@ export default function Catalog() {
     );
   }, [q, shops]);
 
+  // Siguiente página por cursor: el backend no recorre las anteriores
+  const loadMore = async () => {
+    if (!nextUrl || loadingMore) return;
+    setLoadingMore(true);
+    try {
+      const res = await api.get(nextUrl);
+      const mapped = mapShops(res.data?.results ?? [], shops.length);
+      mapped.forEach((m) => prevIdsRef.current.add(m.uid));
+      setShops((prev) => [...prev, ...mapped]);
+      setNextUrl(res.data?.next ?? null);
+    } catch (e) {
+      console.error(e);
+      setError('No se pudieron cargar más comercios.');
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   const handleReload = () => {
     const controller = new AbortController();
     loadShops(controller.signal);
@@ -221,6 +247,14 @@ export default function Catalog() {
           })}
         </ul>
       )}
+
+      {!loading && !error && nextUrl && (
+        <div style={styles.more}>
+          <button onClick={loadMore} style={styles.reloadBtn} disabled={loadingMore}>
+            {loadingMore ? 'Cargando...' : 'Cargar más'}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
@@ -245,6 +279,7 @@ const styles = {
     cursor: 'pointer'
   },
   message: { textAlign: 'center', marginTop: 12 },
+  more: { display: 'flex', justifyContent: 'center', marginTop: 16 },
   card: { display: 'block', height: '100%' },
   cardLink: { color: 'inherit', textDecoration: 'none', display: 'block', height: '100%' },
   imageWrap: { width: '100%', height: 140, overflow: 'hidden', background: '#f6f7f9' },